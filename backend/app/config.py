@@ -7,12 +7,31 @@ load_dotenv()
 
 class Settings(BaseSettings):
     # Database settings
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "mysql")  # "mysql" or "sqlite" (embedded, single node)
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_PORT: int = int(os.getenv("DB_PORT", "3306"))
     DB_USER: str = os.getenv("DB_USER", "root")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "password")
     DB_NAME: str = os.getenv("DB_NAME", "quiz_app")
     
+    # Embedded SQLite backend (DB_BACKEND=sqlite): WAL journal, writes serialized per process
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "quiz_app.db")  # ":memory:" for a throwaway database (temporary file)
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # wait for the write lock this long
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable across app crashes in WAL mode
+    SQLITE_CACHE_MB: int = int(os.getenv("SQLITE_CACHE_MB", "64"))  # page cache per connection
+    SQLITE_MMAP_MB: int = int(os.getenv("SQLITE_MMAP_MB", "256"))
+    
+    # Read replica settings (read-only routes use the replica when DB_READ_HOST is set)
+    DB_READ_HOST: Optional[str] = os.getenv("DB_READ_HOST")
+    DB_READ_PORT: int = int(os.getenv("DB_READ_PORT", os.getenv("DB_PORT", "3306")))
+    AUTO_MIGRATE: bool = os.getenv("AUTO_MIGRATE", "False").lower() == "true"  # run migrations at startup
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))  # primary reads after a write
+    
+    # Startup warm-up: /health/ready fails until connections and caches for upcoming quizzes are warm
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "True").lower() == "true"
+    WARMUP_WINDOW_MINUTES: int = int(os.getenv("WARMUP_WINDOW_MINUTES", "120"))  # quizzes starting within this window
+    WARMUP_MAX_QUIZZES: int = int(os.getenv("WARMUP_MAX_QUIZZES", "50"))
+    
     # JWT Settings
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key")
     JWT_ALGORITHM: str = "HS256"
@@ -21,9 +40,101 @@ class Settings(BaseSettings):
     # Application Settings
     API_V1_PREFIX: str = "/api/v1"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    QUERY_COUNT_HEADER: bool = os.getenv("QUERY_COUNT_HEADER", "False").lower() == "true"  # X-Query-Count per response
+    
+    # Sampling profiler (off until an admin starts it via /admin/profiler/start)
+    PROFILER_INTERVAL_MS: int = int(os.getenv("PROFILER_INTERVAL_MS", "10"))  # default sampling interval
+    PROFILER_MAX_STACKS: int = int(os.getenv("PROFILER_MAX_STACKS", "20000"))  # distinct stacks kept
+    
+    # Response compression (brotli when installed and accepted, else gzip)
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))  # smaller bodies are sent as is
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # 0-11; 4 is fast
+    COMPRESSION_THREAD_MIN_BYTES: int = int(os.getenv("COMPRESSION_THREAD_MIN_BYTES", "65536"))  # larger bodies are compressed in the threadpool
+    
+    # Quiz paper cache (static question/option payload shared across attempts)
+    PAPER_CACHE_SIZE: int = int(os.getenv("PAPER_CACHE_SIZE", "256"))  # papers kept per process
+    PAPER_CACHE_REDIS: bool = os.getenv("PAPER_CACHE_REDIS", "False").lower() == "true"  # share papers via REDIS_URL
+    PAPER_CACHE_TTL_SECONDS: int = int(os.getenv("PAPER_CACHE_TTL_SECONDS", "86400"))
+    ATTEMPT_PAPER_CACHE_SIZE: int = int(os.getenv("ATTEMPT_PAPER_CACHE_SIZE", "10000"))  # drawn papers (pooled quizzes)
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "5000"))  # serialized results of completed attempts
+    
+    # Question search: "fulltext" (MySQL FULLTEXT indexes), "memory" (in-process index) or "auto" by dialect
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "auto")
+    
+    # Near-duplicate questions: estimated text similarity (0-1) at which a new question is flagged
+    DUPLICATE_THRESHOLD: float = float(os.getenv("DUPLICATE_THRESHOLD", "0.8"))
+    
+    # Answer storage for new attempts: "rows" (one quiz_responses row per question) or "packed"
+    ANSWER_SHEET_MODE: str = os.getenv("ANSWER_SHEET_MODE", "rows")
+    
+    # Archival of completed attempts to the *_archive tables
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+    ARCHIVE_CHUNK_SIZE: int = int(os.getenv("ARCHIVE_CHUNK_SIZE", "500"))  # attempts per transaction
+    
+    # Pre-provisioned attempts for scheduled exams
+    PROVISION_CHUNK_SIZE: int = int(os.getenv("PROVISION_CHUNK_SIZE", "500"))  # users per transaction
+    
+    # Regrading completed attempts after an answer key change
+    REGRADE_CHUNK_SIZE: int = int(os.getenv("REGRADE_CHUNK_SIZE", "500"))  # attempts per transaction
+    
+    # Queued submissions (group-commit writer behind /submit-async)
+    SUBMISSION_QUEUE_ENABLED: bool = os.getenv("SUBMISSION_QUEUE_ENABLED", "False").lower() == "true"
+    SUBMISSION_JOURNAL_DIR: str = os.getenv("SUBMISSION_JOURNAL_DIR", "/var/lib/quiz-app/journal")
+    SUBMISSION_BATCH_SIZE: int = int(os.getenv("SUBMISSION_BATCH_SIZE", "200"))  # attempts per transaction
+    SUBMISSION_BATCH_WINDOW_MS: int = int(os.getenv("SUBMISSION_BATCH_WINDOW_MS", "50"))  # wait to fill a batch
+    SUBMISSION_RETRY_MAX_SECONDS: float = float(os.getenv("SUBMISSION_RETRY_MAX_SECONDS", "30"))  # backoff cap on DB errors
+    SUBMISSION_STATUS_CACHE_SIZE: int = int(os.getenv("SUBMISSION_STATUS_CACHE_SIZE", "50000"))
+    
+    # Idempotency-Key handling on the user router's mutating routes
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "20000"))  # stored responses per process
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+    IDEMPOTENCY_REDIS: bool = os.getenv("IDEMPOTENCY_REDIS", "False").lower() == "true"  # share via REDIS_URL
+    
+    # Batched calls to user routes (/user/batch): one auth, rate-limit check and DB session per batch
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+    
+    # Live attempt events (SSE stream for admins)
+    EVENTS_REDIS: bool = os.getenv("EVENTS_REDIS", "False").lower() == "true"  # fan out across workers via REDIS_URL
+    EVENTS_SUBSCRIBER_BUFFER: int = int(os.getenv("EVENTS_SUBSCRIBER_BUFFER", "1000"))  # events held per slow client
+    EVENTS_KEEPALIVE_SECONDS: int = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+    
+    # Transactional outbox (opt-in; needs migration 0011): attempt completions are relayed after commit to OUTBOX_CONSUMERS (inprocess, redis, file)
+    OUTBOX_ENABLED: bool = os.getenv("OUTBOX_ENABLED", "False").lower() == "true"
+    OUTBOX_CONSUMERS: str = os.getenv("OUTBOX_CONSUMERS", "inprocess")  # comma-separated
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))  # events per relay transaction
+    OUTBOX_POLL_SECONDS: float = float(os.getenv("OUTBOX_POLL_SECONDS", "1.0"))  # idle wait between scans
+    OUTBOX_RETRY_SECONDS: float = float(os.getenv("OUTBOX_RETRY_SECONDS", "5.0"))  # pause after a failed delivery
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))  # then the event is parked
+    OUTBOX_MAX_AGE_MINUTES: int = int(os.getenv("OUTBOX_MAX_AGE_MINUTES", "60"))  # failures count toward parking past this age even when nothing gets through
+    OUTBOX_RETENTION_HOURS: int = int(os.getenv("OUTBOX_RETENTION_HOURS", "24"))  # delivered events are purged after
+    OUTBOX_REDIS_STREAM: str = os.getenv("OUTBOX_REDIS_STREAM", "quiz_outbox")
+    OUTBOX_REDIS_STREAM_MAXLEN: int = int(os.getenv("OUTBOX_REDIS_STREAM_MAXLEN", "100000"))  # approximate trim
+    OUTBOX_FILE_PATH: str = os.getenv("OUTBOX_FILE_PATH", "/var/lib/quiz-app/outbox/events.jsonl")
     
     # Rate Limiting
     RATE_LIMIT_PER_SECOND: int = 100  # As per requirements: 100 requests per second
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL")  # Redis for rate limiting
+    
+    # Pre-auth rate limiting (ASGI level, before any DB or bcrypt work)
+    IP_RATE_LIMIT_PER_SECOND: int = int(os.getenv("IP_RATE_LIMIT_PER_SECOND", "200"))
+    # login/register per IP; high enough for a classroom behind one NAT logging in at exam open (the per-username limit stops guessing)
+    AUTH_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("AUTH_RATE_LIMIT_PER_MINUTE", "300"))
+    AUTH_USERNAME_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("AUTH_USERNAME_RATE_LIMIT_PER_MINUTE", "10"))
+    TRUST_FORWARDED_FOR: bool = os.getenv("TRUST_FORWARDED_FOR", "False").lower() == "true"  # behind a proxy
+    FORWARDED_FOR_HOPS: int = int(os.getenv("FORWARDED_FOR_HOPS", "1"))  # trusted proxies appending to X-Forwarded-For
+    
+    # Admission control at exam open: new attempts need a ticket from /quizzes/{id}/admission
+    ADMISSION_CONTROL: bool = os.getenv("ADMISSION_CONTROL", "False").lower() == "true"
+    ADMISSION_RATE_PER_SECOND: float = float(os.getenv("ADMISSION_RATE_PER_SECOND", "50"))  # per quiz
+    ADMISSION_BURST: int = int(os.getenv("ADMISSION_BURST", "100"))  # tickets admitted without waiting
+    ADMISSION_TICKET_TTL_SECONDS: int = int(os.getenv("ADMISSION_TICKET_TTL_SECONDS", "600"))  # after admit time
+    
+    # In-flight requests per route class and worker (0 = unlimited); excess waits, then gets 503
+    CONCURRENCY_LIMIT_AUTH: int = int(os.getenv("CONCURRENCY_LIMIT_AUTH", "16"))  # login/register (bcrypt)
+    CONCURRENCY_LIMIT_START: int = int(os.getenv("CONCURRENCY_LIMIT_START", "16"))
+    CONCURRENCY_LIMIT_QUESTIONS: int = int(os.getenv("CONCURRENCY_LIMIT_QUESTIONS", "32"))
+    CONCURRENCY_LIMIT_SUBMIT: int = int(os.getenv("CONCURRENCY_LIMIT_SUBMIT", "32"))
+    CONCURRENCY_QUEUE_SECONDS: float = float(os.getenv("CONCURRENCY_QUEUE_SECONDS", "10"))  # wait for a slot
 
 settings = Settings()
\ No newline at end of file
@@ -1,24 +1,71 @@
+from fastapi import Request, Response
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.sqlite import create_sqlite_engine
 
 # Database URL
-DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+if settings.DB_BACKEND == "sqlite":
+    DATABASE_URL = "sqlite://" if settings.SQLITE_PATH == ":memory:" else f"sqlite:///{settings.SQLITE_PATH}"
+else:
+    DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
 
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+# Read replica URL (same credentials and schema as the primary; MySQL only)
+READ_DATABASE_URL = (
+    f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_READ_HOST}:{settings.DB_READ_PORT}/{settings.DB_NAME}"
+    if settings.DB_READ_HOST and settings.DB_BACKEND != "sqlite" else None
+)
 
-# Create session factory
+# Create SQLAlchemy engine (connections are opened on first use, not here)
+engine = create_sqlite_engine(settings.SQLITE_PATH) if settings.DB_BACKEND == "sqlite" else create_engine(DATABASE_URL)
+
+# Replica engine; falls back to the primary when no replica is configured
+read_engine = create_engine(READ_DATABASE_URL) if READ_DATABASE_URL else engine
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Close pooled connections (on shutdown)
+def dispose_engines():
+    engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
 
 # Create base class for SQLAlchemy models
 Base = declarative_base()
 
+# Cookie/header that pins a client's reads to the primary right after it writes
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
 # Dependency for database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for read-only routes; served by the replica unless the client recently wrote
+def get_read_db(request: Request):
+    if read_engine is engine or request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(READ_PRIMARY_HEADER):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Read-your-writes escape hatch: route this client's reads to the primary for a while
+def mark_primary_reads(response: Response):
+    if read_engine is engine:
+        return
+    response.set_cookie(
+        READ_PRIMARY_COOKIE, "1",
+        max_age=settings.READ_YOUR_WRITES_SECONDS,
+        httponly=True
+    )
+    response.headers[READ_PRIMARY_HEADER] = str(settings.READ_YOUR_WRITES_SECONDS)
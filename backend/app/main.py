@@ -1,21 +1,74 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from app.routers import auth, admin, user
 from app.config import settings
+from app.database import dispose_engines
 from app.security.rate_limiter import rate_limiter
+from app.security.pre_auth_limiter import PreAuthRateLimitMiddleware
+from app.security.admission import ConcurrencyLimitMiddleware
+from app.utils.query_counter import QueryCountMiddleware
+from app.utils.compression import CompressionMiddleware
+from app.utils.profiler import ProfilingMiddleware, instrument
+from app.utils.serialization import FastJSONResponse
+from app.utils.migrations import upgrade_to_head
+from app.utils.submission_queue import submission_queue
+from app.utils.outbox import outbox_relay
+from app.utils.warmup import readiness, ping_database, start_warm_up
 
-# Create tables in the database
-Base.metadata.create_all(bind=engine)
+# Startup and shutdown; nothing connects to the database or Redis at import time
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by migrations (`alembic upgrade head`); AUTO_MIGRATE applies them at startup
+    if settings.AUTO_MIGRATE:
+        upgrade_to_head()
+    
+    # Background writer for queued submissions; drains the queue on shutdown
+    if settings.SUBMISSION_QUEUE_ENABLED:
+        submission_queue.start()
+    
+    # Deliver attempt-completion events from the outbox table to the configured consumers
+    if settings.OUTBOX_ENABLED:
+        outbox_relay.start()
+    
+    # Warm connections and caches for upcoming quizzes; /health/ready fails until done
+    start_warm_up()
+    
+    yield
+    
+    submission_queue.stop()
+    outbox_relay.stop()
+    dispose_engines()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Online Quiz System",
     description="A FastAPI-based online quiz system with user authentication and quiz management",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
-# CORS middleware for frontend connections
+# Mark requests sampled by the admin-controlled profiler (a pass-through while it is off)
+app.add_middleware(ProfilingMiddleware)
+
+# Compress larger responses with brotli or gzip, as negotiated by Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
+# Cap in-flight requests per route class (login, start, questions, submit); excess queues briefly, then 503
+app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Shed floods by client IP (and username on /login, /register) before auth or DB work
+app.add_middleware(PreAuthRateLimitMiddleware)
+
+# Report SQL statements per request (for spotting per-row query regressions)
+if settings.DEBUG or settings.QUERY_COUNT_HEADER:
+    app.add_middleware(QueryCountMiddleware)
+
+# CORS middleware for frontend connections; added last so it is outermost and the limiters'
+# 429/413/503 responses carry CORS headers too (browsers otherwise report an opaque CORS error)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify your frontend URL
@@ -49,4 +102,23 @@ def root():
         "message": "Welcome to the Online Quiz System API",
         "documentation": "/docs",
         "version": "1.0.0"
-    }
\ No newline at end of file
+    }
+
+# Liveness: the process is up and serving requests
+@app.get("/health/live")
+def health_live():
+    return {"status": "ok"}
+
+# Readiness: warm-up has finished and the database answers; take traffic only then
+@app.get("/health/ready")
+def health_ready():
+    if not readiness.ready:
+        return JSONResponse(status_code=503, content={"status": "warming", **readiness.to_dict()})
+    try:
+        ping_database()
+    except SQLAlchemyError:
+        return JSONResponse(status_code=503, content={"status": "database unavailable", **readiness.to_dict()})
+    return {"status": "ok", **readiness.to_dict()}
+
+# Let the profiler see sync handlers running in threadpool workers
+instrument(app)
@@ -0,0 +1,2 @@
+# Import every model module so Base.metadata is complete (used by migrations)
+from app.models import user, question, quiz, attempt, archive, outbox  # noqa: F401
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, DateTime, Boolean, Enum, LargeBinary, Index
+from app.database import Base
+from app.models.attempt import AttemptStatus
+
+# Cold storage for completed attempts moved out of quiz_attempts/quiz_responses
+# by app.utils.archival. Rows keep their original ids; there are no foreign keys
+# so archiving never contends with writes on the hot tables.
+
+class ArchivedQuizAttempt(Base):
+    __tablename__ = "quiz_attempts_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    quiz_id = Column(Integer, nullable=False)
+    status = Column(Enum(AttemptStatus), default=AttemptStatus.completed)
+    start_time = Column(DateTime)
+    end_time = Column(DateTime, nullable=True)
+    score = Column(Integer, default=0)
+    answer_sheet = Column(LargeBinary, nullable=True)
+    # Pooled quizzes: the attempt's draw is reproducible from this seed and tag assignment high-water mark
+    paper_seed = Column(Integer, nullable=True)
+    paper_high_water = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_quiz_attempts_archive_user_quiz', 'user_id', 'quiz_id'),
+        Index('ix_quiz_attempts_archive_quiz', 'quiz_id'),
+    )
+
+
+class ArchivedQuizResponse(Base):
+    __tablename__ = "quiz_responses_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    attempt_id = Column(Integer, nullable=False)
+    question_id = Column(Integer, nullable=False)
+    selected_option_id = Column(Integer, nullable=True)
+    is_correct = Column(Boolean, default=False)
+    marks_obtained = Column(Integer, default=0)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_quiz_responses_archive_attempt', 'attempt_id'),
+    )
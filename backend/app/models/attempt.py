@@ -1,11 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, LargeBinary, func, UniqueConstraint, Index, Computed
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
 
-class AttemptStatus(enum.Enum):
+class AttemptStatus(str, enum.Enum):
     in_progress = "in_progress"
     completed = "completed"
+    scheduled = "scheduled"  # pre-provisioned by an admin; start_quiz flips it to in_progress
 
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
@@ -17,10 +18,20 @@ class QuizAttempt(Base):
     start_time = Column(DateTime, default=func.now())
     end_time = Column(DateTime, nullable=True)
     score = Column(Integer, default=0)
-
-    # Constraints - Only one in-progress attempt per user per quiz
+    # Packed (question_id, option_id) pairs when ANSWER_SHEET_MODE is "packed"; NULL for row-per-response attempts
+    answer_sheet = Column(LargeBinary, nullable=True)
+    # Pooled quizzes: the attempt's draw is reproducible from this seed and tag assignment high-water mark
+    paper_seed = Column(Integer, nullable=True)
+    paper_high_water = Column(Integer, nullable=True)
+    # The status while the attempt is open, NULL once completed (maintained by the database)
+    open_status = Column(String(16), Computed("CASE WHEN status = 'completed' THEN NULL ELSE status END"))
+
+    # Constraints - Only one in-progress (and one scheduled) attempt per user per quiz; completed attempts
+    # have a NULL open_status, which unique keys ignore, so a quiz can be retaken any number of times
     __table_args__ = (
-        UniqueConstraint('user_id', 'quiz_id', 'status', name='unique_user_quiz_attempt'),
+        UniqueConstraint('user_id', 'quiz_id', 'open_status', name='unique_user_quiz_open_attempt'),
+        Index('ix_quiz_attempts_quiz_status', 'quiz_id', 'status'),
+        Index('ix_quiz_attempts_user_history', 'user_id', 'id'),
     )
 
     # Relationships
@@ -42,6 +53,7 @@ class QuizResponse(Base):
     # Constraints - Only one response per question per attempt
     __table_args__ = (
         UniqueConstraint('attempt_id', 'question_id', name='unique_attempt_question'),
+        Index('ix_quiz_responses_attempt_selection', 'attempt_id', 'question_id', 'selected_option_id'),
     )
 
     # Relationships
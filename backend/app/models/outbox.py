@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+from app.database import Base
+
+# Events written in the same transaction as the state change they describe and
+# delivered afterwards by app.utils.outbox.OutboxRelay (at least once).
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    delivered_at = Column(DateTime, nullable=True)
+    # Failed deliveries; the event is parked once this reaches OUTBOX_MAX_ATTEMPTS
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(512), nullable=True)
+
+    # Indexes - the relay scans undelivered events in id order
+    __table_args__ = (
+        Index('ix_outbox_events_pending', 'delivered_at', 'attempts', 'id'),
+    )
@@ -1,16 +1,37 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Question(Base):
     __tablename__ = "questions"
 
+    # A question row and its options never change once written (apart from which options are
+    # correct, an answer-key correction that regrading applies): editing inserts a new version.
+    # Quiz mappings, draws and responses reference the version row, so anything keyed by its id
+    # can be cached for good
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     question = Column(Text, nullable=False)
+    text_hash = Column(String(64), nullable=True, index=True)  # sha256 of the normalized question text
+    minhash = Column(LargeBinary, nullable=True)  # MinHash signature for near-duplicate detection
+    lineage_id = Column(Integer, nullable=True)  # id of the first version; NULL on the first version itself
+    version = Column(Integer, nullable=False, default=1)
+    superseded_by = Column(Integer, ForeignKey("questions.id"), nullable=True)  # next version; NULL while current
+
+    # Indexes
+    __table_args__ = (
+        UniqueConstraint('lineage_id', 'version', name='unique_question_lineage_version'),
+        Index('ix_questions_question_fulltext', 'question', mysql_prefix='FULLTEXT'),
+    )
 
     # Relationships
-    options = relationship("QuestionOption", back_populates="question", cascade="all, delete-orphan")
+    options = relationship("QuestionOption", back_populates="question", cascade="all, delete-orphan", order_by="QuestionOption.id")
     quiz_questions = relationship("QuizQuestion", back_populates="question")
+    tags = relationship("QuestionTag", back_populates="question")
+
+    # Versions of one question share a lineage: the first version's id
+    @property
+    def lineage(self) -> int:
+        return self.lineage_id or self.id
 
 
 class QuestionOption(Base):
@@ -21,6 +42,42 @@ class QuestionOption(Base):
     option = Column(Text, nullable=False)
     is_correct = Column(Boolean, default=False)
 
+    # Indexes
+    __table_args__ = (
+        Index('ix_question_options_question_correct', 'question_id', 'is_correct'),
+        Index('ix_question_options_option_fulltext', 'option', mysql_prefix='FULLTEXT'),
+    )
+
     # Relationships
     question = relationship("Question", back_populates="options")
-    responses = relationship("QuizResponse", back_populates="selected_option")
\ No newline at end of file
+    responses = relationship("QuizResponse", back_populates="selected_option")
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+    # Relationships
+    questions = relationship("QuestionTag", back_populates="tag")
+
+
+class QuestionTag(Base):
+    __tablename__ = "question_tags"
+
+    # Tag assignments are append-only: a pooled attempt draws from the assignments
+    # up to the id it recorded, so later tagging never changes an earlier draw
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False)
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('question_id', 'tag_id', name='unique_question_tag'),
+        Index('ix_question_tags_tag', 'tag_id'),
+    )
+
+    # Relationships
+    question = relationship("Question", back_populates="tags")
+    tag = relationship("Tag", back_populates="questions")
\ No newline at end of file
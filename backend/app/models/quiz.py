@@ -1,3 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class Quiz(Base):
+    __tablename__ = "quizzes"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    num_questions = Column(Integer, nullable=False)
+    total_score = Column(Integer, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    starts_at = Column(DateTime, nullable=True)  # scheduled start; workers warm caches ahead of it
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # paper/answer-key version; incremented on change
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_quizzes_starts_at', 'starts_at'),
+    )
+
+    # Relationships
+    creator = relationship("User", back_populates="quizzes")
+    quiz_questions = relationship("QuizQuestion", back_populates="quiz", cascade="all, delete-orphan")
+    quiz_attempts = relationship("QuizAttempt", back_populates="quiz")
+    pools = relationship("QuizPool", back_populates="quiz", cascade="all, delete-orphan", order_by="QuizPool.id")
+
+    # QuizDetail exposes the mapped questions as `questions`
+    @property
+    def questions(self):
+        return self.quiz_questions
+
+
 class QuizQuestion(Base):
     __tablename__ = "quiz_questions"
 
@@ -11,8 +47,29 @@ class QuizQuestion(Base):
     __table_args__ = (
         UniqueConstraint('quiz_id', 'question_id', name='unique_quiz_question'),
         UniqueConstraint('quiz_id', 'question_number', name='unique_quiz_question_number'),
+        Index('ix_quiz_questions_quiz_question_marks', 'quiz_id', 'question_id', 'marks'),
     )
 
     # Relationships
     quiz = relationship("Quiz", back_populates="quiz_questions")
-    question = relationship("Question", back_populates="quiz_questions")
\ No newline at end of file
+    question = relationship("Question", back_populates="quiz_questions")
+
+
+class QuizPool(Base):
+    __tablename__ = "quiz_pools"
+
+    # A pooled quiz draws num_questions questions tagged tag_id for every attempt
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False)
+    num_questions = Column(Integer, nullable=False)
+    marks = Column(Integer, nullable=False)  # per question drawn
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_quiz_pools_quiz', 'quiz_id'),
+    )
+
+    # Relationships
+    quiz = relationship("Quiz", back_populates="pools")
+    tag = relationship("Tag")
\ No newline at end of file
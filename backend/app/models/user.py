@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, func
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Float, ForeignKey, func, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -18,6 +18,7 @@ class User(Base):
     quiz_attempts = relationship("QuizAttempt", back_populates="user")
     tokens = relationship("UserToken", back_populates="user")
     rate_limit = relationship("RateLimit", uselist=False, back_populates="user")
+    stats = relationship("UserStats", uselist=False, back_populates="user")
 
 
 class UserToken(Base):
@@ -30,6 +31,11 @@ class UserToken(Base):
     expires_at = Column(DateTime, nullable=False)
     is_active = Column(Boolean, default=True)
 
+    # Indexes
+    __table_args__ = (
+        Index('ix_user_tokens_user_active', 'user_id', 'is_active'),
+    )
+
     # Relationships
     user = relationship("User", back_populates="tokens")
 
@@ -43,4 +49,22 @@ class RateLimit(Base):
     last_reset_time = Column(DateTime, default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="rate_limit")
\ No newline at end of file
+    user = relationship("User", back_populates="rate_limit")
+
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    # One row per user, updated by app.utils.user_stats as attempts complete
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, autoincrement=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    total_score = Column(Integer, nullable=False, default=0)
+    total_possible = Column(Integer, nullable=False, default=0)
+    best_score = Column(Integer, nullable=False, default=0)
+    best_percentage = Column(Float, nullable=False, default=0.0)
+    total_time_seconds = Column(Integer, nullable=False, default=0)
+    last_attempt_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="stats")
\ No newline at end of file
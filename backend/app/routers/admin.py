@@ -1,24 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
+from app.config import settings
+from app.database import get_db, get_read_db, SessionLocal
 from app.models.user import User
-from app.models.quiz import Quiz, QuizQuestion
-from app.models.question import Question, QuestionOption
+from app.models.quiz import Quiz, QuizQuestion, QuizPool
+from app.models.question import Question, QuestionOption, Tag, QuestionTag
 from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
-from app.schemas.quiz import Quiz as QuizSchema, QuizCreate, QuizDetail, QuizQuestionsRequest
-from app.schemas.question import Question as QuestionSchema, QuestionCreate
+from app.models.archive import ArchivedQuizAttempt
+from app.models.outbox import OutboxEvent
+from app.schemas.quiz import Quiz as QuizSchema, QuizCreate, QuizDetail, QuizQuestionsRequest, QuizPoolsRequest, QuizScheduleRequest
+from app.schemas.question import Question as QuestionSchema, QuestionCreate, QuestionSearchResult, QuestionImportRequest, QuestionImportResult, QuestionDuplicateGroup, Tag as TagSchema, TagSummary, QuestionTagsRequest, QuestionCorrectOptionsRequest, QuestionVersionResult
 from app.schemas.user import User as UserSchema
+from app.schemas.profiler import ProfilerStart
 from app.schemas.attempt import QuizAttempt as QuizAttemptSchema, QuizResponseDetail
 from app.security.jwt import get_current_admin
 from app.security.rate_limiter import rate_limiter
+from app.utils.paper_cache import invalidate_paper
+from app.utils.grading import invalidate_answer_key
+from app.utils.question_pools import answer_key_for_attempt, tag_assignments, draw, load_pools, new_draw, PoolTooSmall
+from app.utils.answer_sheet import sheet_responses
+from app.utils.archival import archive_completed_attempts, attempt_responses
+from app.utils.jobs import jobs
+from app.utils.search import search_questions, question_index
+from app.utils.dedup import fingerprint, find_duplicates, duplicate_index, DuplicateIndex
+from app.utils.events import event_broker, QuizCounters, format_sse
+from app.utils.regrade import regrade, affected_quizzes
+from app.utils.provisioning import schedule_attempts
+from app.utils.profiler import profiler
+from app.utils.outbox import outbox_relay
 
 router = APIRouter(tags=["Admin"], dependencies=[Depends(rate_limiter)])
 
+# Eager-load options for QuizDetail responses (quiz -> mappings -> question -> options, and pools)
+def _quiz_detail_options():
+    return (
+        selectinload(Quiz.quiz_questions).joinedload(QuizQuestion.question).selectinload(Question.options),
+        selectinload(Quiz.pools),
+    )
+
+# Attempts are tied to the quiz's paper (pooled ones redraw it from the pool definitions), so it must not change under them
+def _has_attempts(db: Session, quiz_id: int) -> bool:
+    return bool(
+        db.query(QuizAttempt.id).filter(QuizAttempt.quiz_id == quiz_id).first()
+        or db.query(ArchivedQuizAttempt.id).filter(ArchivedQuizAttempt.quiz_id == quiz_id).first()
+    )
+
 # Get all quizzes
 @router.get("/quizzes", response_model=List[QuizSchema])
 def get_quizzes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: User = Depends(get_current_admin)
 ):
     quizzes = db.query(Quiz).all()
@@ -28,10 +63,10 @@ def get_quizzes(
 @router.get("/quizzes/{quiz_id}", response_model=QuizDetail)
 def get_quiz(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: User = Depends(get_current_admin)
 ):
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    quiz = db.query(Quiz).options(*_quiz_detail_options()).filter(Quiz.id == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     return quiz
@@ -49,6 +84,7 @@ def create_quiz(
         num_questions=quiz.num_questions,
         total_score=quiz.total_score,
         duration_minutes=quiz.duration_minutes,
+        starts_at=quiz.starts_at,
         created_by=current_admin.id
     )
     
@@ -85,22 +121,16 @@ def map_questions_to_quiz(
     if len(existing_questions) != len(question_ids):
         raise HTTPException(status_code=404, detail="One or more questions not found")
     
-    # Clear existing question mappings
+    # Attempts (scheduled ones included) hold responses for the current paper, drawn from its mapping or pools
+    if _has_attempts(db, quiz_id):
+        raise HTTPException(status_code=400, detail="Questions cannot be changed once the quiz has attempts")
+    
+    # Clear existing question mappings (a mapped quiz no longer draws from pools)
     db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).delete()
+    db.query(QuizPool).filter(QuizPool.quiz_id == quiz_id).delete()
     
     # Create new question mappings
-    total_marks = 0
-    quiz_questions = []
-    
-    for q in questions_request.questions:
-        quiz_question = QuizQuestion(
-            quiz_id=quiz_id,
-            question_id=q.question_id,
-            question_number=q.question_number,
-            marks=q.marks
-        )
-        total_marks += q.marks
-        quiz_questions.append(quiz_question)
+    total_marks = sum(q.marks for q in questions_request.questions)
     
     # Validate total marks match quiz configuration
     if total_marks != quiz.total_score:
@@ -109,64 +139,421 @@ def map_questions_to_quiz(
             detail=f"Total marks must match quiz configuration (expected {quiz.total_score}, got {total_marks})"
         )
     
-    db.add_all(quiz_questions)
+    # One executemany INSERT for the whole mapping
+    db.execute(insert(QuizQuestion), [
+        {
+            "quiz_id": quiz_id,
+            "question_id": q.question_id,
+            "question_number": q.question_number,
+            "marks": q.marks
+        }
+        for q in questions_request.questions
+    ])
+    
+    # New mapping means a new paper version
+    quiz.version = Quiz.version + 1
     db.commit()
+    invalidate_paper(quiz_id)
+    invalidate_answer_key(quiz_id)
     
-    # Refresh quiz to get updated relationships
-    db.refresh(quiz)
-    return quiz
+    # Reload quiz with its updated question mappings
+    db.expire_all()
+    return db.query(Quiz).options(*_quiz_detail_options()).filter(Quiz.id == quiz_id).first()
+
+# Draw each attempt's questions from tagged pools instead of a fixed mapping
+@router.post("/quizzes/{quiz_id}/pools", response_model=QuizDetail)
+def set_quiz_pools(
+    quiz_id: int,
+    pools_request: QuizPoolsRequest,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    # Check if quiz exists
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    # Attempts redraw their paper from the pool definitions, so those must not change under them
+    if _has_attempts(db, quiz_id):
+        raise HTTPException(status_code=400, detail="Pools cannot be changed once the quiz has attempts")
+    
+    # Check the pools add up to the quiz configuration
+    num_questions = sum(pool.num_questions for pool in pools_request.pools)
+    if num_questions != quiz.num_questions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Number of questions must match quiz configuration (expected {quiz.num_questions})"
+        )
+    total_marks = sum(pool.num_questions * pool.marks for pool in pools_request.pools)
+    if total_marks != quiz.total_score:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Total marks must match quiz configuration (expected {quiz.total_score}, got {total_marks})"
+        )
+    
+    # Check if all tags exist
+    tag_names = {pool.tag.strip().lower() for pool in pools_request.pools}
+    tags = {tag.name: tag for tag in db.query(Tag).filter(Tag.name.in_(tag_names)).all()}
+    if len(tags) != len(tag_names):
+        raise HTTPException(status_code=404, detail="One or more tags not found")
+    
+    quiz_pools = [
+        QuizPool(quiz_id=quiz_id, tag_id=tags[pool.tag.strip().lower()].id, num_questions=pool.num_questions, marks=pool.marks)
+        for pool in pools_request.pools
+    ]
+    
+    # Check the pools are big enough with a trial draw
+    tag_assignments.catch_up(db)
+    try:
+        draw(quiz_pools, 0, tag_assignments.high_water)
+    except PoolTooSmall as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Replace the fixed mapping and any previous pools
+    db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).delete()
+    db.query(QuizPool).filter(QuizPool.quiz_id == quiz_id).delete()
+    db.add_all(quiz_pools)
+    
+    quiz.version = Quiz.version + 1
+    db.commit()
+    invalidate_paper(quiz_id)
+    invalidate_answer_key(quiz_id)
+    
+    db.expire_all()
+    return db.query(Quiz).options(*_quiz_detail_options()).filter(Quiz.id == quiz_id).first()
+
+# Get all tags with the number of questions tagged
+@router.get("/tags", response_model=List[TagSummary])
+def get_tags(
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    rows = db.query(Tag, func.count(QuestionTag.id)).outerjoin(
+        QuestionTag, QuestionTag.tag_id == Tag.id
+    ).group_by(Tag.id).order_by(Tag.name).all()
+    return [{"id": tag.id, "name": tag.name, "num_questions": count} for tag, count in rows]
+
+# Tag a question (tags are created on first use; tagging is append-only)
+@router.post("/questions/{question_id}/tags", response_model=List[TagSchema])
+def tag_question(
+    question_id: int,
+    tags_request: QuestionTagsRequest,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    # Check if question exists
+    question = db.query(Question).filter(Question.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    # Pools draw the latest version of a question; a superseded one cannot join new pools
+    if question.superseded_by is not None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Question has been superseded by question {question.superseded_by}; tag the current version"
+        )
+    
+    names = {name.strip().lower() for name in tags_request.tags if name.strip()}
+    tags = {tag.name: tag for tag in db.query(Tag).filter(Tag.name.in_(names)).all()}
+    new_tags = [Tag(name=name) for name in names - tags.keys()]
+    db.add_all(new_tags)
+    db.flush()  # Flush to get the IDs
+    tags.update((tag.name, tag) for tag in new_tags)
+    
+    tagged = {
+        tag_id for (tag_id,) in db.query(QuestionTag.tag_id).filter(QuestionTag.question_id == question_id).all()
+    }
+    db.add_all([
+        QuestionTag(question_id=question_id, tag_id=tag.id)
+        for tag in tags.values() if tag.id not in tagged
+    ])
+    db.commit()
+    
+    return db.query(Tag).join(QuestionTag, QuestionTag.tag_id == Tag.id).filter(
+        QuestionTag.question_id == question_id
+    ).order_by(Tag.name).all()
 
-# Get all questions
+# Get all questions (current versions unless ?include_superseded=true)
 @router.get("/questions", response_model=List[QuestionSchema])
 def get_questions(
-    db: Session = Depends(get_db),
+    include_superseded: bool = False,
+    db: Session = Depends(get_read_db),
     current_admin: User = Depends(get_current_admin)
 ):
-    questions = db.query(Question).all()
+    query = db.query(Question).options(selectinload(Question.options))
+    if not include_superseded:
+        query = query.filter(Question.superseded_by.is_(None))
+    questions = query.all()
     return questions
 
+# Search questions by question and option text, best matches first
+@router.get("/questions/search", response_model=QuestionSearchResult)
+def search_question_bank(
+    q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    total, hits = search_questions(db, q, limit, offset)
+    
+    # Load the page of questions with their options in one round of queries
+    questions = {
+        question.id: question
+        for question in db.query(Question).options(selectinload(Question.options)).filter(
+            Question.id.in_([question_id for question_id, _ in hits])
+        ).all()
+    }
+    results = [
+        {
+            "id": question_id,
+            "question": questions[question_id].question,
+            "version": questions[question_id].version,
+            "lineage_id": questions[question_id].lineage_id,
+            "superseded_by": questions[question_id].superseded_by,
+            "options": questions[question_id].options,
+            "score": score
+        }
+        for question_id, score in hits if question_id in questions
+    ]
+    
+    return {"total": total, "limit": limit, "offset": offset, "results": results}
+
+# Build an unsaved question with its options and duplicate-detection fingerprint
+def _new_question(question: QuestionCreate) -> Question:
+    db_question = Question(
+        question=question.question,
+        options=[
+            QuestionOption(option=option.option, is_correct=option.is_correct)
+            for option in question.options
+        ]
+    )
+    fingerprint(db_question)
+    return db_question
+
+def _duplicates(matches) -> List[dict]:
+    return [{"question_id": question_id, "similarity": score} for question_id, score in matches]
+
 # Create a new question
 @router.post("/questions", response_model=QuestionSchema)
 def create_question(
     question: QuestionCreate,
+    allow_duplicate: bool = False,
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
-    # Create question
-    db_question = Question(question=question.question)
+    # Validate at least one correct option
+    if not any(option.is_correct for option in question.options):
+        raise HTTPException(status_code=400, detail="Question must have at least one correct option")
+    
+    db_question = _new_question(question)
+    
+    # Reject exact and near duplicates unless the admin confirms
+    if not allow_duplicate:
+        duplicates = find_duplicates(db, [db_question])[0]
+        if duplicates:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "Question duplicates existing questions; resend with allow_duplicate=true to keep it",
+                    "duplicates": _duplicates(duplicates)
+                }
+            )
+    
     db.add(db_question)
-    db.flush()  # Flush to get the ID
+    db.commit()
+    db.refresh(db_question)
     
-    # Create options
-    has_correct_option = False
-    db_options = []
+    # Searchable and checked for duplicates right away on this worker
+    question_index.add_question(db_question)
+    duplicate_index.add(db_question.id, db_question.minhash)
     
-    for option in question.options:
-        db_option = QuestionOption(
-            question_id=db_question.id,
-            option=option.option,
-            is_correct=option.is_correct
+    return db_question
+
+# Edit a question: the edit becomes a new version, the edited row and its options stay as they are
+@router.put("/questions/{question_id}", response_model=QuestionVersionResult)
+def edit_question(
+    question_id: int,
+    question: QuestionCreate,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    # Locked until commit, so a concurrent edit waits here and then sees the row superseded
+    current = db.query(Question).filter(Question.id == question_id).with_for_update().first()
+    if not current:
+        raise HTTPException(status_code=404, detail="Question not found")
+    if current.superseded_by is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Question has been superseded by question {current.superseded_by}; edit the current version"
         )
-        if option.is_correct:
-            has_correct_option = True
-        db_options.append(db_option)
     
     # Validate at least one correct option
-    if not has_correct_option:
-        db.rollback()
+    if not any(option.is_correct for option in question.options):
         raise HTTPException(status_code=400, detail="Question must have at least one correct option")
     
-    db.add_all(db_options)
+    db_question = _new_question(question)
+    db_question.lineage_id = current.lineage
+    db_question.version = current.version + 1
+    db.add(db_question)
+    try:
+        db.flush()  # Flush to get the ID
+    except IntegrityError:
+        # Without row locks (SQLite) the losing edit collides on (lineage_id, version) instead
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Question was edited concurrently; retry")
+    
+    # Only the first of two concurrent edits supersedes the current version
+    superseded = db.execute(
+        update(Question).where(
+            Question.id == question_id,
+            Question.superseded_by.is_(None)
+        ).values(superseded_by=db_question.id).execution_options(synchronize_session=False)
+    ).rowcount
+    if not superseded:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Question was edited concurrently; retry")
+    
+    # The new version joins the edited one's pools (new draws take it in the same slot)
+    db.add_all([
+        QuestionTag(question_id=db_question.id, tag_id=tag_id)
+        for (tag_id,) in db.query(QuestionTag.tag_id).filter(QuestionTag.question_id == question_id).all()
+    ])
+    
+    # Quizzes nobody has attempted move to the new version; the others stay pinned to the version
+    # their attempts were given and graded against
+    mapped = {
+        quiz_id for (quiz_id,) in db.query(QuizQuestion.quiz_id).filter(QuizQuestion.question_id == question_id).all()
+    }
+    if mapped:
+        # start_quiz takes a shared lock on its quiz before reading the mapping, so holding these until
+        # commit keeps attempts from starting between the check and the repin. The checks are locking
+        # reads so they also see attempts committed after this transaction's snapshot
+        db.query(Quiz.id).filter(Quiz.id.in_(mapped)).with_for_update().all()
+    attempted = {
+        quiz_id for (quiz_id,) in db.query(QuizAttempt.quiz_id).filter(
+            QuizAttempt.quiz_id.in_(mapped)
+        ).distinct().with_for_update(read=True).all()
+    } | {
+        quiz_id for (quiz_id,) in db.query(ArchivedQuizAttempt.quiz_id).filter(
+            ArchivedQuizAttempt.quiz_id.in_(mapped)
+        ).distinct().with_for_update(read=True).all()
+    } if mapped else set()
+    repinned = sorted(mapped - attempted)
+    if repinned:
+        db.query(QuizQuestion).filter(
+            QuizQuestion.quiz_id.in_(repinned),
+            QuizQuestion.question_id == question_id
+        ).update({QuizQuestion.question_id: db_question.id}, synchronize_session=False)
+        db.query(Quiz).filter(Quiz.id.in_(repinned)).update(
+            {Quiz.version: Quiz.version + 1}, synchronize_session=False
+        )
     db.commit()
     db.refresh(db_question)
     
-    return db_question
+    for quiz_id in repinned:
+        invalidate_paper(quiz_id)
+        invalidate_answer_key(quiz_id)
+    question_index.remove(question_id)
+    question_index.add_question(db_question)
+    duplicate_index.remove(question_id)
+    duplicate_index.add(db_question.id, db_question.minhash)
+    
+    return {"question": db_question, "repinned_quizzes": repinned, "pinned_quizzes": sorted(attempted)}
+
+# Get every version of a question, first to current
+@router.get("/questions/{question_id}/versions", response_model=List[QuestionSchema])
+def get_question_versions(
+    question_id: int,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    question = db.query(Question).filter(Question.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    lineage = question.lineage
+    return db.query(Question).options(selectinload(Question.options)).filter(
+        (Question.id == lineage) | (Question.lineage_id == lineage)
+    ).order_by(Question.version).all()
+
+# Import questions in bulk, skipping duplicates of the bank and of earlier questions in the batch
+@router.post("/questions/import", response_model=QuestionImportResult)
+def import_questions(
+    request: QuestionImportRequest,
+    allow_duplicates: bool = False,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    # Validate every question before writing any
+    for index, question in enumerate(request.questions):
+        if not any(option.is_correct for option in question.options):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Question {index} must have at least one correct option"
+            )
+    
+    db_questions = [_new_question(question) for question in request.questions]
+    bank_duplicates = find_duplicates(db, db_questions) if not allow_duplicates else [[] for _ in db_questions]
+    
+    # Questions earlier in the batch are checked through a batch-local index (keyed by position)
+    batch_index = DuplicateIndex()
+    accepted = []
+    skipped = []
+    
+    for index, (db_question, duplicates) in enumerate(zip(db_questions, bank_duplicates)):
+        if not allow_duplicates:
+            in_batch = batch_index.near(db_question.minhash, settings.DUPLICATE_THRESHOLD)
+            if duplicates or in_batch:
+                skipped.append((index, duplicates, in_batch))
+                continue
+            batch_index.add(index, db_question.minhash)
+        accepted.append(db_question)
+    
+    db.add_all(accepted)
+    db.flush()  # Flush to get the IDs
+    
+    # Read what the indexes need before commit expires the objects
+    question_ids = [db_question.id for db_question in db_questions]
+    created = [
+        (db_question.id, [db_question.question] + [option.option for option in db_question.options], db_question.minhash)
+        for db_question in accepted
+    ]
+    db.commit()
+    
+    for question_id, texts, signature in created:
+        question_index.add(question_id, texts)
+        duplicate_index.add(question_id, signature)
+    
+    return {
+        "created": [question_id for question_id, _, _ in created],
+        "skipped": [
+            {
+                "index": index,
+                "duplicates": _duplicates(duplicates) + _duplicates(
+                    (question_ids[position], score) for position, score in in_batch
+                )
+            }
+            for index, duplicates, in_batch in skipped
+        ]
+    }
+
+# Report groups of existing questions that duplicate each other
+@router.get("/questions/duplicates", response_model=List[QuestionDuplicateGroup])
+def get_duplicate_questions(
+    threshold: Optional[float] = Query(None, gt=0, le=1),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    duplicate_index.catch_up(db)
+    groups = duplicate_index.groups(settings.DUPLICATE_THRESHOLD if threshold is None else threshold)
+    return [{"questions": _duplicates(group)} for group in groups]
 
 # Get quiz participants
 @router.get("/quizzes/{quiz_id}/participants", response_model=List[QuizAttemptSchema])
 def get_quiz_participants(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: User = Depends(get_current_admin)
 ):
     # Check if quiz exists
@@ -174,17 +561,86 @@ def get_quiz_participants(
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    # Get all attempts for this quiz
+    # Get all attempts for this quiz, including archived ones
     attempts = db.query(QuizAttempt).filter(QuizAttempt.quiz_id == quiz_id).all()
+    attempts += db.query(ArchivedQuizAttempt).filter(ArchivedQuizAttempt.quiz_id == quiz_id).all()
     
     return attempts
 
+# Seed live counters for a quiz (primary, so they are not behind the replica)
+def _count_attempts(quiz_id: int) -> QuizCounters:
+    db = SessionLocal()
+    try:
+        high_water = db.query(func.max(QuizAttempt.id)).filter(QuizAttempt.quiz_id == quiz_id).scalar() or 0
+        open_attempts = dict(
+            db.query(QuizAttempt.id, QuizAttempt.status).filter(
+                QuizAttempt.quiz_id == quiz_id,
+                QuizAttempt.id <= high_water,
+                QuizAttempt.status != AttemptStatus.completed
+            ).all()
+        )
+        completed = db.query(func.count(QuizAttempt.id)).filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.id <= high_water,
+            QuizAttempt.status == AttemptStatus.completed
+        ).scalar()
+        archived = db.query(func.count(ArchivedQuizAttempt.id)).filter(
+            ArchivedQuizAttempt.quiz_id == quiz_id,
+            ArchivedQuizAttempt.status == AttemptStatus.completed
+        ).scalar()
+        return QuizCounters(
+            in_progress=sum(1 for status in open_attempts.values() if status == AttemptStatus.in_progress),
+            completed=completed + archived,
+            high_water=high_water,
+            open_attempts={attempt_id: status.value for attempt_id, status in open_attempts.items()}
+        )
+    finally:
+        db.close()
+
+# Stream live attempt events for a quiz (Server-Sent Events)
+@router.get("/quizzes/{quiz_id}/live")
+def stream_quiz_events(
+    quiz_id: int,
+    db: Session = Depends(get_read_db),
+    auth_db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    # Check if quiz exists
+    if not db.query(Quiz.id).filter(Quiz.id == quiz_id).first():
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    # A stream stays open for as long as the dashboard does: return the connections used by the
+    # quiz check and by authentication/rate limiting (the same request-scoped get_db session) to the pool now
+    db.close()
+    auth_db.close()
+    
+    async def events():
+        subscriber = await event_broker.subscribe(quiz_id, lambda: _count_attempts(quiz_id))
+        try:
+            # Current counters first, then incremental events as they happen
+            yield format_sse({"type": "counters", "quiz_id": quiz_id, "counters": event_broker.counters(quiz_id)})
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            event_broker.unsubscribe(quiz_id, subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Get participant's quiz responses
 @router.get("/quizzes/{quiz_id}/responses/{user_id}", response_model=List[QuizResponseDetail])
 def get_participant_responses(
     quiz_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: User = Depends(get_current_admin)
 ):
     # Check if quiz exists
@@ -203,26 +659,37 @@ def get_participant_responses(
         QuizAttempt.user_id == user_id
     ).order_by(QuizAttempt.id.desc()).first()
     
+    # Older attempts may have been archived
+    if not attempt:
+        attempt = db.query(ArchivedQuizAttempt).filter(
+            ArchivedQuizAttempt.quiz_id == quiz_id,
+            ArchivedQuizAttempt.user_id == user_id
+        ).order_by(ArchivedQuizAttempt.id.desc()).first()
+    
     if not attempt:
         raise HTTPException(status_code=404, detail="No attempt found")
     
-    # Get responses for this attempt
-    responses = db.query(QuizResponse).filter(QuizResponse.attempt_id == attempt.id).all()
+    # Get responses for this attempt (expanded from the packed sheet for packed attempts)
+    if attempt.answer_sheet is not None:
+        answer_key = answer_key_for_attempt(db, quiz, attempt) if attempt.status == AttemptStatus.completed else None
+        responses = sheet_responses(attempt.id, attempt.answer_sheet, answer_key)
+    else:
+        responses = attempt_responses(db, attempt)
+    
+    # Get their questions and options in bulk
+    question_ids = [response.question_id for response in responses]
+    questions = {
+        question.id: question for question in db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(Question.id.in_(question_ids)).all()
+    } if question_ids else {}
     
     # Prepare detailed response data
     detailed_responses = []
     for response in responses:
-        question = db.query(Question).filter(Question.id == response.question_id).first()
-        selected_option = None
-        if response.selected_option_id:
-            selected_option = db.query(QuestionOption).filter(
-                QuestionOption.id == response.selected_option_id
-            ).first()
-        
-        correct_option = db.query(QuestionOption).filter(
-            QuestionOption.question_id == response.question_id,
-            QuestionOption.is_correct == True
-        ).first()
+        question = questions[response.question_id]
+        selected_option = next((opt for opt in question.options if opt.id == response.selected_option_id), None)
+        correct_option = next((opt for opt in question.options if opt.is_correct), None)
         
         detailed_response = {
             "id": response.id,
@@ -247,4 +714,186 @@ def get_participant_responses(
         
         detailed_responses.append(detailed_response)
     
-    return detailed_responses
\ No newline at end of file
+    return detailed_responses
+
+# Pre-provision attempts for a roster ahead of a scheduled exam (runs in the background)
+@router.post("/quizzes/{quiz_id}/schedule", status_code=status.HTTP_202_ACCEPTED)
+def schedule_quiz(
+    quiz_id: int,
+    schedule: QuizScheduleRequest,
+    chunk_size: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    user_ids = sorted(set(schedule.user_ids))
+    found = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids)).all()}
+    if len(found) != len(user_ids):
+        raise HTTPException(status_code=400, detail=f"Unknown user ids: {sorted(set(user_ids) - found)}")
+    
+    # Fail now rather than in the job if the quiz cannot produce a paper
+    pools = load_pools(db, quiz_id)
+    if pools:
+        try:
+            new_draw(db, pools)
+        except PoolTooSmall as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif not db.query(QuizQuestion.id).filter(QuizQuestion.quiz_id == quiz_id).first():
+        raise HTTPException(status_code=400, detail="Quiz has no questions")
+    
+    if schedule.starts_at:
+        quiz.starts_at = schedule.starts_at
+        db.commit()
+    
+    job = jobs.submit("schedule", schedule_attempts, quiz_id, user_ids, chunk_size=chunk_size)
+    return job.to_dict()
+
+# Move old completed attempts to the archive tables (runs in the background)
+@router.post("/archive", status_code=status.HTTP_202_ACCEPTED)
+def archive_attempts(
+    older_than_days: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    current_admin: User = Depends(get_current_admin)
+):
+    job = jobs.submit("archive", archive_completed_attempts, older_than_days=older_than_days, chunk_size=chunk_size)
+    return job.to_dict()
+
+# Change which options of a question are correct, then regrade completed attempts that include it
+@router.put("/questions/{question_id}/correct-options")
+def set_correct_options(
+    question_id: int,
+    correct_options: QuestionCorrectOptionsRequest,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    options = db.query(QuestionOption).filter(QuestionOption.question_id == question_id).all()
+    if not options:
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    correct_ids = set(correct_options.correct_option_ids)
+    if not correct_ids or not correct_ids <= {option.id for option in options}:
+        raise HTTPException(status_code=400, detail="Correct options must be options of this question")
+    
+    for option in options:
+        option.is_correct = option.id in correct_ids
+    
+    # The answer key is the one part of a version that can be corrected; a new quiz version retires
+    # cached answer keys and results now, even when the attempts are not regraded
+    quiz_ids = affected_quizzes(db, question_id)
+    if quiz_ids:
+        db.query(Quiz).filter(Quiz.id.in_(quiz_ids)).update(
+            {Quiz.version: Quiz.version + 1}, synchronize_session=False
+        )
+    db.commit()
+    for quiz_id in quiz_ids:
+        invalidate_answer_key(quiz_id)
+    
+    if not correct_options.regrade:
+        return {"question_id": question_id, "correct_option_ids": sorted(correct_ids), "job": None}
+    job = jobs.submit("regrade", regrade, question_id=question_id)
+    return {"question_id": question_id, "correct_option_ids": sorted(correct_ids), "job": job.to_dict()}
+
+# Regrade completed attempts of a quiz against its current answer key (runs in the background)
+@router.post("/quizzes/{quiz_id}/regrade", status_code=status.HTTP_202_ACCEPTED)
+def regrade_quiz(
+    quiz_id: int,
+    chunk_size: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    if not db.query(Quiz.id).filter(Quiz.id == quiz_id).first():
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    job = jobs.submit("regrade", regrade, quiz_id=quiz_id, chunk_size=chunk_size)
+    return job.to_dict()
+
+# Regrade completed attempts of every quiz that can include a question (runs in the background)
+@router.post("/questions/{question_id}/regrade", status_code=status.HTTP_202_ACCEPTED)
+def regrade_question(
+    question_id: int,
+    chunk_size: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    if not db.query(Question.id).filter(Question.id == question_id).first():
+        raise HTTPException(status_code=404, detail="Question not found")
+    
+    job = jobs.submit("regrade", regrade, question_id=question_id, chunk_size=chunk_size)
+    return job.to_dict()
+
+# Get the status and progress of a background job
+@router.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    current_admin: User = Depends(get_current_admin)
+):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+# Get the outbox relay's state and pending/parked event counts
+@router.get("/outbox")
+def get_outbox(
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    return outbox_relay.to_dict(db)
+
+# Give parked outbox events (failed OUTBOX_MAX_ATTEMPTS times) another round of delivery attempts
+@router.post("/outbox/retry-parked")
+def retry_parked_outbox_events(
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    requeued = db.query(OutboxEvent).filter(
+        OutboxEvent.delivered_at.is_(None),
+        OutboxEvent.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+    ).update({OutboxEvent.attempts: 0}, synchronize_session=False)
+    db.commit()
+    outbox_relay.notify()
+    return {"requeued": requeued}
+
+# Start sampling requests with the statistical profiler (this worker only; no restart needed)
+@router.post("/profiler/start")
+def start_profiler(
+    options: ProfilerStart,
+    current_admin: User = Depends(get_current_admin)
+):
+    if options.reset:
+        profiler.reset()
+    profiler.start(
+        sample_rate=options.sample_rate,
+        route=options.route,
+        interval_ms=options.interval_ms,
+        duration_seconds=options.duration_seconds
+    )
+    return profiler.to_dict()
+
+# Stop sampling; collected stacks are kept for download
+@router.post("/profiler/stop")
+def stop_profiler(
+    current_admin: User = Depends(get_current_admin)
+):
+    profiler.stop()
+    return profiler.to_dict()
+
+# Get the profiler's state and sample counts
+@router.get("/profiler")
+def get_profiler(
+    current_admin: User = Depends(get_current_admin)
+):
+    return profiler.to_dict()
+
+# Download aggregated stacks in collapsed format (flamegraph.pl, speedscope)
+@router.get("/profiler/stacks", response_class=PlainTextResponse)
+def get_profiler_stacks(
+    current_admin: User = Depends(get_current_admin)
+):
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": 'attachment; filename="stacks.collapsed.txt"'}
+    )
@@ -1,23 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_read_db, mark_primary_reads
+from app.config import settings
 from app.models.user import User
 from app.models.quiz import Quiz, QuizQuestion
 from app.models.question import Question, QuestionOption
 from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
-from app.schemas.quiz import Quiz as QuizSchema
-from app.schemas.attempt import QuizAttempt as QuizAttemptSchema, QuizAttemptCreate, QuizSubmit, QuizResponseDetail
+from app.models.archive import ArchivedQuizAttempt
+from app.schemas.quiz import Quiz as QuizSchema, UserQuiz
+from app.schemas.attempt import QuizAttempt as QuizAttemptSchema, QuizAttemptCreate, QuizSubmit, QuizResponseDetail, QuizPaper, QuizResult, AdmissionTicket, CompactQuizPaper, CompactQuizResult, AttemptHistory
+from app.schemas.user import UserStats as UserStatsSchema
+from app.schemas.batch import BatchRequest, BatchResponse
 from app.security.jwt import get_current_user
+from app.security.admission import issue_ticket, check_ticket
 from app.security.rate_limiter import rate_limiter
+from app.utils.serialization import FastJSONResponse, dumps
+from app.utils.grading import grade_submission
+from app.utils.question_pools import load_pools, new_draw, paper_for_attempt, answer_key_for_attempt, paper_layout, PoolTooSmall
+from app.utils.submission_queue import submission_queue, QUEUED, COMPLETED
+from app.utils.idempotency import IdempotentRoute
+from app.utils.answer_sheet import new_sheet, selections, grade_sheet, sheet_responses
+from app.utils.archival import find_completed_attempt, attempt_responses
+from app.utils.events import event_broker, ATTEMPT_STARTED, ATTEMPT_SUBMITTED
+from app.utils.user_stats import record_attempt, get_user_stats
+from app.utils.batch import BatchExecutor
+from app.utils.outbox import add_event, completion_payload, outbox_relay, ATTEMPT_COMPLETED
+from app.utils.paper_cache import paper_version
+from app.utils.http_cache import results, etag, body_etag, matches, not_modified, cacheable
 
-router = APIRouter(tags=["User"], dependencies=[Depends(rate_limiter)])
+# Mutating routes honour Idempotency-Key so client retries replay the stored result
+router = APIRouter(tags=["User"], dependencies=[Depends(rate_limiter)], route_class=IdempotentRoute)
 
 # Get all available quizzes for the user
-@router.get("/my-quizzes", response_model=List[dict])
+# Handlers on the exam path return FastJSONResponse directly; response_model documents the shape
+# without paying for a validation pass on every request
+@router.get("/my-quizzes", response_model=List[UserQuiz])
 def get_user_quizzes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     # Get all quizzes
@@ -26,6 +49,7 @@ def get_user_quizzes(
     # Get user attempts for these quizzes
     quiz_attempts = {}
     attempts = db.query(QuizAttempt).filter(QuizAttempt.user_id == current_user.id).all()
+    attempts += db.query(ArchivedQuizAttempt).filter(ArchivedQuizAttempt.user_id == current_user.id).all()
     
     for attempt in attempts:
         if attempt.quiz_id not in quiz_attempts or attempt.id > quiz_attempts[attempt.quiz_id].id:
@@ -48,35 +72,142 @@ def get_user_quizzes(
             if attempt.status == AttemptStatus.completed:
                 quiz_data["status"] = "Completed"
                 quiz_data["score"] = attempt.score
-            else:
+            elif attempt.status == AttemptStatus.in_progress:
                 quiz_data["status"] = "In Progress"
                 quiz_data["attempt_id"] = attempt.id
         
         user_quizzes.append(quiz_data)
     
-    return user_quizzes
+    return FastJSONResponse(content=user_quizzes)
+
+# Get the user's attempt history across all quizzes, newest first (keyset paged by attempt id)
+@router.get("/history", response_model=AttemptHistory)
+def get_attempt_history(
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = None,
+    quiz_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Newest page from each table (archived attempts included), merged
+    rows = []
+    for attempt_model in (QuizAttempt, ArchivedQuizAttempt):
+        query = db.query(
+            attempt_model.id, attempt_model.quiz_id, Quiz.title, attempt_model.status, attempt_model.score,
+            Quiz.total_score, attempt_model.start_time, attempt_model.end_time
+        ).join(Quiz, Quiz.id == attempt_model.quiz_id).filter(
+            attempt_model.user_id == current_user.id,
+            attempt_model.status != AttemptStatus.scheduled
+        )
+        if quiz_id is not None:
+            query = query.filter(attempt_model.quiz_id == quiz_id)
+        if before_id is not None:
+            query = query.filter(attempt_model.id < before_id)
+        rows += query.order_by(attempt_model.id.desc()).limit(limit + 1).all()
+    rows.sort(key=lambda row: row[0], reverse=True)
+    
+    attempts = [
+        {
+            "attempt_id": attempt_id,
+            "quiz_id": attempt_quiz_id,
+            "quiz_title": title,
+            "status": attempt_status,
+            "score": score or 0,
+            "total_score": total_score,
+            "start_time": start_time,
+            "end_time": end_time
+        }
+        for attempt_id, attempt_quiz_id, title, attempt_status, score, total_score, start_time, end_time in rows[:limit]
+    ]
+    
+    return FastJSONResponse(content={
+        "attempts": attempts,
+        "next_before_id": attempts[-1]["attempt_id"] if len(rows) > limit else None
+    })
+
+# Get the user's performance summary (one materialized row, built on first use)
+@router.get("/stats", response_model=UserStatsSchema)
+def get_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    stats = get_user_stats(db, current_user.id)
+    if stats is None:
+        return UserStatsSchema()
+    
+    return {
+        "attempts": stats.attempts,
+        "total_score": stats.total_score,
+        "total_possible": stats.total_possible,
+        "average_score": round(stats.total_score / stats.attempts, 2) if stats.attempts else 0.0,
+        "average_percentage": round(100 * stats.total_score / stats.total_possible, 2) if stats.total_possible else 0.0,
+        "best_score": stats.best_score,
+        "best_percentage": stats.best_percentage,
+        "total_time_seconds": stats.total_time_seconds,
+        "last_attempt_at": stats.last_attempt_at
+    }
+
+# Join the admission queue for a quiz; start once the ticket's admit time has come
+@router.post("/quizzes/{quiz_id}/admission", response_model=AdmissionTicket)
+def request_admission(
+    quiz_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    return issue_ticket(current_user.id, quiz_id)
 
 # Start a quiz
 @router.post("/quizzes/{quiz_id}/start", response_model=QuizAttemptSchema)
 def start_quiz(
     quiz_id: int,
+    response: Response,
+    admission_ticket: Optional[str] = Header(None, alias="X-Admission-Ticket"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if quiz exists
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    # Check if quiz exists; the shared lock holds off edit_question's repin until this attempt is committed
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).with_for_update(read=True).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    # Check if user already has an in-progress attempt
-    existing_attempt = db.query(QuizAttempt).filter(
-        QuizAttempt.user_id == current_user.id,
-        QuizAttempt.quiz_id == quiz_id,
-        QuizAttempt.status == AttemptStatus.in_progress
-    ).first()
+    # Check if user already has an in-progress or a pre-provisioned attempt
+    existing_attempts = {
+        attempt.status: attempt for attempt in db.query(QuizAttempt).filter(
+            QuizAttempt.user_id == current_user.id,
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.status.in_([AttemptStatus.in_progress, AttemptStatus.scheduled])
+        ).all()
+    }
     
-    if existing_attempt:
-        return existing_attempt
+    if AttemptStatus.in_progress in existing_attempts:
+        return existing_attempts[AttemptStatus.in_progress]
+    
+    # Exam-open admission control: a new attempt needs a ticket whose admit time has come
+    if settings.ADMISSION_CONTROL:
+        check_ticket(admission_ticket, current_user.id, quiz_id)
+    
+    # Follow-up reads (my-quizzes) must see the new attempt
+    mark_primary_reads(response)
+    
+    # Pre-provisioned attempt: its responses already exist, so starting is one UPDATE by primary key
+    scheduled = existing_attempts.get(AttemptStatus.scheduled)
+    if scheduled:
+        start_time = datetime.utcnow()
+        started = db.execute(
+            update(QuizAttempt).where(
+                QuizAttempt.id == scheduled.id,
+                QuizAttempt.status == AttemptStatus.scheduled
+            ).values(status=AttemptStatus.in_progress, start_time=start_time).execution_options(synchronize_session=False)
+        ).rowcount
+        db.expunge(scheduled)
+        db.commit()
+        
+        if not started:
+            # A concurrent request started it first
+            return db.query(QuizAttempt).filter(QuizAttempt.id == scheduled.id).first()
+        scheduled.status = AttemptStatus.in_progress
+        scheduled.start_time = start_time
+        event_broker.publish(quiz_id, ATTEMPT_STARTED, attempt_id=scheduled.id, user_id=current_user.id)
+        return scheduled
     
     # Create new attempt
     attempt = QuizAttempt(
@@ -85,30 +216,58 @@ def start_quiz(
         status=AttemptStatus.in_progress
     )
     
-    db.add(attempt)
-    db.commit()
-    db.refresh(attempt)
+    pools = load_pools(db, quiz_id)
+    if pools:
+        # Pooled quiz: draw this attempt's questions; the seed reproduces the draw later
+        try:
+            attempt.paper_seed, attempt.paper_high_water, drawn = new_draw(db, pools)
+        except PoolTooSmall as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        question_ids = [question_id for question_id, _ in drawn]
+    else:
+        # Locking read: the mapping as last committed, not as of this transaction's snapshot
+        question_ids = [
+            question_id for (question_id,) in db.query(QuizQuestion.question_id).filter(
+                QuizQuestion.quiz_id == quiz_id
+            ).order_by(QuizQuestion.question_number).with_for_update(read=True).all()
+        ]
     
-    # Initialize empty responses for all questions
-    quiz_questions = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).all()
+    if settings.ANSWER_SHEET_MODE == "packed":
+        # One packed column instead of a response row per question
+        attempt.answer_sheet = new_sheet(question_ids)
     
-    responses = []
-    for qq in quiz_questions:
-        response = QuizResponse(
-            attempt_id=attempt.id,
-            question_id=qq.question_id
+    db.add(attempt)
+    try:
+        db.flush()  # Flush to get the ID
+    except IntegrityError:
+        # A concurrent start won the unique open-attempt key: resume the attempt it created
+        db.rollback()
+        return db.query(QuizAttempt).filter(
+            QuizAttempt.user_id == current_user.id,
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.status == AttemptStatus.in_progress
+        ).first()
+    
+    # Initialize empty responses for all questions in a single multi-row insert
+    if attempt.answer_sheet is None and question_ids:
+        db.execute(
+            insert(QuizResponse),
+            [{"attempt_id": attempt.id, "question_id": question_id} for question_id in question_ids]
         )
-        responses.append(response)
     
-    db.add_all(responses)
     db.commit()
+    db.refresh(attempt)
+    
+    event_broker.publish(quiz_id, ATTEMPT_STARTED, attempt_id=attempt.id, user_id=current_user.id)
     
     return attempt
 
-# Get quiz questions for the current user's attempt
-@router.get("/quizzes/{quiz_id}/questions")
+# Get quiz questions for the current user's attempt (?compact=true for the slimmer shape)
+@router.get("/quizzes/{quiz_id}/questions", response_model=Union[QuizPaper, CompactQuizPaper])
 def get_quiz_questions(
     quiz_id: int,
+    compact: bool = False,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -130,50 +289,41 @@ def get_quiz_questions(
             detail="You need to start the quiz first"
         )
     
-    # Get quiz questions with options
-    questions = []
-    quiz_questions = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).all()
-    
-    for qq in quiz_questions:
-        # Get question details
-        question = db.query(Question).filter(Question.id == qq.question_id).first()
-        
-        # Get options
-        options = db.query(QuestionOption).filter(QuestionOption.question_id == question.id).all()
-        
-        # Get user's response if any
-        response = db.query(QuizResponse).filter(
-            QuizResponse.attempt_id == attempt.id,
-            QuizResponse.question_id == question.id
-        ).first()
-        
-        questions.append({
-            "question_number": qq.question_number,
-            "marks": qq.marks,
-            "id": question.id,
-            "question": question.question,
-            "options": [{"id": opt.id, "option": opt.option} for opt in options],
-            "selected_option_id": response.selected_option_id if response else None
-        })
+    # Static part of the paper is serialized once per quiz version (or per draw for pooled quizzes)
+    paper = paper_for_attempt(db, quiz, attempt)
     
-    # Sort questions by question number
-    questions.sort(key=lambda q: q["question_number"])
+    # Get user's responses for the whole attempt at once
+    if attempt.answer_sheet is not None:
+        selected_options = selections(attempt.answer_sheet)
+    else:
+        selected_options = dict(
+            db.query(QuizResponse.question_id, QuizResponse.selected_option_id).filter(
+                QuizResponse.attempt_id == attempt.id
+            ).all()
+        )
     
-    return {
+    header = {
         "quiz_id": quiz_id,
         "title": quiz.title,
         "duration_minutes": quiz.duration_minutes,
         "total_score": quiz.total_score,
         "attempt_id": attempt.id,
-        "start_time": attempt.start_time,
-        "questions": questions
+        "start_time": attempt.start_time
     }
+    
+    # Revalidated by content: the paper is fixed per version, only the selections move
+    body = paper.render(header, selected_options, compact)
+    tag = body_etag(body)
+    if matches(if_none_match, tag):
+        return not_modified(tag)
+    return cacheable(body, tag)
 
 # Submit quiz response
 @router.post("/quizzes/{quiz_id}/submit")
 def submit_quiz(
     quiz_id: int,
     submission: QuizSubmit,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -195,53 +345,57 @@ def submit_quiz(
             detail="No active attempt found for this quiz"
         )
     
-    # Process each response
-    total_score = 0
+    answers = [(r.question_id, r.selected_option_id) for r in submission.responses]
+    completion = {"status": AttemptStatus.completed, "end_time": datetime.utcnow()}
     
-    for response_data in submission.responses:
-        # Find the corresponding response record
-        response = db.query(QuizResponse).filter(
-            QuizResponse.attempt_id == attempt.id,
-            QuizResponse.question_id == response_data.question_id
-        ).first()
-        
-        if not response:
-            # Create if it doesn't exist
-            response = QuizResponse(
-                attempt_id=attempt.id,
-                question_id=response_data.question_id
-            )
-            db.add(response)
-            db.flush()
+    if attempt.answer_sheet is not None:
+        # Packed attempt: merge and grade the whole sheet in memory
+        total_score, completion["answer_sheet"] = grade_sheet(
+            answer_key_for_attempt(db, quiz, attempt), attempt.answer_sheet, answers
+        )
+    else:
+        # Load existing response rows for the attempt in bulk
+        response_ids = dict(
+            db.query(QuizResponse.question_id, QuizResponse.id).filter(
+                QuizResponse.attempt_id == attempt.id
+            ).all()
+        )
         
-        # Update response with user's answer
-        response.selected_option_id = response_data.selected_option_id
+        # Grade against the cached answer key
+        total_score, updates, inserts = grade_submission(answer_key_for_attempt(db, quiz, attempt), attempt.id, answers, response_ids)
         
-        # Check if the answer is correct
-        if response.selected_option_id:
-            selected_option = db.query(QuestionOption).filter(
-                QuestionOption.id == response.selected_option_id
-            ).first()
-            
-            if selected_option and selected_option.is_correct:
-                response.is_correct = True
-                
-                # Find the marks for this question
-                question_mapping = db.query(QuizQuestion).filter(
-                    QuizQuestion.quiz_id == quiz_id,
-                    QuizQuestion.question_id == response_data.question_id
-                ).first()
-                
-                if question_mapping:
-                    response.marks_obtained = question_mapping.marks
-                    total_score += question_mapping.marks
-    
-    # Update attempt status and score
-    attempt.status = AttemptStatus.completed
-    attempt.end_time = datetime.utcnow()
-    attempt.score = total_score
+        # Write all responses with one executemany per statement type
+        if updates:
+            db.execute(update(QuizResponse), updates)
+        if inserts:
+            db.execute(insert(QuizResponse), inserts)
+    
+    # Update attempt status and score, only while it is still in progress: of two concurrent submits
+    # (or a submit racing the queue worker) one completes it and the other changes nothing
+    completed = db.execute(
+        update(QuizAttempt).where(
+            QuizAttempt.id == attempt.id,
+            QuizAttempt.status == AttemptStatus.in_progress
+        ).values(score=total_score, **completion).execution_options(synchronize_session=False)
+    ).rowcount
+    if not completed:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt was already submitted")
+    
+    # Fold the attempt into the user's stats row, and queue its completion event, in the same transaction
+    end_time = completion["end_time"]
+    record_attempt(db, current_user.id, total_score, quiz.total_score, attempt.start_time, end_time)
+    add_event(db, ATTEMPT_COMPLETED, **completion_payload(attempt, quiz, total_score, end_time))
     
     db.commit()
+    outbox_relay.notify()
+    
+    event_broker.publish(
+        quiz_id, ATTEMPT_SUBMITTED, attempt_id=attempt.id, user_id=current_user.id, score=total_score
+    )
+    
+    # Let the client read its own result from the primary until replicas catch up
+    mark_primary_reads(response)
     
     return {
         "quiz_id": quiz_id,
@@ -251,24 +405,85 @@ def submit_quiz(
         "completed": True
     }
 
-# Get quiz response for a completed quiz
-@router.get("/quizzes/{quiz_id}/response")
-def get_quiz_response(
+# Submit quiz response through the group-commit queue; poll /submissions/{attempt_id} for the score
+@router.post("/quizzes/{quiz_id}/submit-async", status_code=status.HTTP_202_ACCEPTED)
+def submit_quiz_async(
     quiz_id: int,
+    submission: QuizSubmit,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
+):
+    if not settings.SUBMISSION_QUEUE_ENABLED:
+        raise HTTPException(status_code=404, detail="Queued submission is not enabled")
+    
+    # Get user's attempt
+    attempt = db.query(QuizAttempt).filter(
+        QuizAttempt.user_id == current_user.id,
+        QuizAttempt.quiz_id == quiz_id,
+        QuizAttempt.status == AttemptStatus.in_progress
+    ).first()
+    
+    if not attempt:
+        raise HTTPException(
+            status_code=400,
+            detail="No active attempt found for this quiz"
+        )
+    
+    # Journaled before returning, so an accepted submission survives a crash
+    return submission_queue.submit(
+        attempt.id,
+        quiz_id,
+        {r.question_id: r.selected_option_id for r in submission.responses}
+    )
+
+# Get the status of a queued submission
+@router.get("/submissions/{attempt_id}")
+def get_submission_status(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    attempt = db.query(QuizAttempt).filter(
+        QuizAttempt.id == attempt_id,
+        QuizAttempt.user_id == current_user.id
+    ).first()
+    
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    
+    # This worker's view first; another worker may have accepted the submission
+    result = submission_queue.status(attempt_id)
+    if result and result["status"] != QUEUED:
+        return result
+    
+    if attempt.status == AttemptStatus.completed:
+        return {
+            "attempt_id": attempt.id,
+            "status": COMPLETED,
+            "quiz_id": attempt.quiz_id,
+            "total_possible_score": attempt.quiz.total_score,
+            "score_obtained": attempt.score
+        }
+    
+    return {"attempt_id": attempt.id, "status": QUEUED}
+
+# Get quiz response for a completed quiz: the latest attempt, or ?attempt_id= from the history (?compact=true for the slimmer shape)
+@router.get("/quizzes/{quiz_id}/response", response_model=Union[QuizResult, CompactQuizResult])
+def get_quiz_response(
+    quiz_id: int,
+    compact: bool = False,
+    attempt_id: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
 ):
     # Check if quiz exists
     quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    # Get user's completed attempt
-    attempt = db.query(QuizAttempt).filter(
-        QuizAttempt.user_id == current_user.id,
-        QuizAttempt.quiz_id == quiz_id,
-        QuizAttempt.status == AttemptStatus.completed
-    ).order_by(QuizAttempt.id.desc()).first()
+    # Get user's completed attempt (archived attempts included)
+    attempt = find_completed_attempt(db, current_user.id, quiz_id, attempt_id)
     
     if not attempt:
         raise HTTPException(
@@ -276,46 +491,74 @@ def get_quiz_response(
             detail="No completed attempt found for this quiz"
         )
     
-    # Get all responses
-    responses = db.query(QuizResponse).filter(
-        QuizResponse.attempt_id == attempt.id
-    ).all()
+    # A completed attempt's result only changes when a regrade bumps the quiz version, so the
+    # attempt and version name it: a revalidation is answered without loading any responses
+    key = (attempt.id, paper_version(quiz), attempt.score, compact)
+    tag = etag(*key[:3], "compact" if compact else "full")
+    if matches(if_none_match, tag):
+        return not_modified(tag)
+    
+    body = results.get(key)
+    if body is None:
+        body = dumps(_quiz_result(db, quiz, attempt, compact))
+        results.set(key, body)
+    return cacheable(body, tag)
+
+# The result of a completed attempt: its responses against the question versions it was given
+def _quiz_result(db: Session, quiz: Quiz, attempt, compact: bool) -> dict:
+    # Get all responses (expanded from the packed sheet for packed attempts)
+    if attempt.answer_sheet is not None:
+        responses = sheet_responses(attempt.id, attempt.answer_sheet, answer_key_for_attempt(db, quiz, attempt))
+    else:
+        responses = attempt_responses(db, attempt)
+    
+    # Get question numbering and marks (the quiz mapping, or the attempt's draw for pooled quizzes)
+    layout = paper_layout(db, quiz, attempt)
+    
+    # Get question details with all options in bulk
+    question_ids = [response.question_id for response in responses]
+    questions = {
+        question.id: question for question in db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(Question.id.in_(question_ids)).all()
+    } if question_ids else {}
     
     # Prepare detailed response data
     questions_data = []
     for response in responses:
-        # Get question details
-        question = db.query(Question).filter(Question.id == response.question_id).first()
+        question = questions[response.question_id]
+        question_number, marks_possible = layout.get(response.question_id, (0, 0))
+        options = question.options
         
-        # Get question mapping for marks
-        question_mapping = db.query(QuizQuestion).filter(
-            QuizQuestion.quiz_id == quiz_id,
-            QuizQuestion.question_id == response.question_id
-        ).first()
+        if compact:
+            # Options once, as parallel arrays; selected/correct as indices, omitted when absent
+            question_data = {
+                "question_number": question_number,
+                "question_id": question.id,
+                "question_text": question.question,
+                "marks_possible": marks_possible,
+                "marks_obtained": response.marks_obtained,
+                "is_correct": response.is_correct,
+                "option_ids": [opt.id for opt in options],
+                "options": [opt.option for opt in options]
+            }
+            for index, opt in enumerate(options):
+                if opt.id == response.selected_option_id:
+                    question_data["selected"] = index
+                if opt.is_correct and "correct" not in question_data:
+                    question_data["correct"] = index
+            questions_data.append(question_data)
+            continue
         
-        # Get all options
-        options = db.query(QuestionOption).filter(
-            QuestionOption.question_id == response.question_id
-        ).all()
-        
-        # Get selected option
-        selected_option = None
-        if response.selected_option_id:
-            selected_option = db.query(QuestionOption).filter(
-                QuestionOption.id == response.selected_option_id
-            ).first()
-        
-        # Get correct option
-        correct_option = db.query(QuestionOption).filter(
-            QuestionOption.question_id == response.question_id,
-            QuestionOption.is_correct == True
-        ).first()
+        # Get selected and correct options from the loaded options
+        selected_option = next((opt for opt in options if opt.id == response.selected_option_id), None)
+        correct_option = next((opt for opt in options if opt.is_correct), None)
         
         questions_data.append({
-            "question_number": question_mapping.question_number if question_mapping else 0,
+            "question_number": question_number,
             "question_id": question.id,
             "question_text": question.question,
-            "marks_possible": question_mapping.marks if question_mapping else 0,
+            "marks_possible": marks_possible,
             "marks_obtained": response.marks_obtained,
             "is_correct": response.is_correct,
             "selected_option": {
@@ -332,11 +575,35 @@ def get_quiz_response(
     # Sort by question number
     questions_data.sort(key=lambda q: q["question_number"])
     
-    return {
-        "quiz_id": quiz_id,
+    result = {
+        "quiz_id": quiz.id,
         "quiz_title": quiz.title,
         "total_score": quiz.total_score,
         "user_score": attempt.score,
         "completion_time": attempt.end_time,
         "questions": questions_data
-    }
\ No newline at end of file
+    }
+    if compact and result["completion_time"] is None:
+        del result["completion_time"]
+    
+    return result
+
+# Run several user-route calls in one round trip (e.g. my-quizzes, start and questions on the exam screen)
+@router.post("/batch", response_model=BatchResponse)
+async def batch(
+    payload: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if len(payload.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can hold at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+    
+    # Authenticated, rate-limited and given a session once; each call reuses them
+    return await batch_executor.run(request, payload.requests, db, current_user)
+
+
+batch_executor = BatchExecutor(router, prefix=f"{settings.API_V1_PREFIX}/user", exclude=("/batch",))
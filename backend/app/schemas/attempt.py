@@ -6,6 +6,7 @@ from enum import Enum
 class AttemptStatus(str, Enum):
     in_progress = "in_progress"
     completed = "completed"
+    scheduled = "scheduled"
 
 # Quiz Response Schemas
 class QuizResponseBase(BaseModel):
@@ -57,6 +58,112 @@ class QuizAttemptDetail(QuizAttempt):
     class Config:
         orm_mode = True
 
+# Attempt history, newest first; pass next_before_id as before_id for the next page
+class AttemptHistoryItem(BaseModel):
+    attempt_id: int
+    quiz_id: int
+    quiz_title: str
+    status: AttemptStatus
+    score: int = 0
+    total_score: int
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+class AttemptHistory(BaseModel):
+    attempts: List[AttemptHistoryItem]
+    next_before_id: Optional[int] = None
+
+# Admission ticket: when a queued taker may start the quiz
+class AdmissionTicket(BaseModel):
+    ticket: str
+    quiz_id: int
+    admit_at: datetime
+    estimated_wait_seconds: float
+    queue_position: int
+
 # Quiz Submit Schema
 class QuizSubmit(BaseModel):
-    responses: List[QuizResponseCreate]
\ No newline at end of file
+    responses: List[QuizResponseCreate]
+
+# Option as shown to a quiz taker (no is_correct)
+class PaperOption(BaseModel):
+    id: int
+    option: str
+
+# Quiz Paper Schemas (questions for an in-progress attempt)
+class PaperQuestion(BaseModel):
+    question_number: int
+    marks: int
+    id: int
+    question: str
+    options: List[PaperOption]
+    selected_option_id: Optional[int] = None
+
+class QuizPaper(BaseModel):
+    quiz_id: int
+    title: str
+    duration_minutes: int
+    total_score: int
+    attempt_id: int
+    start_time: datetime
+    questions: List[PaperQuestion]
+
+# Compact paper (?compact=true): options as parallel id/text arrays, null fields omitted
+class CompactPaperQuestion(BaseModel):
+    question_number: int
+    marks: int
+    id: int
+    question: str
+    option_ids: List[int]
+    options: List[str]
+    selected_option_id: Optional[int] = None
+
+class CompactQuizPaper(BaseModel):
+    quiz_id: int
+    title: str
+    duration_minutes: int
+    total_score: int
+    attempt_id: int
+    start_time: datetime
+    questions: List[CompactPaperQuestion]
+
+# Quiz Result Schemas (review of a completed attempt)
+class QuizResultQuestion(BaseModel):
+    question_number: int
+    question_id: int
+    question_text: str
+    marks_possible: int
+    marks_obtained: int
+    is_correct: bool
+    selected_option: Optional[PaperOption] = None
+    correct_option: Optional[PaperOption] = None
+    all_options: List[PaperOption]
+
+class QuizResult(BaseModel):
+    quiz_id: int
+    quiz_title: str
+    total_score: int
+    user_score: int
+    completion_time: Optional[datetime] = None
+    questions: List[QuizResultQuestion]
+
+# Compact result (?compact=true): selected/correct are indices into options, null fields omitted
+class CompactResultQuestion(BaseModel):
+    question_number: int
+    question_id: int
+    question_text: str
+    marks_possible: int
+    marks_obtained: int
+    is_correct: bool
+    option_ids: List[int]
+    options: List[str]
+    selected: Optional[int] = None
+    correct: Optional[int] = None
+
+class CompactQuizResult(BaseModel):
+    quiz_id: int
+    quiz_title: str
+    total_score: int
+    user_score: int
+    completion_time: Optional[datetime] = None
+    questions: List[CompactResultQuestion]
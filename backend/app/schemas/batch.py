@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+# One call inside a batch; path is relative to /user (query string allowed), e.g. /quizzes/3/questions?compact=true
+class BatchItem(BaseModel):
+    method: str = "GET"
+    path: str
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    status: int
+    body: Any = None
+    headers: Optional[Dict[str, str]] = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchItemResult]
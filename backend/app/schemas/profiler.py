@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+# Sampling profiler control (admin)
+class ProfilerStart(BaseModel):
+    sample_rate: float = Field(1.0, gt=0, le=1)  # fraction of matching requests to sample
+    route: Optional[str] = None  # path template, e.g. /api/v1/user/quizzes/{quiz_id}/submit
+    interval_ms: Optional[int] = Field(None, ge=1, le=1000)
+    duration_seconds: Optional[int] = Field(None, gt=0)  # stop automatically after this long
+    reset: bool = True  # discard stacks from earlier runs
@@ -25,11 +25,67 @@ class QuestionCreate(QuestionBase):
 
 class Question(QuestionBase):
     id: int
+    version: int
+    lineage_id: Optional[int] = None
+    superseded_by: Optional[int] = None
     options: List[QuestionOption]
 
     class Config:
         orm_mode = True
 
+# Question Search Schemas
+class QuestionSearchHit(Question):
+    score: float
+
+class QuestionSearchResult(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    results: List[QuestionSearchHit]
+
+# Duplicate Detection Schemas
+class QuestionDuplicate(BaseModel):
+    question_id: int
+    similarity: float
+
+class QuestionImportRequest(BaseModel):
+    questions: List[QuestionCreate]
+
+class QuestionImportSkipped(BaseModel):
+    index: int
+    duplicates: List[QuestionDuplicate]
+
+class QuestionImportResult(BaseModel):
+    created: List[int]
+    skipped: List[QuestionImportSkipped]
+
+class QuestionDuplicateGroup(BaseModel):
+    questions: List[QuestionDuplicate]
+
+# Question Version Schemas
+class QuestionVersionResult(BaseModel):
+    question: Question
+    repinned_quizzes: List[int]  # quizzes without attempts, now mapped to the new version
+    pinned_quizzes: List[int]  # quizzes with attempts, still mapped to the edited version
+
+# Tag Schemas
+class Tag(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        orm_mode = True
+
+class TagSummary(Tag):
+    num_questions: int
+
+class QuestionTagsRequest(BaseModel):
+    tags: List[str]
+
+class QuestionCorrectOptionsRequest(BaseModel):
+    correct_option_ids: List[int]
+    regrade: bool = True
+
 # Quiz Question Mapping Schemas
 class QuizQuestionBase(BaseModel):
     question_id: int
@@ -10,6 +10,7 @@ class QuizBase(BaseModel):
     num_questions: int
     total_score: int
     duration_minutes: int
+    starts_at: Optional[datetime] = None
 
 class QuizCreate(QuizBase):
     pass
@@ -22,12 +23,47 @@ class Quiz(QuizBase):
     class Config:
         orm_mode = True
 
+# Roster to pre-provision attempts for, ahead of a scheduled exam
+class QuizScheduleRequest(BaseModel):
+    user_ids: List[int]
+    starts_at: Optional[datetime] = None
+
+# Quiz Pool Schemas (pooled quizzes draw questions by tag for every attempt)
+class QuizPoolCreate(BaseModel):
+    tag: str
+    num_questions: int
+    marks: int
+
+class QuizPool(BaseModel):
+    id: int
+    tag_id: int
+    num_questions: int
+    marks: int
+
+    class Config:
+        orm_mode = True
+
+class QuizPoolsRequest(BaseModel):
+    pools: List[QuizPoolCreate]
+
 class QuizDetail(Quiz):
     questions: List[QuizQuestionDetail] = []
+    pools: List[QuizPool] = []
 
     class Config:
         orm_mode = True
 
 # Quiz Questions Mapping Request
 class QuizQuestionsRequest(BaseModel):
-    questions: List[QuizQuestionCreate]
\ No newline at end of file
+    questions: List[QuizQuestionCreate]
+
+# Quiz summary with the current user's status (my-quizzes)
+class UserQuiz(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    total_score: int
+    duration_minutes: int
+    status: str
+    score: Optional[int] = None
+    attempt_id: Optional[int] = None
@@ -42,4 +42,16 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: int  # user ID
     exp: datetime
-    is_admin: bool
\ No newline at end of file
+    is_admin: bool
+
+# Per-user performance summary (one materialized row)
+class UserStats(BaseModel):
+    attempts: int = 0
+    total_score: int = 0
+    total_possible: int = 0
+    average_score: float = 0.0
+    average_percentage: float = 0.0
+    best_score: int = 0
+    best_percentage: float = 0.0
+    total_time_seconds: int = 0
+    last_attempt_at: Optional[datetime] = None
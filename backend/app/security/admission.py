@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import math
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from jose import jwt, JWTError
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+TICKET_TYPE = "admission"
+
+# Atomic GCRA step: returns the admit time of a new ticket and advances the quiz's schedule
+_GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tat < now then tat = now end
+local admit_at = math.max(now, tat - (burst - 1) * interval)
+redis.call('SET', KEYS[1], tostring(tat + interval), 'EX', math.ceil(tat + interval - now) + 60)
+return tostring(admit_at)
+"""
+
+
+class AdmissionSchedule:
+    """Per-quiz admission schedule (a virtual waiting room in front of start_quiz).
+
+    Uses GCRA: the first ADMISSION_BURST tickets of a quiz are admitted at
+    once, after which admit times are spaced 1 / ADMISSION_RATE_PER_SECOND
+    apart, so each ticket's wait is known when it is issued. The schedule is
+    kept in Redis when REDIS_URL is set (shared by all workers), in process
+    memory otherwise.
+    """
+
+    def __init__(self):
+        self._tats: Dict[int, float] = {}  # quiz_id -> theoretical arrival time of the next ticket
+        self._lock = Lock()
+
+    def next_admit_at(self, quiz_id: int) -> float:
+        now = time.time()
+        interval = 1 / settings.ADMISSION_RATE_PER_SECOND
+        burst = max(settings.ADMISSION_BURST, 1)
+        redis_client = get_redis()
+        if redis_client:
+            try:
+                return float(redis_client.eval(
+                    _GCRA_SCRIPT, 1, f"admission:{quiz_id}", now, interval, burst
+                ))
+            except Exception:
+                logger.warning("Redis admission schedule unavailable, using in-memory schedule", exc_info=True)
+
+        with self._lock:
+            tat = max(self._tats.get(quiz_id, 0.0), now)
+            self._tats[quiz_id] = tat + interval
+            if len(self._tats) > 10000:
+                self._tats = {key: value for key, value in self._tats.items() if value > now}
+        return max(now, tat - (burst - 1) * interval)
+
+
+admission_schedule = AdmissionSchedule()
+
+
+def issue_ticket(user_id: int, quiz_id: int) -> dict:
+    """A signed admission ticket for one user and quiz, with its estimated wait."""
+    admit_at = admission_schedule.next_admit_at(quiz_id)
+    wait = max(admit_at - time.time(), 0.0)
+    ticket = jwt.encode(
+        {
+            "type": TICKET_TYPE,
+            "sub": str(user_id),
+            "quiz_id": quiz_id,
+            "admit_at": admit_at,
+            "exp": int(admit_at + settings.ADMISSION_TICKET_TTL_SECONDS)
+        },
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM
+    )
+    return {
+        "ticket": ticket,
+        "quiz_id": quiz_id,
+        "admit_at": datetime.utcfromtimestamp(admit_at),
+        "estimated_wait_seconds": round(wait, 3),
+        "queue_position": math.ceil(wait * settings.ADMISSION_RATE_PER_SECOND)
+    }
+
+
+def check_ticket(ticket: Optional[str], user_id: int, quiz_id: int) -> None:
+    """Raise unless `ticket` admits this user to this quiz now.
+
+    428 when the ticket is missing, invalid or expired (get a new one), 429
+    with Retry-After when its admit time has not come yet.
+    """
+    try:
+        payload = jwt.decode(ticket, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]) if ticket else None
+    except JWTError:
+        payload = None
+    if (
+        not payload
+        or payload.get("type") != TICKET_TYPE
+        or payload.get("sub") != str(user_id)
+        or payload.get("quiz_id") != quiz_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+            detail="Admission ticket required"
+        )
+
+    wait = payload["admit_at"] - time.time()
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Not admitted yet",
+            headers={"Retry-After": str(math.ceil(wait))}
+        )
+
+
+# Route classes with their own concurrency limits; other routes are not limited
+ROUTE_CLASSES = [
+    ("auth", re.compile(rf"^{settings.API_V1_PREFIX}/(login|register)$")),
+    ("start", re.compile(rf"^{settings.API_V1_PREFIX}/user/quizzes/\d+/start$")),
+    ("questions", re.compile(rf"^{settings.API_V1_PREFIX}/user/quizzes/\d+/questions$")),
+    ("submit", re.compile(rf"^{settings.API_V1_PREFIX}/user/quizzes/\d+/submit(-async)?$")),
+]
+
+
+def _route_limits() -> Dict[str, int]:
+    return {
+        "auth": settings.CONCURRENCY_LIMIT_AUTH,
+        "start": settings.CONCURRENCY_LIMIT_START,
+        "questions": settings.CONCURRENCY_LIMIT_QUESTIONS,
+        "submit": settings.CONCURRENCY_LIMIT_SUBMIT,
+    }
+
+
+class ServerBusy(Exception):
+    """No slot of the route class freed up within CONCURRENCY_QUEUE_SECONDS."""
+
+    def __init__(self):
+        super().__init__("Server busy, retry shortly")
+        self.retry_after = math.ceil(settings.CONCURRENCY_QUEUE_SECONDS)
+
+
+class ConcurrencyLimiter:
+    """In-flight call limits per route class in this worker.
+
+    A call over its class's limit waits up to CONCURRENCY_QUEUE_SECONDS for
+    a slot and is then shed, so a surge on one class (bcrypt logins at exam
+    open) queues briefly or fails fast instead of exhausting the thread and
+    DB pools that every other route needs. Shared by the middleware and the
+    batch endpoint, whose calls are limited one by one like direct requests.
+    """
+
+    def __init__(self):
+        self._semaphores = {
+            name: asyncio.Semaphore(limit) for name, limit in _route_limits().items() if limit > 0
+        }
+
+    def route_class(self, path: str) -> Optional[str]:
+        for name, pattern in ROUTE_CLASSES:
+            if name in self._semaphores and pattern.match(path):
+                return name
+        return None
+
+    @asynccontextmanager
+    async def slot(self, path: str):
+        route_class = self.route_class(path)
+        if route_class is None:
+            yield
+            return
+
+        semaphore = self._semaphores[route_class]
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=settings.CONCURRENCY_QUEUE_SECONDS)
+        except asyncio.TimeoutError:
+            raise ServerBusy()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+concurrency_limiter = ConcurrencyLimiter()
+
+
+class ConcurrencyLimitMiddleware:
+    """ASGI middleware applying the concurrency limiter; a shed request gets 503 and Retry-After."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with concurrency_limiter.slot(scope["path"]):
+                await self.app(scope, receive, send)
+        except ServerBusy as e:
+            await self._reject(send, retry_after=e.retry_after)
+
+    async def _reject(self, send, retry_after: int):
+        payload = json.dumps({"detail": "Server busy, retry shortly"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Auth routes are additionally limited per username (they run bcrypt)
+AUTH_PATHS = {
+    f"{settings.API_V1_PREFIX}/login",
+    f"{settings.API_V1_PREFIX}/register",
+}
+
+# Largest auth request body we inspect for a username
+MAX_AUTH_BODY_BYTES = 16 * 1024
+
+
+class FixedWindowCounter:
+    """In-memory fixed-window request counter keyed by string."""
+
+    def __init__(self):
+        # key -> (window index, count, window end)
+        self._windows: Dict[str, Tuple[int, int, float]] = {}
+        self._lock = Lock()
+        self._last_prune = 0.0
+
+    def hit(self, key: str, window_seconds: int) -> int:
+        now = time.monotonic()
+        window = int(now // window_seconds)
+        with self._lock:
+            if now - self._last_prune > 60:
+                self._prune(now)
+            current_window, count, _ = self._windows.get(key, (window, 0, 0.0))
+            count = count + 1 if current_window == window else 1
+            self._windows[key] = (window, count, (window + 1) * window_seconds)
+            return count
+
+    # Drop counters whose window has ended
+    def _prune(self, now: float) -> None:
+        self._last_prune = now
+        self._windows = {key: value for key, value in self._windows.items() if value[2] > now}
+
+
+_memory_counter = FixedWindowCounter()
+
+
+def _redis_hit(redis_client, key: str, window_seconds: int) -> int:
+    redis_key = f"pre_auth:{key}:{int(time.time() // window_seconds)}"
+    pipe = redis_client.pipeline()
+    pipe.incr(redis_key)
+    pipe.expire(redis_key, window_seconds)
+    count, _ = pipe.execute()
+    return int(count)
+
+
+async def _hit(key: str, window_seconds: int) -> int:
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            # The Redis round trip runs in the loop's executor so it never blocks the event loop
+            return await asyncio.get_running_loop().run_in_executor(None, _redis_hit, redis_client, key, window_seconds)
+        except Exception:
+            logger.warning("Redis rate limiter unavailable, using in-memory counters", exc_info=True)
+    return _memory_counter.hit(key, window_seconds)
+
+
+# Proxies append to X-Forwarded-For, so only the entries our own proxies added can be trusted: the
+# client as seen by the outermost one is FORWARDED_FOR_HOPS from the right. Anything further left is
+# whatever the client sent
+def _client_ip(scope) -> str:
+    if settings.TRUST_FORWARDED_FOR:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                entries = [entry.strip() for entry in value.decode("latin-1").split(",")]
+                return entries[-min(settings.FORWARDED_FOR_HOPS, len(entries))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _username_from_body(body: bytes, content_type: str) -> Optional[str]:
+    try:
+        if content_type.startswith("application/json"):
+            username = json.loads(body or b"{}").get("username")
+        else:
+            username = parse_qs(body.decode("utf-8")).get("username", [None])[0]
+    except (ValueError, AttributeError, UnicodeDecodeError):
+        return None
+    return str(username).strip().lower() if username else None
+
+
+class PreAuthRateLimitMiddleware:
+    """ASGI middleware that sheds floods before any DB, JWT or bcrypt work.
+
+    Every request is counted per client IP; /login and /register are also
+    counted per IP and per submitted username over a one-minute window.
+    Counters live in Redis when REDIS_URL is set, in process memory otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ip = _client_ip(scope)
+        if await _hit(f"ip:{ip}", 1) > settings.IP_RATE_LIMIT_PER_SECOND:
+            await self._reject(send, retry_after=1)
+            return
+
+        if scope["path"] in AUTH_PATHS and scope["method"] == "POST":
+            if await _hit(f"auth_ip:{ip}", 60) > settings.AUTH_RATE_LIMIT_PER_MINUTE:
+                await self._reject(send, retry_after=60)
+                return
+
+            body, receive = await self._buffer_body(receive)
+            if body is None:
+                await self._reject(send, retry_after=60, status=413, detail="Request body too large")
+                return
+
+            headers = dict(scope.get("headers", []))
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            username = _username_from_body(body, content_type)
+            if username and await _hit(f"auth_user:{username}", 60) > settings.AUTH_USERNAME_RATE_LIMIT_PER_MINUTE:
+                await self._reject(send, retry_after=60)
+                return
+
+        await self.app(scope, receive, send)
+
+    # Read the whole body, then hand downstream a receive() that replays it
+    async def _buffer_body(self, receive):
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_AUTH_BODY_BYTES:
+                return None, receive
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay
+
+    async def _reject(self, send, retry_after: int, status: int = 429, detail: str = "Rate limit exceeded"):
+        payload = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
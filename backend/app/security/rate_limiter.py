@@ -4,21 +4,15 @@ from app.database import get_db
 from app.models.user import User, RateLimit
 from app.security.jwt import get_current_user
 from app.config import settings
+from app.utils.redis_client import get_redis
 from datetime import datetime, timedelta
+import asyncio
 import time
 from functools import wraps
-import redis
-
-# Redis client for rate limiting (if available)
-redis_client = None
-if settings.REDIS_URL:
-    try:
-        redis_client = redis.from_url(settings.REDIS_URL)
-    except:
-        redis_client = None
 
 # Rate limiting middleware using Redis (more scalable approach)
 async def redis_rate_limiter(request: Request, user: User = Depends(get_current_user)):
+    redis_client = get_redis()
     if not redis_client:
         return
     
@@ -43,13 +37,13 @@ async def redis_rate_limiter(request: Request, user: User = Depends(get_current_
             )
         redis_client.incr(key)
 
-# Rate limiting using database (fallback if Redis is not available)
-async def db_rate_limiter(request: Request, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+# Count one request against the user's database window; False once the limit is reached
+def _count_request(db: Session, user_id: int) -> bool:
     # Get or create rate limit record for user
-    rate_limit = db.query(RateLimit).filter(RateLimit.user_id == user.id).first()
+    rate_limit = db.query(RateLimit).filter(RateLimit.user_id == user_id).first()
     
     if not rate_limit:
-        rate_limit = RateLimit(user_id=user.id)
+        rate_limit = RateLimit(user_id=user_id)
         db.add(rate_limit)
         db.commit()
         db.refresh(rate_limit)
@@ -63,20 +57,29 @@ async def db_rate_limiter(request: Request, user: User = Depends(get_current_use
     else:
         # Check if limit exceeded
         if rate_limit.request_count >= settings.RATE_LIMIT_PER_SECOND:
-            # Too many requests
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded",
-                headers={"Retry-After": "1"}
-            )
+            db.rollback()
+            return False
         # Increment counter
         rate_limit.request_count += 1
     
     db.commit()
+    return True
+
+# Rate limiting using database (fallback if Redis is not available)
+async def db_rate_limiter(request: Request, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # The counter update is a write: under SQLite it can wait on the process-wide write lock, so keep it off the loop
+    allowed = await asyncio.get_running_loop().run_in_executor(None, _count_request, db, user.id)
+    if not allowed:
+        # Too many requests
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": "1"}
+        )
 
 # Rate limiter dependency that chooses the appropriate implementation
 async def rate_limiter(request: Request, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if redis_client:
+    if get_redis():
         await redis_rate_limiter(request, user)
     else:
         await db_rate_limiter(request, user, db)
\ No newline at end of file
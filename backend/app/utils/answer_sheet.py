@@ -0,0 +1,76 @@
+import sys
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.utils.grading import AnswerKey
+
+# A packed answer sheet is a flat little-endian uint32 array of
+# (question_id, selected_option_id) pairs in question-number order, with 0 for
+# "no answer". 100 questions take 800 bytes in a single quiz_attempts column
+# instead of 100 quiz_responses rows.
+
+# Per-question view of a packed sheet, shaped like a QuizResponse row.
+# Packed attempts have no response rows, so `id` is the question's position.
+SheetResponse = namedtuple(
+    "SheetResponse",
+    ["id", "attempt_id", "question_id", "selected_option_id", "is_correct", "marks_obtained"]
+)
+
+
+def _to_array(values: Iterable[int]) -> array:
+    packed = array("I", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed
+
+
+def pack(pairs: Iterable[Tuple[int, Optional[int]]]) -> bytes:
+    flat = []
+    for question_id, option_id in pairs:
+        flat.append(question_id)
+        flat.append(option_id or 0)
+    return _to_array(flat).tobytes()
+
+
+def unpack(sheet: bytes) -> List[Tuple[int, Optional[int]]]:
+    flat = array("I")
+    flat.frombytes(sheet)
+    if sys.byteorder != "little":
+        flat.byteswap()
+    return [(flat[i], flat[i + 1] or None) for i in range(0, len(flat), 2)]
+
+
+def new_sheet(question_ids: Iterable[int]) -> bytes:
+    return pack((question_id, None) for question_id in question_ids)
+
+
+def selections(sheet: bytes) -> Dict[int, Optional[int]]:
+    return dict(unpack(sheet))
+
+
+def grade_sheet(
+    answer_key: AnswerKey,
+    sheet: bytes,
+    answers: Iterable[Tuple[int, Optional[int]]]
+) -> Tuple[int, bytes]:
+    """Merge answers into a packed sheet and grade the whole sheet.
+
+    Answers for questions that are not on the sheet are ignored. Returns the
+    total score and the updated sheet.
+    """
+    answers = dict(answers)
+    pairs = [
+        (question_id, answers.get(question_id, option_id))
+        for question_id, option_id in unpack(sheet)
+    ]
+    total_score = sum(answer_key.grade(question_id, option_id)[1] for question_id, option_id in pairs)
+    return total_score, pack(pairs)
+
+
+# Expand a sheet into response-shaped rows; ungraded (in-progress) when answer_key is None
+def sheet_responses(attempt_id: int, sheet: bytes, answer_key: Optional[AnswerKey]) -> List[SheetResponse]:
+    responses = []
+    for position, (question_id, option_id) in enumerate(unpack(sheet), start=1):
+        is_correct, marks_obtained = answer_key.grade(question_id, option_id) if answer_key else (False, 0)
+        responses.append(SheetResponse(position, attempt_id, question_id, option_id, is_correct, marks_obtained))
+    return responses
@@ -0,0 +1,113 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Union
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
+from app.models.archive import ArchivedQuizAttempt, ArchivedQuizResponse
+
+logger = logging.getLogger(__name__)
+
+ATTEMPT_COLUMNS = ["id", "user_id", "quiz_id", "status", "start_time", "end_time", "score", "answer_sheet", "paper_seed", "paper_high_water"]
+RESPONSE_COLUMNS = ["id", "attempt_id", "question_id", "selected_option_id", "is_correct", "marks_obtained"]
+
+
+def archive_completed_attempts(job=None, older_than_days: Optional[int] = None, chunk_size: Optional[int] = None) -> dict:
+    """Move completed attempts older than the cutoff, with their responses, to the archive tables.
+
+    Works in chunks of `chunk_size` attempts, one short transaction each, so
+    hot-table locks are held briefly. Safe to re-run; progress is reported on
+    `job` when given.
+    """
+    older_than_days = older_than_days if older_than_days is not None else settings.ARCHIVE_AFTER_DAYS
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    attempts_table = QuizAttempt.__table__
+    responses_table = QuizResponse.__table__
+    totals = {"attempts": 0, "responses": 0, "cutoff": cutoff.isoformat()}
+
+    while True:
+        db = SessionLocal()
+        try:
+            attempt_ids = [
+                attempt_id for (attempt_id,) in db.query(QuizAttempt.id).filter(
+                    QuizAttempt.status == AttemptStatus.completed,
+                    QuizAttempt.end_time < cutoff
+                ).order_by(QuizAttempt.id).limit(chunk_size).all()
+            ]
+            if not attempt_ids:
+                break
+
+            db.execute(
+                insert(ArchivedQuizAttempt.__table__).from_select(
+                    ATTEMPT_COLUMNS + ["archived_at"],
+                    select(*[attempts_table.c[name] for name in ATTEMPT_COLUMNS], literal(datetime.utcnow())).where(
+                        attempts_table.c.id.in_(attempt_ids)
+                    )
+                )
+            )
+            db.execute(
+                insert(ArchivedQuizResponse.__table__).from_select(
+                    RESPONSE_COLUMNS,
+                    select(*[responses_table.c[name] for name in RESPONSE_COLUMNS]).where(
+                        responses_table.c.attempt_id.in_(attempt_ids)
+                    )
+                )
+            )
+            moved_responses = db.execute(
+                delete(responses_table).where(responses_table.c.attempt_id.in_(attempt_ids))
+            ).rowcount
+            db.execute(delete(attempts_table).where(attempts_table.c.id.in_(attempt_ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        totals["attempts"] += len(attempt_ids)
+        totals["responses"] += moved_responses
+        if job is not None:
+            job.progress = dict(totals)
+
+    logger.info("Archived %(attempts)s attempts and %(responses)s responses", totals)
+    return totals
+
+
+# Latest completed attempt (or the given one), falling back to the archive when the hot table has none
+def find_completed_attempt(db: Session, user_id: int, quiz_id: int, attempt_id: Optional[int] = None) -> Optional[Union[QuizAttempt, ArchivedQuizAttempt]]:
+    query = db.query(QuizAttempt).filter(
+        QuizAttempt.user_id == user_id,
+        QuizAttempt.quiz_id == quiz_id,
+        QuizAttempt.status == AttemptStatus.completed
+    )
+    if attempt_id is not None:
+        query = query.filter(QuizAttempt.id == attempt_id)
+    attempt = query.order_by(QuizAttempt.id.desc()).first()
+
+    if attempt is None:
+        query = db.query(ArchivedQuizAttempt).filter(
+            ArchivedQuizAttempt.user_id == user_id,
+            ArchivedQuizAttempt.quiz_id == quiz_id,
+            ArchivedQuizAttempt.status == AttemptStatus.completed
+        )
+        if attempt_id is not None:
+            query = query.filter(ArchivedQuizAttempt.id == attempt_id)
+        attempt = query.order_by(ArchivedQuizAttempt.id.desc()).first()
+    return attempt
+
+
+# Response rows for an attempt from whichever table holds it
+def attempt_responses(db: Session, attempt) -> List:
+    if isinstance(attempt, ArchivedQuizAttempt):
+        return db.query(ArchivedQuizResponse).filter(ArchivedQuizResponse.attempt_id == attempt.id).all()
+    return db.query(QuizResponse).filter(QuizResponse.attempt_id == attempt.id).all()
+
+
+if __name__ == "__main__":
+    # Run from cron: python -m app.utils.archival
+    logging.basicConfig(level=logging.INFO)
+    archive_completed_attempts()
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from fastapi import HTTPException, Request, Response
+from fastapi.dependencies.utils import solve_dependencies
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute, run_endpoint_function, serialize_response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from starlette.routing import Match
+from app.database import get_db, get_read_db, READ_PRIMARY_HEADER
+from app.models.user import User
+from app.security.admission import concurrency_limiter, ServerBusy
+from app.security.jwt import get_current_user, oauth2_scheme
+from app.security.rate_limiter import rate_limiter
+from app.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Headers a sub-request may set that belong on the batch response itself
+FORWARDED_HEADERS = (b"set-cookie", READ_PRIMARY_HEADER.lower().encode())
+
+
+class BatchExecutor:
+    """Runs a list of calls to one router's routes inside a single request.
+
+    Each call is matched to its route and its endpoint is invoked directly,
+    in order, with dependencies solved by FastAPI as usual, except that the
+    expensive shared ones (token, user, DB session, rate limiter) are taken
+    from the batch request: authentication and the rate-limit check run
+    once and every call uses the same session, so later calls see earlier
+    calls' writes. Each call takes a slot of its route class's concurrency
+    limit like a direct request would. Sync endpoints and dependencies run in
+    the threadpool as usual. A failing call, whatever the error, yields its
+    status in its slot and does not stop the batch.
+    """
+
+    def __init__(self, router, prefix: str = "", exclude: Tuple[str, ...] = ()):
+        self.router = router
+        self.prefix = prefix
+        self.exclude = exclude
+
+    def _match(self, scope: dict) -> Tuple[Optional[APIRoute], dict, bool]:
+        # (route, child scope, path matched under another method)
+        path_matched = False
+        for route in self.router.routes:
+            if not isinstance(route, APIRoute) or route.path in self.exclude:
+                continue
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope, False
+            if match == Match.PARTIAL:
+                path_matched = True
+        return None, {}, path_matched
+
+    async def run(self, request: Request, items: List[Any], db: Session, current_user: User) -> Response:
+        token = await oauth2_scheme(request)
+        shared = {
+            (oauth2_scheme, ()): token,
+            (get_current_user, ()): current_user,
+            (get_db, ()): db,
+            (get_read_db, ()): db,
+            (rate_limiter, ()): None,
+        }
+
+        results = []
+        forwarded = []
+        for item in items:
+            result, headers = await self._call(request, item, db, dict(shared))
+            forwarded += [
+                header for header in headers if header[0] in FORWARDED_HEADERS and header not in forwarded
+            ]
+            results.append(result)
+
+        response = Response(content=render(results), media_type="application/json")
+        response.raw_headers.extend(forwarded)
+        return response
+
+    async def _call(self, request: Request, item, db: Session, dependency_cache: Dict) -> Tuple[dict, list]:
+        # Paths may be given relative to the router or in full
+        url = urlsplit(item.path)
+        path = url.path[len(self.prefix):] if self.prefix and url.path.startswith(self.prefix + "/") else url.path
+        scope = {
+            **request.scope,
+            "method": item.method.upper(),
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": url.query.encode(),
+            "headers": [(name, value) for name, value in request.scope["headers"] if name != b"content-length"],
+        }
+
+        route, child_scope, path_matched = self._match(scope)
+        if route is None:
+            if path_matched:
+                return {"status": 405, "body": {"detail": "Method Not Allowed"}}, []
+            return {"status": 404, "body": {"detail": "Not Found"}}, []
+        scope.update(child_scope)
+        sub_request = Request(scope)
+
+        try:
+            async with concurrency_limiter.slot(self.prefix + path):
+                return await self._invoke(route, sub_request, item, dependency_cache)
+        except ServerBusy as e:
+            return {"status": 503, "body": {"detail": str(e)}, "headers": {"Retry-After": str(e.retry_after)}}, []
+        except HTTPException as e:
+            # The call's partial work must not leak into the next one on the shared session
+            await self._rollback(db)
+            result = {"status": e.status_code, "body": {"detail": e.detail}}
+            if e.headers:
+                result["headers"] = dict(e.headers)
+            return result, []
+        except RequestValidationError as e:
+            await self._rollback(db)
+            return {"status": 422, "body": {"detail": jsonable_encoder(e.errors())}}, []
+        except Exception:
+            logger.exception("Batch call %s %s failed", item.method, item.path)
+            await self._rollback(db)
+            return {"status": 500, "body": {"detail": "Internal Server Error"}}, []
+
+    @staticmethod
+    async def _rollback(db: Session) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, db.rollback)
+
+    async def _invoke(self, route: APIRoute, sub_request: Request, item, dependency_cache: Dict) -> Tuple[dict, list]:
+        values, errors, background_tasks, sub_response, _ = await solve_dependencies(
+            request=sub_request,
+            dependant=route.dependant,
+            body=item.body,
+            dependency_cache=dependency_cache,
+        )
+        if errors:
+            raise RequestValidationError(errors)
+        is_coroutine = asyncio.iscoroutinefunction(route.dependant.call)
+        content = await run_endpoint_function(dependant=route.dependant, values=values, is_coroutine=is_coroutine)
+
+        if background_tasks:
+            await background_tasks()
+
+        if isinstance(content, Response):
+            body = content.body
+            headers = content.raw_headers + sub_response.raw_headers
+            status_code = content.status_code
+            if content.media_type == "application/json" and body:
+                # Already-serialized JSON (papers, FastJSONResponse) is spliced in as is
+                return {"status": status_code, "raw": body}, headers
+            body = body.decode()
+        else:
+            body = await serialize_response(
+                field=route.response_field,
+                response_content=content,
+                exclude_unset=route.response_model_exclude_unset,
+                exclude_defaults=route.response_model_exclude_defaults,
+                exclude_none=route.response_model_exclude_none,
+                is_coroutine=is_coroutine,
+            )
+            headers = sub_response.raw_headers
+            status_code = sub_response.status_code or route.status_code or 200
+        return {"status": status_code, "body": body}, headers
+
+
+def render(results: List[dict]) -> bytes:
+    """Serialize batch results, splicing pre-serialized JSON bodies in without re-encoding them."""
+    parts = []
+    for result in results:
+        raw = result.pop("raw", None)
+        if raw is None:
+            parts.append(dumps(result))
+        else:
+            parts.append(dumps(result)[:-1] + b',"body":' + raw + b"}")
+    return b'{"responses":[' + b",".join(parts) + b"]}"
@@ -0,0 +1,124 @@
+import gzip
+import anyio
+from app.config import settings
+
+# brotli is optional; without it only gzip is negotiated
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Only text payloads are worth compressing
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+
+def _accepted_encodings(scope) -> set:
+    accepted = set()
+    for name, value in scope.get("headers", []):
+        if name != b"accept-encoding":
+            continue
+        for token in value.decode("latin-1").lower().split(","):
+            encoding, _, params = token.partition(";")
+            params = params.strip()
+            try:
+                quality = float(params[2:]) if params.startswith("q=") else 1.0
+            except ValueError:
+                quality = 1.0
+            if quality > 0:
+                accepted.add(encoding.strip())
+    return accepted
+
+
+def choose_encoding(scope) -> str:
+    accepted = _accepted_encodings(scope)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return ""
+
+
+def compressible(headers: dict) -> bool:
+    return b"content-encoding" not in headers and headers.get(b"content-type", b"").startswith(COMPRESSIBLE_TYPES)
+
+
+# Merge Accept-Encoding into the Vary header, so caches keep encoded and plain responses apart
+def with_vary(headers: list) -> list:
+    vary = {value for name, value in headers if name == b"vary"}
+    return [(name, value) for name, value in headers if name != b"vary"] + [
+        (b"vary", b", ".join(sorted(vary | {b"Accept-Encoding"})))
+    ]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip, as the client accepts.
+
+    Only complete responses (a single body message, which is how every
+    non-streaming route responds) of at least COMPRESSION_MIN_BYTES with a
+    text content type are compressed; streamed responses such as the live
+    SSE feed pass through untouched so nothing is buffered. Bodies of
+    COMPRESSION_THREAD_MIN_BYTES or more are compressed in the threadpool to
+    keep the event loop free. Every text response carries
+    `Vary: Accept-Encoding`, whether or not this one was compressed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(scope)
+        if not encoding:
+            async def send_identity(message):
+                if message["type"] == "http.response.start" and compressible(dict(message.get("headers", []))):
+                    message = {**message, "headers": with_vary(message.get("headers", []))}
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = dict(start.get("headers", []))
+            body = message.get("body", b"")
+            if not compressible(headers):
+                await send(start)
+                await send(message)
+                return
+            if message.get("more_body", False) or len(body) < settings.COMPRESSION_MIN_BYTES:
+                await send({**start, "headers": with_vary(start.get("headers", []))})
+                await send(message)
+                return
+
+            if len(body) >= settings.COMPRESSION_THREAD_MIN_BYTES:
+                body = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers = [(name, value) for name, value in start.get("headers", []) if name != b"content-length"]
+            headers = with_vary(headers) + [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
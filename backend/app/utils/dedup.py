@@ -0,0 +1,225 @@
+import hashlib
+import random
+import re
+import sys
+import threading
+import unicodedata
+import zlib
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.question import Question
+
+# MinHash signature: NUM_PERM minimums over character shingles, split into
+# LSH_BANDS bands of NUM_PERM / LSH_BANDS rows. Two questions with estimated
+# Jaccard similarity s share a band with probability 1 - (1 - s^4)^16, which
+# is ~0.98 at s = 0.8 and ~0.05 at s = 0.3.
+NUM_PERM = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20261019)  # fixed seed: stored signatures must stay comparable
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode()).hexdigest()
+
+
+def _shingles(normalized: str) -> Set[int]:
+    if len(normalized) <= SHINGLE_SIZE:
+        return {zlib.crc32(normalized.encode())}
+    return {
+        zlib.crc32(normalized[i:i + SHINGLE_SIZE].encode())
+        for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(text: str) -> bytes:
+    shingles = _shingles(normalize(text))
+    signature = array("Q", (
+        min((a * shingle + b) % _MERSENNE_PRIME for shingle in shingles)
+        for a, b in _PERMUTATIONS
+    ))
+    if sys.byteorder != "little":
+        signature.byteswap()
+    return signature.tobytes()
+
+
+def _signature(data: bytes) -> array:
+    signature = array("Q")
+    signature.frombytes(data)
+    if sys.byteorder != "little":
+        signature.byteswap()
+    return signature
+
+
+def similarity(first: array, second: array) -> float:
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def fingerprint(question: Question) -> None:
+    question.text_hash = text_hash(question.question)
+    question.minhash = minhash(question.question)
+
+
+class DuplicateIndex:
+    """In-process LSH index over the stored MinHash signatures.
+
+    Exact duplicates are found through the indexed `questions.text_hash`
+    column; near duplicates by looking up a signature's LSH bands, so a check
+    touches a handful of candidate questions instead of the whole bank.
+    Like the search index, it catches up on questions created by other
+    workers (ids above the highest one indexed) before each lookup, and
+    fingerprints any rows stored before the columns existed. Only current
+    versions are indexed: `remove()` drops an edited question, and a new
+    version picked up from another worker drops the one it superseded.
+    """
+
+    def __init__(self):
+        self._signatures: Dict[int, array] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = defaultdict(set)
+        self._max_question_id = 0
+        self._lock = threading.RLock()
+
+    def _bands(self, signature: array) -> List[Tuple[int, bytes]]:
+        rows = NUM_PERM // LSH_BANDS
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+    def add(self, question_id: int, signature_bytes: bytes) -> None:
+        signature = _signature(signature_bytes)
+        with self._lock:
+            if question_id in self._signatures:
+                return
+            self._signatures[question_id] = signature
+            for band in self._bands(signature):
+                self._buckets[band].add(question_id)
+            self._max_question_id = max(self._max_question_id, question_id)
+
+    def remove(self, question_id: int) -> None:
+        with self._lock:
+            signature = self._signatures.pop(question_id, None)
+            if signature is None:
+                return
+            for band in self._bands(signature):
+                members = self._buckets.get(band)
+                if members is not None:
+                    members.discard(question_id)
+                    if not members:
+                        del self._buckets[band]
+
+    def catch_up(self, db: Session) -> None:
+        with self._lock:
+            rows = db.query(Question.id, Question.question, Question.minhash, Question.version).filter(
+                Question.id > self._max_question_id,
+                Question.superseded_by.is_(None)
+            ).order_by(Question.id).all()
+
+            # Fingerprint rows that predate the text_hash/minhash columns
+            missing = [
+                {"id": question_id, "text_hash": text_hash(text), "minhash": minhash(text)}
+                for question_id, text, signature, _ in rows if signature is None
+            ]
+            if missing:
+                db.execute(update(Question), missing)
+                db.commit()
+            backfilled = {row["id"]: row["minhash"] for row in missing}
+
+            for question_id, _, signature, _ in rows:
+                self.add(question_id, signature or backfilled[question_id])
+
+            # New versions from other workers supersede questions that may already be indexed
+            edits = [question_id for question_id, _, _, version in rows if version > 1]
+            if edits:
+                for (question_id,) in db.query(Question.id).filter(Question.superseded_by.in_(edits)):
+                    self.remove(question_id)
+
+    def near(self, signature_bytes: bytes, threshold: float, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        signature = _signature(signature_bytes)
+        with self._lock:
+            candidates = set()
+            for band in self._bands(signature):
+                candidates |= self._buckets.get(band, set())
+            candidates.discard(exclude)
+            matches = [
+                (question_id, similarity(signature, self._signatures[question_id]))
+                for question_id in candidates
+            ]
+        return sorted(
+            [(question_id, score) for question_id, score in matches if score >= threshold],
+            key=lambda match: (-match[1], match[0])
+        )
+
+    def groups(self, threshold: float) -> List[List[Tuple[int, float]]]:
+        """Clusters of near-duplicate questions, from the shared LSH buckets."""
+        with self._lock:
+            parent = {}
+
+            def find(question_id):
+                while parent.get(question_id, question_id) != question_id:
+                    question_id = parent[question_id]
+                return question_id
+
+            best: Dict[int, float] = {}
+            for members in self._buckets.values():
+                if len(members) < 2:
+                    continue
+                ordered = sorted(members)
+                for i, first in enumerate(ordered):
+                    for second in ordered[i + 1:]:
+                        score = similarity(self._signatures[first], self._signatures[second])
+                        if score < threshold:
+                            continue
+                        root_first, root_second = find(first), find(second)
+                        if root_first != root_second:
+                            parent[max(root_first, root_second)] = min(root_first, root_second)
+                        best[first] = max(best.get(first, 0), score)
+                        best[second] = max(best.get(second, 0), score)
+
+            clusters = defaultdict(list)
+            for question_id in best:
+                clusters[find(question_id)].append((question_id, best[question_id]))
+        return sorted((sorted(members) for members in clusters.values()), key=lambda members: members[0][0])
+
+
+duplicate_index = DuplicateIndex()
+
+
+def find_duplicates(
+    db: Session,
+    questions: List[Question],
+    threshold: Optional[float] = None
+) -> List[List[Tuple[int, float]]]:
+    """Existing questions that duplicate each of some fingerprinted, unsaved questions.
+
+    One indexed text_hash query for the whole list plus an LSH lookup per
+    question. Returns (question_id, similarity) pairs per question, exact
+    duplicates first with similarity 1.0.
+    """
+    threshold = settings.DUPLICATE_THRESHOLD if threshold is None else threshold
+    exact = defaultdict(list)
+    for question_id, hash_value in db.query(Question.id, Question.text_hash).filter(
+        Question.text_hash.in_({question.text_hash for question in questions}),
+        Question.superseded_by.is_(None)
+    ).order_by(Question.id).all():
+        exact[hash_value].append(question_id)
+    duplicate_index.catch_up(db)
+
+    results = []
+    for question in questions:
+        matches = [(question_id, 1.0) for question_id in exact[question.text_hash]]
+        seen = set(exact[question.text_hash])
+        matches += [match for match in duplicate_index.near(question.minhash, threshold) if match[0] not in seen]
+        results.append(matches)
+    return results
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.config import settings
+from app.utils.redis_client import get_redis
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Attempt event types
+ATTEMPT_STARTED = "attempt_started"
+SUBMISSION_QUEUED = "submission_queued"
+ATTEMPT_SUBMITTED = "attempt_submitted"
+
+REDIS_CHANNEL_PREFIX = "quiz_events"
+
+
+class QuizCounters:
+    """In-progress/completed counts for one quiz: a seed query plus the events since.
+
+    An event can be published after its commit but only reach the counters
+    after the seed has read that commit. The seed therefore records the
+    highest attempt id it saw and the status of each attempt it saw that was
+    not completed yet. An event for an attempt at or below that id only counts
+    if the attempt has not reached the event's status in the seed.
+    """
+
+    def __init__(self, in_progress: int = 0, completed: int = 0, high_water: int = 0,
+                 open_attempts: Optional[Dict[int, str]] = None):
+        self.in_progress = in_progress
+        self.completed = completed
+        self.high_water = high_water
+        self._open = dict(open_attempts or {})  # attempt id -> "scheduled"/"in_progress" as of the seed
+
+    def apply(self, event: dict) -> None:
+        attempt_id = event.get("attempt_id", 0)
+        seeded = attempt_id <= self.high_water
+        if event["type"] == ATTEMPT_STARTED:
+            if seeded:
+                if self._open.get(attempt_id) != "scheduled":
+                    return
+                self._open[attempt_id] = "in_progress"
+            self.in_progress += 1
+        elif event["type"] == ATTEMPT_SUBMITTED:
+            if seeded:
+                if self._open.get(attempt_id) != "in_progress":
+                    return
+                del self._open[attempt_id]
+            self.in_progress = max(self.in_progress - 1, 0)
+            self.completed += 1
+
+    def to_dict(self) -> dict:
+        return {"in_progress": self.in_progress, "completed": self.completed}
+
+
+class EventBroker:
+    """Pub/sub for live attempt events, per quiz.
+
+    Events are published from request threads and delivered to asyncio
+    subscribers (SSE streams) on the event loop. With EVENTS_REDIS set, events
+    go through Redis pub/sub so every worker sees every other worker's events.
+    Per-quiz counters are seeded from one query on first subscription and
+    then maintained incrementally from the event stream. Events that arrive
+    while the seed query runs are held back and folded in once it lands.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, List[asyncio.Queue]] = defaultdict(list)
+        self._counters: Dict[int, QuizCounters] = {}
+        self._seeding: Dict[int, List[dict]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis_thread: Optional[threading.Thread] = None
+
+    def _redis(self):
+        return get_redis() if settings.EVENTS_REDIS else None
+
+    def publish(self, quiz_id: int, event_type: str, **data) -> None:
+        event = {"type": event_type, "quiz_id": quiz_id, "at": datetime.utcnow().isoformat(), **data}
+        redis_client = self._redis()
+        if redis_client:
+            try:
+                redis_client.publish(f"{REDIS_CHANNEL_PREFIX}:{quiz_id}", dumps(event))
+                return
+            except Exception:
+                logger.warning("Redis publish failed, delivering locally", exc_info=True)
+        self._deliver(event)
+
+    def _deliver(self, event: dict) -> None:
+        quiz_id = event["quiz_id"]
+        with self._lock:
+            counters = self._counters.get(quiz_id)
+            if counters is not None:
+                counters.apply(event)
+                event = {**event, "counters": counters.to_dict()}
+            elif quiz_id in self._seeding:
+                self._seeding[quiz_id].append(event)
+            queues = list(self._subscribers.get(quiz_id, ()))
+            loop = self._loop
+
+        if loop is None:
+            return
+        for subscriber in queues:
+            loop.call_soon_threadsafe(_offer, subscriber, event)
+
+    async def subscribe(self, quiz_id: int, seed_counters: Callable[[], QuizCounters]) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        self._ensure_redis_listener()
+        subscriber: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_SUBSCRIBER_BUFFER)
+
+        # Buffer events published during the seed query; the seed's high-water mark drops the ones it already counted
+        with self._lock:
+            needs_seed = quiz_id not in self._counters and quiz_id not in self._seeding
+            if needs_seed:
+                self._seeding[quiz_id] = []
+            self._subscribers[quiz_id].append(subscriber)
+
+        if needs_seed:
+            try:
+                seed = await self._loop.run_in_executor(None, seed_counters)
+            except BaseException:
+                self.unsubscribe(quiz_id, subscriber)
+                raise
+            with self._lock:
+                pending = self._seeding.pop(quiz_id, None)
+                if pending is not None:
+                    for event in pending:
+                        seed.apply(event)
+                    self._counters[quiz_id] = seed
+        return subscriber
+
+    def unsubscribe(self, quiz_id: int, subscriber: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(quiz_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                # Nobody watching: stop maintaining counters, reseed on next subscribe
+                self._subscribers.pop(quiz_id, None)
+                self._counters.pop(quiz_id, None)
+                self._seeding.pop(quiz_id, None)
+
+    def counters(self, quiz_id: int) -> Optional[dict]:
+        with self._lock:
+            counters = self._counters.get(quiz_id)
+            return counters.to_dict() if counters else None
+
+    def _ensure_redis_listener(self) -> None:
+        redis_client = self._redis()
+        if not redis_client or (self._redis_thread and self._redis_thread.is_alive()):
+            return
+
+        def listen():
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(f"{REDIS_CHANNEL_PREFIX}:*")
+            for message in pubsub.listen():
+                try:
+                    self._deliver(loads(message["data"]))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Ignoring malformed quiz event")
+
+        self._redis_thread = threading.Thread(target=listen, name="quiz-events", daemon=True)
+        self._redis_thread.start()
+
+
+def _offer(subscriber: asyncio.Queue, event: dict) -> None:
+    # A slow consumer drops events rather than buffering without bound
+    try:
+        subscriber.put_nowait(event)
+    except asyncio.QueueFull:
+        pass
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+event_broker = EventBroker()
@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.quiz import Quiz, QuizQuestion
+from app.models.question import QuestionOption
+from app.utils.cache import LRUCache
+from app.utils.paper_cache import paper_version
+
+# Answer keys keyed by (quiz_id, paper version)
+_answer_keys = LRUCache(settings.PAPER_CACHE_SIZE)
+
+
+class AnswerKey:
+    """Marks and correct options for every question mapped to a quiz."""
+
+    def __init__(self, marks: Dict[int, int], correct: Set[Tuple[int, int]]):
+        self.marks = marks  # question_id -> marks
+        self.correct = correct  # {(option_id, question_id)}
+
+    def grade(self, question_id: int, selected_option_id: Optional[int]) -> Tuple[bool, int]:
+        is_correct = bool(selected_option_id) and (selected_option_id, question_id) in self.correct
+        return is_correct, self.marks.get(question_id, 0) if is_correct else 0
+
+
+def load_answer_key(db: Session, quiz_id: int) -> AnswerKey:
+    marks = dict(
+        db.query(QuizQuestion.question_id, QuizQuestion.marks).filter(
+            QuizQuestion.quiz_id == quiz_id
+        ).all()
+    )
+    correct = set(
+        db.query(QuestionOption.id, QuestionOption.question_id).join(
+            QuizQuestion, QuizQuestion.question_id == QuestionOption.question_id
+        ).filter(
+            QuizQuestion.quiz_id == quiz_id,
+            QuestionOption.is_correct == True
+        ).all()
+    )
+    return AnswerKey(marks, correct)
+
+
+def get_answer_key(db: Session, quiz: Quiz) -> AnswerKey:
+    key = (quiz.id, paper_version(quiz))
+    answer_key = _answer_keys.get(key)
+    if answer_key is None:
+        answer_key = load_answer_key(db, quiz.id)
+        _answer_keys.set(key, answer_key)
+    return answer_key
+
+
+# Drop cached answer keys (all quizzes when quiz_id is None)
+def invalidate_answer_key(quiz_id: Optional[int] = None) -> None:
+    if quiz_id is None:
+        _answer_keys.clear()
+    else:
+        _answer_keys.delete_where(lambda key: key[0] == quiz_id)
+
+
+def grade_submission(
+    answer_key: AnswerKey,
+    attempt_id: int,
+    answers: Iterable[Tuple[int, Optional[int]]],
+    response_ids: Dict[int, int]
+) -> Tuple[int, List[dict], List[dict]]:
+    """Grade one attempt's answers against an answer key.
+
+    Returns the total score plus executemany-ready parameter lists: updates
+    for existing response rows (by primary key) and inserts for missing ones.
+    The last answer wins if a question appears more than once.
+    """
+    total_score = 0
+    updates = []
+    inserts = []
+
+    for question_id, selected_option_id in dict(answers).items():
+        is_correct, marks_obtained = answer_key.grade(question_id, selected_option_id)
+        total_score += marks_obtained
+
+        values = {
+            "selected_option_id": selected_option_id,
+            "is_correct": is_correct,
+            "marks_obtained": marks_obtained
+        }
+
+        if question_id in response_ids:
+            updates.append({"id": response_ids[question_id], **values})
+        else:
+            inserts.append({"attempt_id": attempt_id, "question_id": question_id, **values})
+
+    return total_score, updates, inserts
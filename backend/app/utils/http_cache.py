@@ -0,0 +1,41 @@
+import hashlib
+from typing import Optional
+from fastapi import Response
+from app.config import settings
+from app.utils.cache import LRUCache
+
+# Private to the user and revalidated on each use: a 304 costs the lookups that build the ETag
+REVALIDATE = "private, no-cache"
+
+# Serialized results keyed by (attempt_id, quiz version, score, compact). Question versions are immutable and
+# anything that regrades bumps the quiz version, so entries never go stale; the LRU only bounds memory
+results = LRUCache(settings.RESULT_CACHE_SIZE)
+
+
+# Weak, since the compression middleware may re-encode the body under the same tag
+def etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def body_etag(body: bytes) -> str:
+    return etag(hashlib.blake2b(body, digest_size=12).hexdigest())
+
+
+def matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    # Weak comparison: W/"x" and "x" name the same representation
+    return "*" in candidates or tag in candidates or tag[2:] in candidates
+
+
+def not_modified(tag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(status_code=304, headers={"ETag": tag, "Cache-Control": cache_control})
+
+
+def cacheable(body: bytes, tag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": tag, "Cache-Control": cache_control}
+    )
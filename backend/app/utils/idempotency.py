@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+from threading import Lock
+from typing import Callable, Optional
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from app.config import settings
+from app.utils.cache import LRUCache
+from app.utils.redis_client import get_redis
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# How long a key stays reserved while its first request is running
+IN_FLIGHT_SECONDS = 60
+
+
+class IdempotencyStore:
+    """Bounded store of completed responses by idempotency key.
+
+    In-process LRU, shared through Redis when IDEMPOTENCY_REDIS is set.
+    """
+
+    def __init__(self):
+        self._responses = LRUCache(settings.IDEMPOTENCY_CACHE_SIZE)
+        self._in_flight = {}
+        self._lock = Lock()
+
+    def _redis(self):
+        return get_redis() if settings.IDEMPOTENCY_REDIS else None
+
+    # Run a store method from the event loop: in the loop's executor when it may call Redis
+    async def run(self, method: Callable, *args):
+        if self._redis():
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+        return method(*args)
+
+    def get(self, key: str) -> Optional[dict]:
+        record = self._responses.get(key)
+        if record is None and self._redis():
+            try:
+                data = self._redis().get(f"idempotency:{key}")
+                if data is not None:
+                    record = loads(data)
+                    self._responses.set(key, record)
+            except Exception:
+                logger.warning("Idempotency store read failed", exc_info=True)
+        # Entries expire after the TTL even if the LRU still holds them
+        if record is not None and record["stored_at"] + settings.IDEMPOTENCY_TTL_SECONDS < time.time():
+            self._responses.delete(key)
+            return None
+        return record
+
+    def set(self, key: str, record: dict) -> None:
+        self._responses.set(key, record)
+        if self._redis():
+            try:
+                self._redis().set(f"idempotency:{key}", dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+            except Exception:
+                logger.warning("Idempotency store write failed", exc_info=True)
+
+    # Claim a key for the first request; False if another request holds it
+    def reserve(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            started = self._in_flight.get(key)
+            if started is not None and now - started < IN_FLIGHT_SECONDS:
+                return False
+            self._in_flight[key] = now
+
+        if self._redis():
+            try:
+                if not self._redis().set(f"idempotency_lock:{key}", 1, nx=True, ex=IN_FLIGHT_SECONDS):
+                    self.release(key, shared=False)
+                    return False
+            except Exception:
+                logger.warning("Idempotency lock unavailable, using local lock only", exc_info=True)
+        return True
+
+    def release(self, key: str, shared: bool = True) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if shared and self._redis():
+            try:
+                self._redis().delete(f"idempotency_lock:{key}")
+            except Exception:
+                logger.warning("Idempotency lock release failed", exc_info=True)
+
+
+idempotency_store = IdempotencyStore()
+
+
+# Keys are scoped to the caller's credentials and the route they were sent to
+def _scope_key(request: Request, key: str) -> str:
+    credentials = request.headers.get("authorization", "")
+    scope = f"{credentials}|{request.method}|{request.url.path}|{key}"
+    return hashlib.sha256(scope.encode()).hexdigest()
+
+
+def _replay(record: dict) -> Response:
+    response = Response(
+        content=base64.b64decode(record["body"]),
+        status_code=record["status_code"]
+    )
+    for name, value in record["headers"]:
+        response.headers.append(name, value)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+class IdempotentRoute(APIRoute):
+    """Route class honouring the Idempotency-Key header on mutating requests.
+
+    The first request with a key runs normally. Once it returns a non-5xx
+    response, that response is stored, and retries with the same key, caller
+    and body get it back before any dependency (auth, DB session) runs.
+    A retry that arrives while the first request is still running gets 409.
+    Errors raised as HTTPException are not stored, so a retry runs again.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key or request.method not in MUTATING_METHODS:
+                return await handler(request)
+
+            if len(key) > 255:
+                raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} is too long")
+
+            scope_key = _scope_key(request, key)
+            fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+            record = await idempotency_store.run(idempotency_store.get, scope_key)
+            if record is not None:
+                if record["fingerprint"] != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail=f"{IDEMPOTENCY_HEADER} was already used with a different request body"
+                    )
+                return _replay(record)
+
+            if not await idempotency_store.run(idempotency_store.reserve, scope_key):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+                )
+
+            try:
+                response = await handler(request)
+                if response.status_code < 500 and hasattr(response, "body"):
+                    await idempotency_store.run(idempotency_store.set, scope_key, {
+                        "fingerprint": fingerprint,
+                        "status_code": response.status_code,
+                        "headers": [
+                            (name.decode("latin-1"), value.decode("latin-1"))
+                            for name, value in response.raw_headers
+                            if name != b"content-length"
+                        ],
+                        "body": base64.b64encode(response.body).decode(),
+                        "stored_at": time.time()
+                    })
+                return response
+            finally:
+                await idempotency_store.run(idempotency_store.release, scope_key)
+
+        return route_handler
@@ -0,0 +1,68 @@
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A background job with progress that admins can poll."""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "pending"
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobRegistry:
+    """Runs jobs on daemon threads and keeps the most recent ones for polling."""
+
+    def __init__(self, max_jobs: int = 100):
+        self._jobs = LRUCache(max_jobs)
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Job:
+        # fn receives the Job first so it can report progress
+        job = Job(name)
+        self._jobs.set(job.id, job)
+
+        def run():
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            try:
+                job.result = fn(job, *args, **kwargs)
+                job.status = "completed"
+            except Exception as exc:
+                logger.exception("Job %s (%s) failed", job.name, job.id)
+                job.error = str(exc)
+                job.status = "failed"
+            finally:
+                job.finished_at = datetime.utcnow()
+
+        threading.Thread(target=run, name=f"job-{name}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+
+jobs = JobRegistry()
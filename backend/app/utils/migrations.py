@@ -0,0 +1,22 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from app.database import engine
+
+# backend/ directory holding alembic.ini and migrations/
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+# Apply all pending schema migrations (replaces Base.metadata.create_all)
+def upgrade_to_head() -> None:
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
@@ -0,0 +1,286 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.outbox import OutboxEvent
+from app.utils.redis_client import get_redis
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Outbox event types
+ATTEMPT_COMPLETED = "attempt_completed"
+
+
+def add_events(db: Session, event_type: str, payloads: List[dict]) -> None:
+    """Queue events in the caller's transaction; they are delivered only if it commits."""
+    if not settings.OUTBOX_ENABLED or not payloads:
+        return
+    now = datetime.utcnow()
+    db.execute(
+        insert(OutboxEvent),
+        [{"event_type": event_type, "payload": dumps(payload).decode(), "created_at": now} for payload in payloads]
+    )
+
+
+def add_event(db: Session, event_type: str, **payload) -> None:
+    add_events(db, event_type, [payload])
+
+
+# Payload of an ATTEMPT_COMPLETED event
+def completion_payload(attempt, quiz, score: int, end_time: datetime) -> dict:
+    return {
+        "attempt_id": attempt.id,
+        "quiz_id": quiz.id,
+        "user_id": attempt.user_id,
+        "score": score,
+        "total_possible": quiz.total_score,
+        "start_time": attempt.start_time,
+        "end_time": end_time
+    }
+
+
+class InProcessConsumer:
+    """Calls handlers registered with `subscribe` in the relay's thread."""
+
+    name = "inprocess"
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+
+    def subscribe(self, event_type: str):
+        def register(handler: Callable[[dict], None]):
+            self._handlers[event_type].append(handler)
+            return handler
+        return register
+
+    def deliver(self, events: List[dict]) -> None:
+        for event in events:
+            for handler in self._handlers.get(event["type"], ()):
+                handler(event)
+
+
+class RedisStreamConsumer:
+    """Appends events to a Redis stream (XADD), trimmed to about OUTBOX_REDIS_STREAM_MAXLEN entries."""
+
+    name = "redis"
+
+    def deliver(self, events: List[dict]) -> None:
+        redis_client = get_redis()
+        if redis_client is None:
+            raise RuntimeError("REDIS_URL is not configured")
+        pipeline = redis_client.pipeline(transaction=False)
+        for event in events:
+            pipeline.xadd(
+                settings.OUTBOX_REDIS_STREAM,
+                {"id": event["id"], "type": event["type"], "data": dumps(event)},
+                maxlen=settings.OUTBOX_REDIS_STREAM_MAXLEN,
+                approximate=True
+            )
+        pipeline.execute()
+
+
+class FileConsumer:
+    """Appends events as JSON lines to OUTBOX_FILE_PATH, fsynced per batch."""
+
+    name = "file"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def deliver(self, events: List[dict]) -> None:
+        path = Path(settings.OUTBOX_FILE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(path, "ab") as sink:
+            sink.write(b"".join(dumps(event) + b"\n" for event in events))
+            sink.flush()
+            os.fsync(sink.fileno())
+
+
+# Handlers for in-process delivery: @handlers.subscribe(ATTEMPT_COMPLETED)
+handlers = InProcessConsumer()
+
+CONSUMERS = {consumer.name: consumer for consumer in (handlers, RedisStreamConsumer(), FileConsumer())}
+
+
+class OutboxRelay:
+    """Background thread delivering outbox events to the configured consumers.
+
+    Each pass locks up to OUTBOX_BATCH_SIZE undelivered events (SKIP LOCKED,
+    so relays in several workers share the work), hands them to every
+    consumer and marks them delivered in the same transaction. Delivery is
+    at least once: a crash between delivering and committing redelivers the
+    batch, so consumers should dedupe on the event id. When a batch fails
+    its events are retried one by one; an event that keeps failing while
+    others get through is parked after OUTBOX_MAX_ATTEMPTS instead of
+    blocking the ones behind it. When nothing gets through (a consumer
+    outage, or a batch made only of poison events) failures count once an
+    event is older than OUTBOX_MAX_AGE_MINUTES, so even a lone poison event
+    is eventually parked.
+    """
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+        self.delivered = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def consumers(self) -> list:
+        names = [name.strip() for name in settings.OUTBOX_CONSUMERS.split(",") if name.strip()]
+        return [CONSUMERS[name] for name in names if name in CONSUMERS]
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    # New events were committed; deliver them without waiting for the next poll
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                delivered = self.relay_once()
+            except Exception as e:
+                logger.exception("Outbox relay pass failed")
+                self.last_error = str(e)
+                self._wake.wait(settings.OUTBOX_RETRY_SECONDS)
+                continue
+            if delivered < settings.OUTBOX_BATCH_SIZE:
+                self._purge()
+                self._wake.wait(settings.OUTBOX_POLL_SECONDS)
+
+    def relay_once(self) -> int:
+        """Deliver one batch of pending events; returns how many were delivered."""
+        db = SessionLocal()
+        try:
+            rows = db.query(OutboxEvent).filter(
+                OutboxEvent.delivered_at.is_(None),
+                OutboxEvent.attempts < settings.OUTBOX_MAX_ATTEMPTS
+            ).order_by(OutboxEvent.id).limit(settings.OUTBOX_BATCH_SIZE).with_for_update(skip_locked=True).all()
+            if not rows:
+                db.commit()
+                return 0
+
+            events = [_event(row) for row in rows]
+            try:
+                self._deliver(events)
+                delivered_ids = [row.id for row in rows]
+            except Exception:
+                # Isolate the failing events by delivering the batch one by one
+                delivered_ids = []
+                failed = []
+                for row, event in zip(rows, events):
+                    try:
+                        self._deliver([event])
+                        delivered_ids.append(row.id)
+                    except Exception as e:
+                        failed.append((row, f"event {row.id}: {e}"[:512]))
+                        logger.warning("Outbox event %s not delivered", row.id, exc_info=True)
+                self.failures += len(failed)
+                self.last_error = failed[-1][1]
+                # When nothing got through it may be a consumer outage, which only counts against events past the age cap
+                stale = datetime.utcnow() - timedelta(minutes=settings.OUTBOX_MAX_AGE_MINUTES)
+                for row, error in failed:
+                    if delivered_ids or row.created_at < stale:
+                        row.attempts += 1
+                        row.last_error = error
+
+            if delivered_ids:
+                db.execute(
+                    update(OutboxEvent).where(OutboxEvent.id.in_(delivered_ids)).values(delivered_at=datetime.utcnow())
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.delivered += len(delivered_ids)
+        if len(delivered_ids) < len(rows):
+            self._wake.wait(settings.OUTBOX_RETRY_SECONDS)
+        return len(delivered_ids)
+
+    def _deliver(self, events: List[dict]) -> None:
+        for consumer in self.consumers:
+            consumer.deliver(events)
+
+    # Delete delivered events past retention, at most once a minute
+    def _purge(self) -> None:
+        if time.monotonic() - self._last_purge < 60:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        db = SessionLocal()
+        try:
+            db.execute(delete(OutboxEvent).where(OutboxEvent.delivered_at < cutoff))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.warning("Outbox purge failed", exc_info=True)
+        finally:
+            db.close()
+
+    def to_dict(self, db: Session) -> dict:
+        # The table only exists once migration 0011 ran, which an instance with the outbox off may not have
+        if not settings.OUTBOX_ENABLED:
+            return {"enabled": False}
+        pending = db.query(OutboxEvent).filter(
+            OutboxEvent.delivered_at.is_(None),
+            OutboxEvent.attempts < settings.OUTBOX_MAX_ATTEMPTS
+        ).count()
+        parked = db.query(OutboxEvent).filter(
+            OutboxEvent.delivered_at.is_(None),
+            OutboxEvent.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+        ).count()
+        return {
+            "enabled": True,
+            "running": self.running,
+            "consumers": [consumer.name for consumer in self.consumers],
+            "pending": pending,
+            "parked": parked,
+            "delivered": self.delivered,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+
+def _event(row: OutboxEvent) -> dict:
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "created_at": row.created_at,
+        "payload": loads(row.payload)
+    }
+
+
+outbox_relay = OutboxRelay()
@@ -0,0 +1,132 @@
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, joinedload
+from app.config import settings
+from app.models.quiz import Quiz, QuizQuestion
+from app.models.question import Question
+from app.utils.cache import LRUCache
+from app.utils.redis_client import get_redis
+from app.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Pre-serialized quiz papers keyed by (quiz_id, version)
+_papers = LRUCache(settings.PAPER_CACHE_SIZE)
+
+REDIS_KEY_PREFIX = "quiz_paper_v3"
+
+
+class QuizPaper:
+    """The attempt-independent part of a quiz paper, serialized once.
+
+    Each fragment is a question object serialized without its closing brace,
+    so a request only appends `"selected_option_id"` for its own attempt.
+    Compact fragments hold the same question with its options as parallel
+    `option_ids`/`options` arrays, for clients that ask for compact payloads.
+    """
+
+    def __init__(self, question_ids: List[int], fragments: List[bytes], compact_fragments: List[bytes]):
+        self.question_ids = question_ids
+        self.fragments = fragments
+        self.compact_fragments = compact_fragments
+
+    def render(self, header: dict, selections: Dict[int, Optional[int]], compact: bool = False) -> bytes:
+        parts = []
+        if compact:
+            # Unanswered questions omit selected_option_id instead of sending null
+            for question_id, fragment in zip(self.question_ids, self.compact_fragments):
+                selected = selections.get(question_id)
+                parts.append(fragment + (b',"selected_option_id":' + str(selected).encode() if selected else b"") + b"}")
+        else:
+            for question_id, fragment in zip(self.question_ids, self.fragments):
+                selected = selections.get(question_id)
+                parts.append(fragment + b',"selected_option_id":' + (str(selected).encode() if selected else b"null") + b"}")
+
+        # Header without its closing brace, then the questions array
+        return dumps(header)[:-1] + b',"questions":[' + b",".join(parts) + b"]}"
+
+    def to_bytes(self) -> bytes:
+        return dumps({
+            "question_ids": self.question_ids,
+            "fragments": [fragment.decode() for fragment in self.fragments],
+            "compact_fragments": [fragment.decode() for fragment in self.compact_fragments]
+        })
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "QuizPaper":
+        payload = loads(data)
+        return cls(
+            payload["question_ids"],
+            [fragment.encode() for fragment in payload["fragments"]],
+            [fragment.encode() for fragment in payload["compact_fragments"]]
+        )
+
+
+# Version of a quiz's paper; incremented in SQL whenever its question mapping or answer key changes,
+# so two changes in the same second still get distinct versions. Question rows are immutable
+# versions, so what is cached under a version never needs invalidating
+def paper_version(quiz: Quiz) -> int:
+    return quiz.version
+
+
+# One question of a paper, serialized without its closing brace
+def question_fragment(question_number: int, marks: int, question: Question, compact: bool = False) -> bytes:
+    # is_correct is deliberately left out of the paper
+    fragment = {
+        "question_number": question_number,
+        "marks": marks,
+        "id": question.id,
+        "question": question.question
+    }
+    if compact:
+        fragment["option_ids"] = [opt.id for opt in question.options]
+        fragment["options"] = [opt.option for opt in question.options]
+    else:
+        fragment["options"] = [{"id": opt.id, "option": opt.option} for opt in question.options]
+    return dumps(fragment)[:-1]
+
+
+def build_paper(db: Session, quiz_id: int) -> QuizPaper:
+    quiz_questions = db.query(QuizQuestion).options(
+        joinedload(QuizQuestion.question).joinedload(Question.options)
+    ).filter(QuizQuestion.quiz_id == quiz_id).order_by(QuizQuestion.question_number).all()
+
+    return QuizPaper(
+        [qq.question_id for qq in quiz_questions],
+        [question_fragment(qq.question_number, qq.marks, qq.question) for qq in quiz_questions],
+        [question_fragment(qq.question_number, qq.marks, qq.question, compact=True) for qq in quiz_questions]
+    )
+
+
+def get_paper(db: Session, quiz: Quiz) -> QuizPaper:
+    key = (quiz.id, paper_version(quiz))
+    paper = _papers.get(key)
+    if paper is not None:
+        return paper
+
+    redis_client = get_redis() if settings.PAPER_CACHE_REDIS else None
+    redis_key = f"{REDIS_KEY_PREFIX}:{key[0]}:{key[1]}"
+
+    if redis_client:
+        try:
+            cached = redis_client.get(redis_key)
+            if cached is not None:
+                paper = QuizPaper.from_bytes(cached)
+        except Exception:
+            logger.warning("Quiz paper cache read failed", exc_info=True)
+
+    if paper is None:
+        paper = build_paper(db, quiz.id)
+        if redis_client:
+            try:
+                redis_client.set(redis_key, paper.to_bytes(), ex=settings.PAPER_CACHE_TTL_SECONDS)
+            except Exception:
+                logger.warning("Quiz paper cache write failed", exc_info=True)
+
+    _papers.set(key, paper)
+    return paper
+
+
+# Drop every cached version of a quiz's paper in this process
+def invalidate_paper(quiz_id: int) -> None:
+    _papers.delete_where(lambda key: key[0] == quiz_id)
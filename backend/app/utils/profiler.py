@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi.routing import APIRoute
+from app.config import settings
+
+# Label of the sampled request being handled in this context (None when not sampled).
+# run_in_threadpool copies the context, so sync handlers in worker threads see it too.
+_request_label: ContextVar[Optional[str]] = ContextVar("profile_label", default=None)
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _route_pattern(route: str) -> re.Pattern:
+    # "/api/v1/user/quizzes/{quiz_id}/submit" matches any quiz id
+    return re.compile("^" + re.sub(r"\\{[^/]+?\\}", "[^/]+", re.escape(route)) + "$")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = "app" + filename[len(_APP_ROOT):]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Statistical profiler for sampled requests, switched on and off at runtime.
+
+    While enabled, a fraction of requests (optionally only those matching a
+    route) is marked as sampled. A background thread wakes every interval
+    and, for each thread currently executing a sampled request, records its
+    stack: on the event loop thread from the request's middleware frame, in
+    worker threads from the handler. Stacks are aggregated as collapsed
+    "frame;frame;frame count" lines, the input format of flamegraph.pl and
+    speedscope. Requests that are not sampled cost one random() call.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.route: Optional[str] = None
+        self.interval = 0.01
+        self.stops_at: Optional[float] = None
+        self.samples = 0
+        self.sampled_requests = 0
+        self._route_pattern: Optional[re.Pattern] = None
+        self._stacks: Counter = Counter()
+        self._active: Dict[object, str] = {}  # marker frame -> request label
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, sample_rate: float = 1.0, route: Optional[str] = None,
+              interval_ms: Optional[int] = None, duration_seconds: Optional[int] = None) -> None:
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.route = route
+            self._route_pattern = _route_pattern(route) if route else None
+            self.interval = (interval_ms or settings.PROFILER_INTERVAL_MS) / 1000
+            self.stops_at = time.monotonic() + duration_seconds if duration_seconds else None
+            self.enabled = True
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.sampled_requests = 0
+
+    def should_sample(self, path: str) -> bool:
+        if not self.enabled:
+            return False
+        if self._route_pattern is not None and not self._route_pattern.match(path):
+            return False
+        return random.random() < self.sample_rate
+
+    def enter(self, frame, label: str) -> None:
+        with self._lock:
+            self._active[frame] = label
+
+    def exit(self, frame) -> None:
+        with self._lock:
+            self._active.pop(frame, None)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while self.enabled:
+            if self.stops_at is not None and time.monotonic() >= self.stops_at:
+                self.enabled = False
+                break
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                active = dict(self._active)
+
+            for thread_ident, frame in sys._current_frames().items():
+                if thread_ident == own_ident:
+                    continue
+                names = []
+                while frame is not None and frame not in active:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                if frame is None:
+                    continue
+                names.append(active[frame])
+                stack = ";".join(reversed(names))
+                with self._lock:
+                    if stack in self._stacks or len(self._stacks) < settings.PROFILER_MAX_STACKS:
+                        self._stacks[stack] += 1
+                    self.samples += 1
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def to_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "route": self.route,
+            "interval_ms": round(self.interval * 1000),
+            "seconds_left": max(round(self.stops_at - time.monotonic()), 0) if self.enabled and self.stops_at else None,
+            "sampled_requests": self.sampled_requests,
+            "samples": self.samples,
+            "distinct_stacks": len(self._stacks)
+        }
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilingMiddleware:
+    """Marks sampled requests for the profiler; a pass-through while it is off."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.should_sample(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {_NUMERIC_SEGMENT.sub('/{id}', scope['path'])}"
+        profiler.sampled_requests += 1
+        token = _request_label.set(label)
+        frame = sys._getframe()
+        profiler.enter(frame, label)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.exit(frame)
+            _request_label.reset(token)
+
+
+def _profiled(call):
+    # Marks the worker-thread frame of a sync handler serving a sampled request
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        label = _request_label.get()
+        if label is None:
+            return call(*args, **kwargs)
+        frame = sys._getframe()
+        profiler.enter(frame, label)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profiler.exit(frame)
+    return wrapper
+
+
+def instrument(app) -> None:
+    """Let the profiler see sync handlers, which run in threadpool workers."""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not asyncio.iscoroutinefunction(route.dependant.call):
+            route.dependant.call = _profiled(route.dependant.call)
@@ -0,0 +1,102 @@
+import logging
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import insert
+from app.config import settings
+from app.database import SessionLocal
+from app.models.quiz import QuizQuestion
+from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
+from app.utils.answer_sheet import new_sheet
+from app.utils.question_pools import load_pools, new_draw, tag_assignments
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_attempts(job, quiz_id: int, user_ids: List[int], chunk_size: Optional[int] = None) -> dict:
+    """Pre-provision scheduled attempts, with placeholder responses, for a roster of users.
+
+    Works in chunks of `chunk_size` users, one transaction each: a
+    multi-row INSERT of attempts, one indexed SELECT for their ids and a
+    multi-row INSERT of responses (none in packed mode). Pooled quizzes get
+    each user's paper drawn here. Users with an open (scheduled or in
+    progress) attempt at the quiz are skipped, so re-running is safe; users
+    who completed it get a retake. Progress is reported on `job` when given.
+    """
+    chunk_size = chunk_size or settings.PROVISION_CHUNK_SIZE
+    totals = {"users": len(user_ids), "scheduled": 0, "skipped": 0}
+
+    db = SessionLocal()
+    try:
+        pools = load_pools(db, quiz_id)
+        high_water = None
+        if pools:
+            tag_assignments.catch_up(db)
+            high_water = tag_assignments.high_water
+        else:
+            question_ids = [
+                question_id for (question_id,) in db.query(QuizQuestion.question_id).filter(
+                    QuizQuestion.quiz_id == quiz_id
+                ).order_by(QuizQuestion.question_number).all()
+            ]
+
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            taken = {
+                user_id for (user_id,) in db.query(QuizAttempt.user_id).filter(
+                    QuizAttempt.quiz_id == quiz_id,
+                    QuizAttempt.user_id.in_(chunk),
+                    QuizAttempt.status.in_([AttemptStatus.in_progress, AttemptStatus.scheduled])
+                ).distinct().all()
+            }
+
+            attempt_rows = []
+            papers = {}  # user_id -> question ids on the user's paper
+            for user_id in chunk:
+                if user_id in taken:
+                    continue
+                row = {
+                    "user_id": user_id,
+                    "quiz_id": quiz_id,
+                    "status": AttemptStatus.scheduled,
+                    "start_time": datetime.utcnow(),
+                    "answer_sheet": None,
+                    "paper_seed": None,
+                    "paper_high_water": None
+                }
+                if pools:
+                    row["paper_seed"], row["paper_high_water"], drawn = new_draw(db, pools, high_water)
+                    papers[user_id] = [question_id for question_id, _ in drawn]
+                else:
+                    papers[user_id] = question_ids
+                if settings.ANSWER_SHEET_MODE == "packed":
+                    row["answer_sheet"] = new_sheet(papers[user_id])
+                attempt_rows.append(row)
+
+            if attempt_rows:
+                db.execute(insert(QuizAttempt), attempt_rows)
+                if settings.ANSWER_SHEET_MODE != "packed":
+                    response_rows = [
+                        {"attempt_id": attempt_id, "question_id": question_id}
+                        for attempt_id, user_id in db.query(QuizAttempt.id, QuizAttempt.user_id).filter(
+                            QuizAttempt.quiz_id == quiz_id,
+                            QuizAttempt.status == AttemptStatus.scheduled,
+                            QuizAttempt.user_id.in_(papers)
+                        ).all()
+                        for question_id in papers[user_id]
+                    ]
+                    if response_rows:
+                        db.execute(insert(QuizResponse), response_rows)
+            db.commit()
+
+            totals["scheduled"] += len(attempt_rows)
+            totals["skipped"] += len(chunk) - len(attempt_rows)
+            if job is not None:
+                job.progress = dict(totals)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info("Scheduled %(scheduled)s attempts (%(skipped)s users skipped)", totals)
+    return totals
@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statement log for the request currently being counted (None when counting is off).
+# FastAPI runs sync handlers via run_in_threadpool, which copies the context, so
+# statements executed in worker threads are recorded against the right request.
+_current_log: ContextVar[Optional[List[str]]] = ContextVar("query_log", default=None)
+
+
+class QueryLog:
+    """SQL statements executed while a `count_queries()` block is active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __len__(self):
+        return self.count
+
+
+# Listen on the Engine class so every engine (primary, replicas, test engines) is counted
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    log = _current_log.get()
+    if log is not None:
+        log.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed in the enclosed block.
+
+    Usage:
+        with count_queries() as queries:
+            client.get("/api/v1/user/my-quizzes")
+        assert queries.count <= 5
+    """
+    query_log = QueryLog()
+    token = _current_log.set(query_log.statements)
+    try:
+        yield query_log
+    finally:
+        _current_log.reset(token)
+
+
+# Middleware reporting the per-request statement count in the X-Query-Count header
+class QueryCountMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as queries:
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(queries.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,209 @@
+import random
+import secrets
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+from sqlalchemy.orm import Session, selectinload
+from app.config import settings
+from app.models.quiz import Quiz, QuizQuestion, QuizPool
+from app.models.question import Question, QuestionTag
+from app.models.attempt import QuizAttempt
+from app.models.archive import ArchivedQuizAttempt
+from app.utils.cache import LRUCache
+from app.utils.grading import AnswerKey, get_answer_key
+from app.utils.paper_cache import QuizPaper, get_paper, paper_version, question_fragment
+
+Attempt = Union[QuizAttempt, ArchivedQuizAttempt]
+
+
+class PoolTooSmall(ValueError):
+    pass
+
+
+class TagAssignments:
+    """Question ids per tag, in tag-assignment order, cached in process.
+
+    question_tags is append-only, so the cache only ever grows: each use
+    first loads assignments above the highest id seen (one primary-key range
+    scan). A draw sees the assignments up to its high-water id, which is a
+    prefix of each tag's list found by bisection; no ORDER BY RAND() and no
+    scan of the question bank.
+
+    Editing a question tags its new version too. Within a draw's prefix the
+    latest version of each question takes the slot of its first assignment,
+    so an edit swaps the question in place without reshuffling later draws,
+    and draws recorded before the edit keep the version they were given.
+    """
+
+    def __init__(self):
+        self._assignment_ids: Dict[int, List[int]] = defaultdict(list)
+        self._question_ids: Dict[int, List[int]] = defaultdict(list)
+        self._lineages: Dict[int, List[int]] = defaultdict(list)
+        self._versioned: Dict[int, int] = {}  # tag_id -> first assignment id of a later version
+        self.high_water = 0
+        self._lock = threading.Lock()
+
+    def catch_up(self, db: Session) -> None:
+        with self._lock:
+            for assignment_id, tag_id, question_id, lineage_id in db.query(
+                QuestionTag.id, QuestionTag.tag_id, QuestionTag.question_id, Question.lineage_id
+            ).join(Question, Question.id == QuestionTag.question_id).filter(
+                QuestionTag.id > self.high_water
+            ).order_by(QuestionTag.id):
+                if lineage_id is not None:
+                    self._versioned.setdefault(tag_id, assignment_id)
+                self._assignment_ids[tag_id].append(assignment_id)
+                self._question_ids[tag_id].append(question_id)
+                self._lineages[tag_id].append(lineage_id or question_id)
+                self.high_water = assignment_id
+
+    def candidates(self, tag_id: int, high_water: int) -> List[int]:
+        with self._lock:
+            visible = bisect_right(self._assignment_ids.get(tag_id, []), high_water)
+            question_ids = self._question_ids.get(tag_id, [])[:visible]
+            if self._versioned.get(tag_id, high_water + 1) > high_water:
+                return question_ids
+            lineages = self._lineages[tag_id][:visible]
+
+        slots = {}
+        candidates = []
+        for question_id, lineage in zip(question_ids, lineages):
+            if lineage in slots:
+                candidates[slots[lineage]] = question_id
+            else:
+                slots[lineage] = len(candidates)
+                candidates.append(question_id)
+        return candidates
+
+
+tag_assignments = TagAssignments()
+
+
+def load_pools(db: Session, quiz_id: int) -> List[QuizPool]:
+    return db.query(QuizPool).filter(QuizPool.quiz_id == quiz_id).order_by(QuizPool.id).all()
+
+
+def draw(pools: List[QuizPool], seed: int, high_water: int) -> List[Tuple[int, int]]:
+    """The (question_id, marks) pairs an attempt gets, in paper order.
+
+    Deterministic for a given seed and high-water mark. A question tagged for
+    more than one pool is drawn at most once.
+    """
+    rng = random.Random(seed)
+    drawn = []
+    seen = set()
+    for pool in pools:
+        candidates = [
+            question_id for question_id in tag_assignments.candidates(pool.tag_id, high_water)
+            if question_id not in seen
+        ]
+        if len(candidates) < pool.num_questions:
+            raise PoolTooSmall(
+                f"Pool for tag {pool.tag_id} has {len(candidates)} questions, needs {pool.num_questions}"
+            )
+        for question_id in rng.sample(candidates, pool.num_questions):
+            drawn.append((question_id, pool.marks))
+            seen.add(question_id)
+    return drawn
+
+
+def new_draw(
+    db: Session,
+    pools: List[QuizPool],
+    high_water: Optional[int] = None
+) -> Tuple[int, int, List[Tuple[int, int]]]:
+    """Draw a fresh paper; returns the seed and high-water mark to store on the attempt, and the draw.
+
+    Pass `high_water` to draw many papers against one snapshot of the tag
+    assignments without catching up before each.
+    """
+    if high_water is None:
+        tag_assignments.catch_up(db)
+        high_water = tag_assignments.high_water
+    seed = secrets.randbits(31)
+    return seed, high_water, draw(pools, seed, high_water)
+
+
+class AttemptPaper:
+    """The drawn paper and answer key of one pooled attempt."""
+
+    def __init__(self, paper: QuizPaper, answer_key: AnswerKey):
+        self.paper = paper
+        self.answer_key = answer_key
+
+
+# Drawn papers keyed by (attempt id, quiz version); the draw never changes, but a regrade
+# bumps the quiz version so answer keys are rebuilt from the corrected options
+_attempt_papers = LRUCache(settings.ATTEMPT_PAPER_CACHE_SIZE)
+
+
+def _build_attempt_paper(db: Session, quiz: Quiz, attempt: Attempt) -> AttemptPaper:
+    if tag_assignments.high_water < attempt.paper_high_water:
+        tag_assignments.catch_up(db)
+    drawn = draw(load_pools(db, quiz.id), attempt.paper_seed, attempt.paper_high_water)
+
+    questions = {
+        question.id: question
+        for question in db.query(Question).options(selectinload(Question.options)).filter(
+            Question.id.in_([question_id for question_id, _ in drawn])
+        ).all()
+    }
+    fragments = [
+        question_fragment(question_number, marks, questions[question_id])
+        for question_number, (question_id, marks) in enumerate(drawn, start=1)
+    ]
+    compact_fragments = [
+        question_fragment(question_number, marks, questions[question_id], compact=True)
+        for question_number, (question_id, marks) in enumerate(drawn, start=1)
+    ]
+    answer_key = AnswerKey(
+        dict(drawn),
+        {
+            (option.id, question.id)
+            for question in questions.values()
+            for option in question.options if option.is_correct
+        }
+    )
+    return AttemptPaper(
+        QuizPaper([question_id for question_id, _ in drawn], fragments, compact_fragments),
+        answer_key
+    )
+
+
+def get_attempt_paper(db: Session, quiz: Quiz, attempt: Attempt) -> AttemptPaper:
+    key = (attempt.id, paper_version(quiz))
+    attempt_paper = _attempt_papers.get(key)
+    if attempt_paper is None:
+        attempt_paper = _build_attempt_paper(db, quiz, attempt)
+        _attempt_papers.set(key, attempt_paper)
+    return attempt_paper
+
+
+# The paper an attempt sees: the quiz's shared paper, or the attempt's own draw for pooled quizzes
+def paper_for_attempt(db: Session, quiz: Quiz, attempt: Attempt) -> QuizPaper:
+    if attempt.paper_seed is None:
+        return get_paper(db, quiz)
+    return get_attempt_paper(db, quiz, attempt).paper
+
+
+def answer_key_for_attempt(db: Session, quiz: Quiz, attempt: Attempt) -> AnswerKey:
+    if attempt.paper_seed is None:
+        return get_answer_key(db, quiz)
+    return get_attempt_paper(db, quiz, attempt).answer_key
+
+
+# question_id -> (question_number, marks) for an attempt's paper
+def paper_layout(db: Session, quiz: Quiz, attempt: Attempt) -> Dict[int, Tuple[int, int]]:
+    if attempt.paper_seed is None:
+        return {
+            question_id: (question_number, marks)
+            for question_id, question_number, marks in db.query(
+                QuizQuestion.question_id, QuizQuestion.question_number, QuizQuestion.marks
+            ).filter(QuizQuestion.quiz_id == quiz.id).all()
+        }
+    attempt_paper = get_attempt_paper(db, quiz, attempt)
+    return {
+        question_id: (question_number, attempt_paper.answer_key.marks[question_id])
+        for question_number, question_id in enumerate(attempt_paper.paper.question_ids, start=1)
+    }
@@ -0,0 +1,28 @@
+import logging
+from threading import Lock
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_initialized = False
+_lock = Lock()
+
+
+# Shared Redis client, connected on first use (None when REDIS_URL is unset or unreachable)
+def get_redis():
+    global _client, _initialized
+    if _initialized:
+        return _client
+
+    with _lock:
+        if not _initialized:
+            if settings.REDIS_URL:
+                try:
+                    import redis
+                    _client = redis.from_url(settings.REDIS_URL)
+                except Exception:
+                    logger.warning("Could not connect to Redis at %s", settings.REDIS_URL, exc_info=True)
+                    _client = None
+            _initialized = True
+    return _client
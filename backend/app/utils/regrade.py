@@ -0,0 +1,178 @@
+import logging
+from typing import List, Optional, Set
+from sqlalchemy import case, exists, func, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.quiz import Quiz, QuizQuestion, QuizPool
+from app.models.question import QuestionOption, QuestionTag
+from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
+from app.models.archive import ArchivedQuizAttempt, ArchivedQuizResponse
+from app.utils.answer_sheet import grade_sheet
+from app.utils.grading import invalidate_answer_key
+from app.utils.paper_cache import invalidate_paper
+from app.utils.question_pools import answer_key_for_attempt
+from app.utils.user_stats import discard_user_stats
+
+logger = logging.getLogger(__name__)
+
+# Completed attempts live in the hot tables or, once archived, in the archive tables
+TABLES = [(QuizAttempt, QuizResponse), (ArchivedQuizAttempt, ArchivedQuizResponse)]
+
+
+def affected_quizzes(db: Session, question_id: int) -> Set[int]:
+    """Quizzes whose papers can include a question: mapped directly or drawn from a pool of one of its tags."""
+    mapped = db.query(QuizQuestion.quiz_id).filter(QuizQuestion.question_id == question_id)
+    pooled = db.query(QuizPool.quiz_id).join(QuestionTag, QuestionTag.tag_id == QuizPool.tag_id).filter(
+        QuestionTag.question_id == question_id
+    )
+    return {quiz_id for (quiz_id,) in mapped.union(pooled).all()}
+
+
+def _regrade_rows(db: Session, attempt_model, response_model, quiz_id: int, attempt_ids: List[int],
+                  question_id: Optional[int]) -> None:
+    # Row-per-response attempts of a mapped quiz: two set-based UPDATEs for the whole chunk
+    responses = response_model.__table__
+    attempts = attempt_model.__table__
+    options = QuestionOption.__table__
+    quiz_questions = QuizQuestion.__table__
+
+    is_correct = exists().where(
+        options.c.id == responses.c.selected_option_id,
+        options.c.question_id == responses.c.question_id,
+        options.c.is_correct == True
+    )
+    marks = select(quiz_questions.c.marks).where(
+        quiz_questions.c.quiz_id == quiz_id,
+        quiz_questions.c.question_id == responses.c.question_id
+    ).scalar_subquery()
+
+    statement = update(responses).where(responses.c.attempt_id.in_(attempt_ids))
+    if question_id is not None:
+        statement = statement.where(responses.c.question_id == question_id)
+    db.execute(statement.values(
+        is_correct=is_correct,
+        marks_obtained=case((is_correct, func.coalesce(marks, 0)), else_=0)
+    ).execution_options(synchronize_session=False))
+
+    db.execute(update(attempts).where(attempts.c.id.in_(attempt_ids)).values(
+        score=select(func.coalesce(func.sum(responses.c.marks_obtained), 0)).where(
+            responses.c.attempt_id == attempts.c.id
+        ).scalar_subquery()
+    ).execution_options(synchronize_session=False))
+
+
+def _regrade_each(db: Session, attempt_model, response_model, quiz: Quiz, attempts: list) -> None:
+    # Packed or pooled attempts: grade in memory against each attempt's answer key, write with executemany
+    attempt_updates = []
+    response_updates = []
+
+    row_attempts = {attempt.id: attempt for attempt in attempts if attempt.answer_sheet is None}
+    scores = {attempt_id: 0 for attempt_id in row_attempts}
+    if row_attempts:
+        for response_id, attempt_id, question_id, selected_option_id in db.query(
+            response_model.id, response_model.attempt_id, response_model.question_id, response_model.selected_option_id
+        ).filter(response_model.attempt_id.in_(row_attempts)).all():
+            answer_key = answer_key_for_attempt(db, quiz, row_attempts[attempt_id])
+            is_correct, marks_obtained = answer_key.grade(question_id, selected_option_id)
+            scores[attempt_id] += marks_obtained
+            response_updates.append({"id": response_id, "is_correct": is_correct, "marks_obtained": marks_obtained})
+
+    for attempt in attempts:
+        if attempt.answer_sheet is not None:
+            score, _ = grade_sheet(answer_key_for_attempt(db, quiz, attempt), attempt.answer_sheet, [])
+        else:
+            score = scores[attempt.id]
+        attempt_updates.append({"id": attempt.id, "score": score})
+
+    if response_updates:
+        db.execute(update(response_model), response_updates)
+    db.execute(update(attempt_model), attempt_updates)
+
+
+def regrade(job=None, quiz_id: Optional[int] = None, question_id: Optional[int] = None,
+            chunk_size: Optional[int] = None) -> dict:
+    """Recompute correctness, marks and scores of completed attempts after an answer key change.
+
+    Covers one quiz, or every quiz that can include `question_id`, in the hot
+    and archive tables. Works in chunks of `chunk_size` attempts, one short
+    transaction each. Row-per-response attempts of mapped quizzes are
+    regraded with set-based UPDATEs; packed and pooled attempts are graded in
+    memory chunk by chunk. Progress is reported on `job` when given.
+    """
+    chunk_size = chunk_size or settings.REGRADE_CHUNK_SIZE
+
+    db = SessionLocal()
+    try:
+        candidates = affected_quizzes(db, question_id) if question_id is not None else {quiz_id}
+        quiz_ids = {found for (found,) in db.query(Quiz.id).filter(Quiz.id.in_(candidates)).all()}
+
+        # A new quiz version retires cached answer keys and drawn papers in every worker
+        if quiz_ids:
+            db.query(Quiz).filter(Quiz.id.in_(quiz_ids)).update(
+                {Quiz.version: Quiz.version + 1}, synchronize_session=False
+            )
+            db.commit()
+    finally:
+        db.close()
+
+    for changed_quiz_id in quiz_ids:
+        invalidate_paper(changed_quiz_id)
+        invalidate_answer_key(changed_quiz_id)
+
+    totals = {"quizzes": len(quiz_ids), "quizzes_done": 0, "attempts": 0}
+    for current_quiz_id in sorted(quiz_ids):
+        for attempt_model, response_model in TABLES:
+            last_id = 0
+            while True:
+                db = SessionLocal()
+                try:
+                    quiz = db.query(Quiz).filter(Quiz.id == current_quiz_id).one()
+                    attempts = db.query(attempt_model).filter(
+                        attempt_model.quiz_id == current_quiz_id,
+                        attempt_model.status == AttemptStatus.completed,
+                        attempt_model.id > last_id
+                    ).order_by(attempt_model.id).limit(chunk_size).all()
+                    if not attempts:
+                        break
+
+                    mapped_rows = {
+                        attempt.id for attempt in attempts
+                        if attempt.answer_sheet is None and attempt.paper_seed is None
+                    }
+                    if mapped_rows:
+                        _regrade_rows(db, attempt_model, response_model, current_quiz_id, list(mapped_rows), question_id)
+                    others = [attempt for attempt in attempts if attempt.id not in mapped_rows]
+                    if others:
+                        _regrade_each(db, attempt_model, response_model, quiz, others)
+                    last_id = attempts[-1].id
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                finally:
+                    db.close()
+
+                totals["attempts"] += len(attempts)
+                if job is not None:
+                    job.progress = dict(totals, quiz_id=current_quiz_id)
+
+        totals["quizzes_done"] += 1
+        if job is not None:
+            job.progress = dict(totals)
+
+    # Changed scores cannot be folded into the stats incrementally; they are rebuilt on next use.
+    # Bumping the version again retires results cached while the chunks were being regraded
+    db = SessionLocal()
+    try:
+        totals["stats_discarded"] = discard_user_stats(db, quiz_ids)
+        if quiz_ids:
+            db.query(Quiz).filter(Quiz.id.in_(quiz_ids)).update(
+                {Quiz.version: Quiz.version + 1}, synchronize_session=False
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info("Regraded %(attempts)s attempts across %(quizzes)s quizzes", totals)
+    return totals
@@ -0,0 +1,167 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import desc, func, select, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.question import Question, QuestionOption
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class QuestionIndex:
+    """In-process BM25 inverted index over question and option text.
+
+    Built from two queries on first use, then kept current incrementally:
+    `add()` indexes a question as soon as it is created here, and each search
+    first picks up questions other workers created (ids above the highest one
+    indexed), which is one range scan on the primary key. Only current
+    versions are indexed: `remove()` drops an edited question, and a new
+    version picked up from another worker drops the one it superseded.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)  # term -> {question_id: term frequency}
+        self._lengths: Dict[int, int] = {}  # question_id -> document length in tokens
+        self._total_length = 0
+        self._max_question_id = 0
+        self._built = False
+        self._lock = threading.RLock()
+
+    # Index a newly created question; until the first search builds the index there is nothing to update
+    def add(self, question_id: int, texts: Iterable[str]) -> None:
+        with self._lock:
+            if self._built:
+                self._add(question_id, texts)
+
+    def add_question(self, question: Question) -> None:
+        self.add(question.id, [question.question] + [option.option for option in question.options])
+
+    # Drop a superseded version (a scan of the vocabulary; edits are rare next to searches)
+    def remove(self, question_id: int) -> None:
+        with self._lock:
+            length = self._lengths.pop(question_id, None)
+            if length is None:
+                return
+            self._total_length -= length
+            for term in list(self._postings):
+                postings = self._postings[term]
+                if postings.pop(question_id, None) is not None and not postings:
+                    del self._postings[term]
+
+    def _add(self, question_id: int, texts: Iterable[str]) -> None:
+        terms = Counter(token for text in texts for token in tokenize(text))
+        with self._lock:
+            if question_id in self._lengths:
+                return
+            for term, frequency in terms.items():
+                self._postings[term][question_id] = frequency
+            length = sum(terms.values())
+            self._lengths[question_id] = length
+            self._total_length += length
+            self._max_question_id = max(self._max_question_id, question_id)
+
+    def catch_up(self, db: Session) -> None:
+        with self._lock:
+            after = self._max_question_id if self._built else 0
+            texts = defaultdict(list)
+            edits = []
+            for question_id, text, version in db.query(Question.id, Question.question, Question.version).filter(
+                Question.id > after,
+                Question.superseded_by.is_(None)
+            ):
+                texts[question_id].append(text)
+                if version > 1:
+                    edits.append(question_id)
+            if texts:
+                for question_id, text in db.query(QuestionOption.question_id, QuestionOption.option).filter(
+                    QuestionOption.question_id > after
+                ):
+                    if question_id in texts:
+                        texts[question_id].append(text)
+            for question_id, question_texts in texts.items():
+                self._add(question_id, question_texts)
+            # New versions from other workers supersede questions that may already be indexed
+            if self._built and edits:
+                for (question_id,) in db.query(Question.id).filter(Question.superseded_by.in_(edits)):
+                    self.remove(question_id)
+            self._built = True
+
+    def search(self, query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[int, float]]]:
+        with self._lock:
+            documents = len(self._lengths)
+            if not documents:
+                return 0, []
+            average_length = self._total_length / documents
+
+            scores: Dict[int, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                for question_id, frequency in postings.items():
+                    length_norm = 1 - B + B * self._lengths[question_id] / average_length
+                    scores[question_id] += idf * frequency * (K1 + 1) / (frequency + K1 * length_norm)
+
+        ranked = heapq.nsmallest(offset + limit, scores.items(), key=lambda hit: (-hit[1], hit[0]))
+        return len(scores), ranked[offset:]
+
+
+question_index = QuestionIndex()
+
+
+def _use_fulltext(db: Session) -> bool:
+    if settings.SEARCH_BACKEND == "auto":
+        return db.get_bind().dialect.name == "mysql"
+    return settings.SEARCH_BACKEND == "fulltext"
+
+
+def _fulltext_search(db: Session, query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[int, float]]]:
+    question_score = match(Question.question, against=query).in_natural_language_mode()
+    option_score = match(QuestionOption.option, against=query).in_natural_language_mode()
+
+    hits = union_all(
+        select(Question.id.label("question_id"), question_score.label("score")).where(
+            question_score > 0, Question.superseded_by.is_(None)
+        ),
+        select(QuestionOption.question_id, option_score.label("score")).join(
+            Question, Question.id == QuestionOption.question_id
+        ).where(option_score > 0, Question.superseded_by.is_(None))
+    ).subquery()
+    ranked = select(
+        hits.c.question_id, func.sum(hits.c.score).label("score")
+    ).group_by(hits.c.question_id).subquery()
+
+    total = db.execute(select(func.count()).select_from(ranked)).scalar()
+    page = db.execute(
+        select(ranked.c.question_id, ranked.c.score).order_by(
+            desc(ranked.c.score), ranked.c.question_id
+        ).limit(limit).offset(offset)
+    ).all()
+    return total, [(question_id, float(score)) for question_id, score in page]
+
+
+def search_questions(db: Session, query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[int, float]]]:
+    """Rank questions by relevance of their text and options to `query`.
+
+    Uses the FULLTEXT indexes on MySQL and the in-process index elsewhere.
+    Returns the total number of matches and one page of (question_id, score).
+    """
+    if _use_fulltext(db):
+        return _fulltext_search(db, query, limit, offset)
+    question_index.catch_up(db)
+    return question_index.search(query, limit, offset)
+
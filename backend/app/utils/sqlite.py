@@ -0,0 +1,88 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from app.config import settings
+
+# Statements that take SQLite's database write lock
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER")
+
+
+class WriteSerializer:
+    """Lets one connection of this process write at a time.
+
+    SQLite allows a single writer per database. Without coordination, two
+    threads whose transactions both write race for the lock and the loser
+    can fail with "database is locked" (busy_timeout cannot help when a
+    reader tries to upgrade to a writer). Here a connection takes the
+    process-wide lock before its transaction's first write and releases it
+    as the transaction commits or rolls back, so writers queue up in Python
+    while readers keep going in parallel under WAL. Other processes (and the
+    moment between release and the COMMIT itself) are covered by
+    busy_timeout: a transaction's first statement here is its first write,
+    so a busy writer waits instead of failing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "commit", self._release)
+        event.listen(engine, "rollback", self._release)
+        # A connection returned to the pool mid-transaction is rolled back at the driver level
+        event.listen(engine.pool, "checkin", self._checkin)
+
+    def _before_execute(self, connection, cursor, statement, parameters, context, executemany):
+        if connection.info.get("writer") or not statement.lstrip()[:7].upper().startswith(WRITE_PREFIXES):
+            return
+        if not self._lock.acquire(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000):
+            raise OperationalError(statement, parameters, Exception("database is locked (write serializer timeout)"))
+        connection.info["writer"] = True
+
+    def _release(self, connection):
+        if connection.info.pop("writer", False):
+            self._lock.release()
+
+    def _checkin(self, dbapi_connection, connection_record):
+        if connection_record is not None and connection_record.info.pop("writer", False):
+            self._lock.release()
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_MB * 1024}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_MB * 1024 * 1024}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def create_sqlite_engine(path: str) -> Engine:
+    """Engine for the embedded SQLite backend: WAL, tuned pragmas and serialized writes.
+
+    Connections come from a regular pool and may be used by a different
+    thread than the one that opened them (the threadpool runs sync routes
+    and dependencies), hence check_same_thread=False; each is used by one
+    thread at a time. ":memory:" is served from a file in a throwaway
+    directory removed at exit: a true in-memory database lives in a single
+    connection, which the threadpool and the background writers would use
+    concurrently (interleaving their transactions, and one thread's commit
+    releasing another's write lock).
+    """
+    if path == ":memory:":
+        directory = tempfile.mkdtemp(prefix="quiz-sqlite-")
+        atexit.register(shutil.rmtree, directory, True)
+        path = os.path.join(directory, "memory.db")
+    connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    engine = create_engine(f"sqlite:///{path}", connect_args=connect_args, pool_size=20, max_overflow=20)
+    event.listen(engine, "connect", _set_pragmas)
+    WriteSerializer().install(engine)
+    return engine
@@ -0,0 +1,386 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from app.config import settings
+from app.database import SessionLocal
+from app.models.quiz import Quiz
+from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
+from app.utils.cache import LRUCache
+from app.utils.grading import grade_submission
+from app.utils.question_pools import answer_key_for_attempt
+from app.utils.answer_sheet import grade_sheet
+from app.utils.serialization import dumps, loads
+from app.utils.events import event_broker, ATTEMPT_SUBMITTED, SUBMISSION_QUEUED
+from app.utils.user_stats import record_attempts
+from app.utils.outbox import add_events, completion_payload, outbox_relay, ATTEMPT_COMPLETED
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# First wait before retrying a batch after a transient database error; doubles up to SUBMISSION_RETRY_MAX_SECONDS
+RETRY_INITIAL_SECONDS = 0.1
+
+
+# Completes a batch of attempts in one executemany, each only while it is still in progress
+_attempts = QuizAttempt.__table__
+COMPLETE_ATTEMPT = update(_attempts).where(
+    _attempts.c.id == bindparam("attempt_id"),
+    _attempts.c.status == AttemptStatus.in_progress
+).values(
+    status=AttemptStatus.completed,
+    end_time=bindparam("completed_at"),
+    score=bindparam("attempt_score"),
+    answer_sheet=bindparam("sheet")
+)
+
+
+class AttemptsChanged(Exception):
+    """An attempt in the batch was completed elsewhere after it was read."""
+
+
+# Errors that say nothing about the submission itself: lost connection, restart, deadlock, lock or pool timeout
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, (OperationalError, InterfaceError, PoolTimeoutError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class SubmissionJournal:
+    """Append-only, fsynced log of accepted submissions.
+
+    Each process writes its own `submissions-<pid>.jsonl` and holds an
+    exclusive lock on it. A journal whose lock can be taken belongs to a dead
+    process; its unfinished submissions are adopted on startup. Submissions
+    that can never be written are parked in `failed-<pid>.jsonl`, which is
+    never truncated, for an operator to inspect.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"submissions-{os.getpid()}.jsonl"
+        self._lock = threading.Lock()
+        self._file = open(self.path, "ab")
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def append(self, record: dict) -> None:
+        with self._lock:
+            self._file.write(dumps(record) + b"\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def mark_done(self, attempt_ids: List[int]) -> None:
+        self.append({"done": attempt_ids})
+
+    # Durably record a submission that failed for a reason retrying cannot fix
+    def park(self, record: dict, error: str) -> None:
+        with self._lock, open(self.directory / f"failed-{os.getpid()}.jsonl", "ab") as parked:
+            parked.write(dumps({**record, "error": error, "failed_at": datetime.utcnow().isoformat()}) + b"\n")
+            parked.flush()
+            os.fsync(parked.fileno())
+
+    # Start a fresh journal once everything in it has been written to the database
+    def truncate(self) -> None:
+        with self._lock:
+            self._file.truncate(0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def adopt_orphans(self) -> List[dict]:
+        # Left by an earlier run in this process that stopped while the database was unavailable
+        with open(self.path, "rb") as own:
+            pending = self._pending_records(own.read())
+        if pending:
+            self.truncate()
+            for record in pending:
+                self.append(record)
+
+        for path in self.directory.glob("submissions-*.jsonl"):
+            if path == self.path:
+                continue
+            with open(path, "rb") as orphan:
+                if fcntl:
+                    try:
+                        fcntl.flock(orphan, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # owner is still running
+                records = self._pending_records(orphan.read())
+
+            # Re-journal before removing the orphan so nothing is lost in between
+            for record in records:
+                self.append(record)
+            path.unlink()
+            pending.extend(records)
+        return pending
+
+    @staticmethod
+    def _pending_records(data: bytes) -> List[dict]:
+        accepted: Dict[int, dict] = {}
+        for line in data.splitlines():
+            try:
+                record = loads(line)
+            except ValueError:
+                continue  # torn final write
+            if "done" in record:
+                for attempt_id in record["done"]:
+                    accepted.pop(attempt_id, None)
+            else:
+                accepted[record["attempt_id"]] = record
+        return list(accepted.values())
+
+    def close(self) -> None:
+        self._file.close()
+        # Nothing left to recover after a clean drain
+        if self.path.stat().st_size == 0:
+            self.path.unlink()
+
+
+class SubmissionQueue:
+    """Group-commit writer for quiz submissions.
+
+    `submit()` journals a submission and returns immediately; a background
+    thread collects up to SUBMISSION_BATCH_SIZE submissions (waiting at most
+    SUBMISSION_BATCH_WINDOW_MS) and grades and writes them in a single
+    transaction with executemany statements. A batch stays in the journal
+    until it is written: transient database errors are retried with backoff
+    (and a stop during an outage leaves it there for the next start), while
+    a submission that fails on its own is isolated and parked.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._statuses = LRUCache(settings.SUBMISSION_STATUS_CACHE_SIZE)
+        self._journal: Optional[SubmissionJournal] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._journal = SubmissionJournal(settings.SUBMISSION_JOURNAL_DIR)
+        for record in self._journal.adopt_orphans():
+            self._enqueue(record)
+        self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stopping.set()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        # Anything still queued is journaled and replayed by the next start
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._journal.close()
+
+    def submit(self, attempt_id: int, quiz_id: int, answers: Dict[int, Optional[int]]) -> dict:
+        # The attempt id is the idempotency key: resubmitting a queued attempt is a no-op
+        with self._lock:
+            existing = self._statuses.get(attempt_id)
+            if existing and existing["status"] in (QUEUED, COMPLETED):
+                return existing
+
+            record = {
+                "attempt_id": attempt_id,
+                "quiz_id": quiz_id,
+                "answers": [[question_id, option_id] for question_id, option_id in answers.items()],
+                "submitted_at": datetime.utcnow().isoformat()
+            }
+            self._journal.append(record)
+            status = self._enqueue(record)
+        
+        event_broker.publish(quiz_id, SUBMISSION_QUEUED, attempt_id=attempt_id)
+        return status
+
+    def status(self, attempt_id: int) -> Optional[dict]:
+        return self._statuses.get(attempt_id)
+
+    def _enqueue(self, record: dict) -> dict:
+        status = {"attempt_id": record["attempt_id"], "status": QUEUED}
+        self._statuses.set(record["attempt_id"], status)
+        self._queue.put(record)
+        return status
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            # Collect a batch: whatever arrives within the window, up to the batch size
+            batch = [first]
+            deadline = time.monotonic() + settings.SUBMISSION_BATCH_WINDOW_MS / 1000
+            stopping = False
+            while len(batch) < settings.SUBMISSION_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            if not self._write(batch):
+                return  # stopped during a database outage; the batch stays journaled
+            self._journal.mark_done([record["attempt_id"] for record in batch])
+            # Under the submit lock, so no accepted record is appended between check and truncate
+            with self._lock:
+                if self._queue.empty():
+                    self._journal.truncate()
+            if stopping:
+                return
+
+    # Returns False if the queue was stopped before a transient failure cleared
+    def _write(self, batch: List[dict]) -> bool:
+        delay = RETRY_INITIAL_SECONDS
+        while True:
+            # Closing the session rolls back, even when the connection has gone away
+            db = SessionLocal()
+            try:
+                results, graded = self._grade_batch(db, batch)
+                db.commit()
+                break
+            except AttemptsChanged:
+                continue  # re-read: the attempts completed elsewhere are now reported as such
+            except Exception as e:
+                if not _is_transient(e):
+                    if len(batch) > 1:
+                        db.close()
+                        # Isolate the failing submission by writing the batch one by one
+                        return all(self._write([record]) for record in batch)
+                    logger.exception("Could not write submission for attempt %s", batch[0]["attempt_id"])
+                    self._journal.park(batch[0], repr(e))
+                    results = {batch[0]["attempt_id"]: {"attempt_id": batch[0]["attempt_id"], "status": FAILED}}
+                    graded = []
+                    break
+                logger.warning("Database unavailable for %s submissions, retrying in %.1fs: %s", len(batch), delay, e)
+            finally:
+                db.close()
+            if self._stopping.wait(delay):
+                return False
+            delay = min(delay * 2, settings.SUBMISSION_RETRY_MAX_SECONDS)
+
+        if graded:
+            outbox_relay.notify()
+        for attempt_id, result in results.items():
+            self._statuses.set(attempt_id, result)
+        for quiz_id, attempt_id, user_id, score in graded:
+            event_broker.publish(quiz_id, ATTEMPT_SUBMITTED, attempt_id=attempt_id, user_id=user_id, score=score)
+        return True
+
+    # Returns statuses by attempt id and (quiz_id, attempt_id, user_id, score) for newly graded attempts
+    def _grade_batch(self, db, batch: List[dict]) -> Tuple[Dict[int, dict], List[Tuple[int, int, int, int]]]:
+        attempt_ids = [record["attempt_id"] for record in batch]
+        attempts = {
+            attempt.id: attempt
+            for attempt in db.query(QuizAttempt).filter(QuizAttempt.id.in_(attempt_ids)).all()
+        }
+        quizzes = {
+            quiz.id: quiz
+            for quiz in db.query(Quiz).filter(Quiz.id.in_({a.quiz_id for a in attempts.values()})).all()
+        }
+
+        response_ids = defaultdict(dict)
+        for attempt_id, question_id, response_id in db.query(
+            QuizResponse.attempt_id, QuizResponse.question_id, QuizResponse.id
+        ).filter(QuizResponse.attempt_id.in_(attempt_ids)).all():
+            response_ids[attempt_id][question_id] = response_id
+
+        results = {}
+        graded = []
+        updates = []
+        inserts = []
+        attempt_updates = []
+        stats = []
+        completions = []
+
+        for record in batch:
+            attempt = attempts.get(record["attempt_id"])
+            if attempt is None:
+                self._journal.park(record, "attempt not found")
+                results[record["attempt_id"]] = {"attempt_id": record["attempt_id"], "status": FAILED}
+                continue
+
+            quiz = quizzes[attempt.quiz_id]
+            if attempt.status != AttemptStatus.in_progress:
+                # Already graded (replayed journal entry or a synchronous submit won the race)
+                results[attempt.id] = _completed(attempt.id, quiz, attempt.score)
+                continue
+
+            answer_key = answer_key_for_attempt(db, quiz, attempt)
+            answer_sheet = attempt.answer_sheet
+            if answer_sheet is not None:
+                score, answer_sheet = grade_sheet(answer_key, answer_sheet, record["answers"])
+            else:
+                score, attempt_response_updates, attempt_response_inserts = grade_submission(
+                    answer_key, attempt.id, record["answers"], response_ids[attempt.id]
+                )
+                updates.extend(attempt_response_updates)
+                inserts.extend(attempt_response_inserts)
+            end_time = datetime.fromisoformat(record["submitted_at"])
+            attempt_updates.append({
+                "attempt_id": attempt.id,
+                "completed_at": end_time,
+                "attempt_score": score,
+                "sheet": answer_sheet
+            })
+            results[attempt.id] = _completed(attempt.id, quiz, score)
+            graded.append((quiz.id, attempt.id, attempt.user_id, score))
+            stats.append((attempt.user_id, score, quiz.total_score, attempt.start_time, end_time))
+            completions.append(completion_payload(attempt, quiz, score, end_time))
+
+        if updates:
+            db.execute(update(QuizResponse), updates)
+        if inserts:
+            db.execute(insert(QuizResponse), inserts)
+        if attempt_updates:
+            # A synchronous submit may have completed one of them since it was read; its stats and
+            # event are already recorded, so nothing of this batch may be
+            if db.execute(COMPLETE_ATTEMPT, attempt_updates).rowcount != len(attempt_updates):
+                raise AttemptsChanged()
+            record_attempts(db, stats)
+            add_events(db, ATTEMPT_COMPLETED, completions)
+
+        return results, graded
+
+
+def _completed(attempt_id: int, quiz: Quiz, score: int) -> dict:
+    return {
+        "attempt_id": attempt_id,
+        "status": COMPLETED,
+        "quiz_id": quiz.id,
+        "total_possible_score": quiz.total_score,
+        "score_obtained": score
+    }
+
+
+submission_queue = SubmissionQueue()
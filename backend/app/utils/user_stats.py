@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import case, delete, select, union, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.user import UserStats
+from app.models.quiz import Quiz
+from app.models.attempt import QuizAttempt, AttemptStatus
+from app.models.archive import ArchivedQuizAttempt
+
+
+def _seconds(start_time: Optional[datetime], end_time: Optional[datetime]) -> int:
+    if start_time is None or end_time is None:
+        return 0
+    return max(int((end_time - start_time).total_seconds()), 0)
+
+
+def _percentage(score: int, possible: int) -> float:
+    return round(100 * score / possible, 2) if possible else 0.0
+
+
+def rebuild_user_stats(db: Session, user_id: int) -> Optional[UserStats]:
+    """Compute a user's stats from their completed attempts (archived ones included).
+
+    Inserts the row, or returns None when the user has no completed attempt.
+    Stats are otherwise kept up to date incrementally; this builds the row the
+    first time it is needed and after a regrade discarded it.
+    """
+    rows = []
+    for attempt_model in (QuizAttempt, ArchivedQuizAttempt):
+        rows += db.query(
+            attempt_model.score, Quiz.total_score, attempt_model.start_time, attempt_model.end_time
+        ).join(Quiz, Quiz.id == attempt_model.quiz_id).filter(
+            attempt_model.user_id == user_id,
+            attempt_model.status == AttemptStatus.completed
+        ).all()
+    if not rows:
+        return None
+
+    stats = UserStats(
+        user_id=user_id,
+        attempts=len(rows),
+        total_score=sum(score or 0 for score, _, _, _ in rows),
+        total_possible=sum(possible or 0 for _, possible, _, _ in rows),
+        best_score=max(score or 0 for score, _, _, _ in rows),
+        best_percentage=max(_percentage(score or 0, possible) for score, possible, _, _ in rows),
+        total_time_seconds=sum(_seconds(start, end) for _, _, start, end in rows),
+        last_attempt_at=max((end for _, _, _, end in rows if end is not None), default=None)
+    )
+    db.add(stats)
+    db.flush()
+    return stats
+
+
+def record_attempt(db: Session, user_id: int, score: int, possible: int,
+                   start_time: Optional[datetime], end_time: Optional[datetime]) -> bool:
+    """Fold a just-completed attempt into the user's stats, in the caller's transaction.
+
+    The common case is one UPDATE of the user's row. A user without a row
+    gets it built from their history, which already includes every attempt
+    flushed as completed in this transaction; True is returned then.
+    """
+    percentage = _percentage(score, possible)
+    updated = db.execute(
+        update(UserStats).where(UserStats.user_id == user_id).values(
+            attempts=UserStats.attempts + 1,
+            total_score=UserStats.total_score + score,
+            total_possible=UserStats.total_possible + possible,
+            best_score=case((UserStats.best_score < score, score), else_=UserStats.best_score),
+            best_percentage=case((UserStats.best_percentage < percentage, percentage), else_=UserStats.best_percentage),
+            total_time_seconds=UserStats.total_time_seconds + _seconds(start_time, end_time),
+            last_attempt_at=end_time,
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    if updated:
+        return False
+
+    db.flush()
+    try:
+        with db.begin_nested():
+            rebuild_user_stats(db, user_id)
+        return True
+    except IntegrityError:
+        # A concurrent submission built the row first, from history without this attempt; add it on top
+        return record_attempt(db, user_id, score, possible, start_time, end_time)
+
+
+# (user_id, score, possible, start_time, end_time) per attempt completed in this transaction
+def record_attempts(db: Session, attempts: List[Tuple[int, int, int, Optional[datetime], Optional[datetime]]]) -> None:
+    rebuilt = set()
+    for user_id, score, possible, start_time, end_time in attempts:
+        # A row rebuilt from history already counts the user's other attempts in this batch
+        if user_id not in rebuilt and record_attempt(db, user_id, score, possible, start_time, end_time):
+            rebuilt.add(user_id)
+
+
+def discard_user_stats(db: Session, quiz_ids: Iterable[int]) -> int:
+    """Drop the stats of everyone who completed one of these quizzes; they are rebuilt on next use.
+
+    Used after a regrade, where a changed score cannot be folded in
+    incrementally (the best score may have gone down).
+    """
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return 0
+    user_ids = union(
+        select(QuizAttempt.user_id).where(QuizAttempt.quiz_id.in_(quiz_ids)),
+        select(ArchivedQuizAttempt.user_id).where(ArchivedQuizAttempt.quiz_id.in_(quiz_ids))
+    )
+    return db.execute(
+        delete(UserStats).where(UserStats.user_id.in_(select(user_ids.subquery().c.user_id)))
+    ).rowcount
+
+
+# A user's stats row, built from their history if it does not exist yet
+def get_user_stats(db: Session, user_id: int) -> Optional[UserStats]:
+    stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if stats is not None:
+        return stats
+    try:
+        stats = rebuild_user_stats(db, user_id)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    return stats
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session, selectinload
+from app.config import settings
+from app.database import SessionLocal, engine, read_engine
+from app.models.quiz import Quiz
+from app.utils.grading import get_answer_key
+from app.utils.paper_cache import get_paper
+from app.utils.question_pools import tag_assignments
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Whether this worker is warm enough to take traffic (backs /health/ready)."""
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self.warmed_quizzes = 0
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmed_quizzes": self.warmed_quizzes,
+            "warmup_seconds": self.warmup_seconds
+        }
+
+
+readiness = Readiness()
+
+
+# Open a connection so the pool and dialect are initialized before the first request needs them
+def ping_database() -> None:
+    for bind in {engine, read_engine}:
+        with bind.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+
+def upcoming_quizzes(db: Session) -> List[Quiz]:
+    # Quizzes scheduled to start within the window, or that started within it and may still be running
+    now = datetime.utcnow()
+    window = timedelta(minutes=settings.WARMUP_WINDOW_MINUTES)
+    return db.query(Quiz).options(selectinload(Quiz.pools)).filter(
+        Quiz.starts_at.between(now - window, now + window)
+    ).order_by(Quiz.starts_at).limit(settings.WARMUP_MAX_QUIZZES).all()
+
+
+def warm_up() -> None:
+    """Initialize connections and load papers and answer keys of upcoming quizzes.
+
+    Failures are logged, not raised: a cold cache only costs latency, and
+    /health/ready still checks the database on every probe.
+    """
+    started = time.monotonic()
+    try:
+        ping_database()
+        redis_client = get_redis()
+        if redis_client:
+            redis_client.ping()
+
+        db = SessionLocal()
+        try:
+            quizzes = upcoming_quizzes(db)
+            if any(quiz.pools for quiz in quizzes):
+                tag_assignments.catch_up(db)
+            for quiz in quizzes:
+                # Pooled quizzes draw per attempt; the tag assignments above are their shared data
+                if not quiz.pools:
+                    get_paper(db, quiz)
+                    get_answer_key(db, quiz)
+                readiness.warmed_quizzes += 1
+        finally:
+            db.close()
+    except Exception:
+        logger.warning("Startup warm-up failed; serving with cold caches", exc_info=True)
+    finally:
+        readiness.warmup_seconds = round(time.monotonic() - started, 3)
+        readiness.mark_ready()
+        logger.info("Warm-up finished: %(warmed_quizzes)s quizzes in %(warmup_seconds)ss", readiness.to_dict())
+
+
+# Warm up off the event loop so liveness probes are answered meanwhile
+def start_warm_up() -> None:
+    if not settings.WARMUP_ON_STARTUP:
+        readiness.mark_ready()
+        return
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
@@ -0,0 +1,68 @@
+"""Shared setup for the micro-benchmarks: the app on a throwaway, migrated SQLite file.
+
+Run a benchmark from backend/, e.g. `python -m benchmarks.serialization`.
+"""
+import os
+import tempfile
+import timeit
+from typing import Callable
+
+# Settings are read at import time: configure before anything imports the app
+_db_dir = tempfile.TemporaryDirectory()
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(_db_dir.name, "bench.db")
+os.environ.setdefault("IP_RATE_LIMIT_PER_SECOND", "100000")
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.quiz import Quiz, QuizQuestion
+from app.models.question import Question, QuestionOption
+from app.security.jwt import get_password_hash
+from app.utils.migrations import upgrade_to_head
+
+upgrade_to_head()
+
+
+def seed_quiz(num_questions: int, num_options: int = 4) -> int:
+    """A quiz mapped to `num_questions` new questions, one mark each; returns its id."""
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.username == "bench-admin").first()
+        if admin is None:
+            admin = User(username="bench-admin", email="bench-admin@example.com",
+                         password=get_password_hash("pw"), is_admin=True)
+            db.add(admin)
+            db.flush()
+        quiz = Quiz(title="Benchmark quiz", num_questions=num_questions, total_score=num_questions,
+                    duration_minutes=60, created_by=admin.id)
+        db.add(quiz)
+        db.flush()
+        for number in range(1, num_questions + 1):
+            question = Question(
+                question=f"Question {number}: which statement about database indexes is true?",
+                options=[
+                    QuestionOption(option=f"Statement {option} about B-tree lookups", is_correct=(option == 0))
+                    for option in range(num_options)
+                ]
+            )
+            db.add(question)
+            db.flush()
+            db.add(QuizQuestion(quiz_id=quiz.id, question_id=question.id, question_number=number, marks=1))
+        db.commit()
+        return quiz.id
+    finally:
+        db.close()
+
+
+def create_user(username: str, admin: bool = False) -> None:
+    db = SessionLocal()
+    try:
+        db.add(User(username=username, email=f"{username}@example.com", password=get_password_hash("pw"), is_admin=admin))
+        db.commit()
+    finally:
+        db.close()
+
+
+def per_call_us(function: Callable, number: int = 2000) -> float:
+    """Mean microseconds per call over `number` calls."""
+    return timeit.timeit(function, number=number) / number * 1e6
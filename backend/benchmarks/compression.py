@@ -0,0 +1,49 @@
+"""Payload sizes and compression cost of papers and reviews, verbose and compact.
+
+    python -m benchmarks.compression [num_questions]
+"""
+import sys
+from fastapi.testclient import TestClient
+from benchmarks.common import create_user, per_call_us, seed_quiz
+from app.main import app
+from app.config import settings
+from app.utils.compression import brotli, compress
+
+
+def main(num_questions: int = 100) -> None:
+    quiz_id = seed_quiz(num_questions)
+    create_user("bench-user")
+    client = TestClient(app)
+    token = client.post("/api/v1/login", data={"username": "bench-user", "password": "pw"}).json()["access_token"]
+    # Ask for identity so the bodies below are the uncompressed payloads
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "identity"}
+    base = f"/api/v1/user/quizzes/{quiz_id}"
+
+    client.post(f"{base}/start", headers=headers)
+    paper = client.get(f"{base}/questions", headers=headers)
+    paper_compact = client.get(f"{base}/questions?compact=true", headers=headers)
+    submission = {"responses": [
+        {"question_id": question["id"], "selected_option_id": question["options"][index % 2]["id"]}
+        for index, question in enumerate(paper.json()["questions"])
+    ]}
+    client.post(f"{base}/submit", headers=headers, json=submission)
+    review = client.get(f"{base}/response", headers=headers)
+    review_compact = client.get(f"{base}/response?compact=true", headers=headers)
+
+    print(f"{num_questions}-question quiz: raw / gzip-{settings.COMPRESSION_GZIP_LEVEL} / "
+          f"br-{settings.COMPRESSION_BROTLI_QUALITY} bytes, gzip / br compression us")
+    for label, response in (("paper", paper), ("paper compact", paper_compact),
+                            ("review", review), ("review compact", review_compact)):
+        body = response.content
+        gzip_size = len(compress(body, "gzip"))
+        gzip_us = per_call_us(lambda: compress(body, "gzip"), number=500)
+        if brotli is None:
+            print("  %-15s %6d / %5d / -      %6.0f / -" % (label, len(body), gzip_size, gzip_us))
+            continue
+        br_size = len(compress(body, "br"))
+        br_us = per_call_us(lambda: compress(body, "br"), number=500)
+        print("  %-15s %6d / %5d / %5d  %6.0f / %4.0f" % (label, len(body), gzip_size, br_size, gzip_us, br_us))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
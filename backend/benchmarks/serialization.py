@@ -0,0 +1,42 @@
+"""Encoding a quiz paper: jsonable_encoder + json vs orjson vs the cached paper render.
+
+    python -m benchmarks.serialization [num_questions]
+"""
+import json
+import sys
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from benchmarks.common import SessionLocal, per_call_us, seed_quiz
+from app.models.quiz import Quiz
+from app.utils.paper_cache import get_paper
+from app.utils.serialization import dumps
+
+
+def main(num_questions: int = 100) -> None:
+    quiz_id = seed_quiz(num_questions)
+    db = SessionLocal()
+    try:
+        paper = get_paper(db, db.get(Quiz, quiz_id))
+    finally:
+        db.close()
+
+    header = {
+        "quiz_id": quiz_id,
+        "title": "Benchmark quiz",
+        "duration_minutes": 60,
+        "total_score": num_questions,
+        "attempt_id": 1,
+        "start_time": datetime.utcnow()
+    }
+    selections = {question_id: None for question_id in paper.question_ids}
+    document = json.loads(paper.render(header, selections))
+    document["start_time"] = header["start_time"]
+
+    print(f"Encoding one {num_questions}-question paper:")
+    print("  jsonable_encoder + json.dumps  %8.1f us" % per_call_us(lambda: json.dumps(jsonable_encoder(document)).encode()))
+    print("  orjson on the same dict        %8.1f us" % per_call_us(lambda: dumps(document)))
+    print("  cached paper render            %8.1f us" % per_call_us(lambda: paper.render(header, selections)))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,155 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('username', sa.String(length=255), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'questions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_questions_id', 'questions', ['id'])
+
+    op.create_table(
+        'question_options',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('option', sa.Text(), nullable=False),
+        sa.Column('is_correct', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_question_options_id', 'question_options', ['id'])
+
+    op.create_table(
+        'quizzes',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('num_questions', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.Integer(), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_quizzes_id', 'quizzes', ['id'])
+
+    op.create_table(
+        'quiz_questions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('question_number', sa.Integer(), nullable=False),
+        sa.Column('marks', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('quiz_id', 'question_id', name='unique_quiz_question'),
+        sa.UniqueConstraint('quiz_id', 'question_number', name='unique_quiz_question_number'),
+    )
+    op.create_index('ix_quiz_questions_id', 'quiz_questions', ['id'])
+
+    op.create_table(
+        'quiz_attempts',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('in_progress', 'completed', name='attemptstatus'), nullable=True),
+        sa.Column('start_time', sa.DateTime(), nullable=True),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'quiz_id', 'status', name='unique_user_quiz_attempt'),
+    )
+    op.create_index('ix_quiz_attempts_id', 'quiz_attempts', ['id'])
+
+    op.create_table(
+        'quiz_responses',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('attempt_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('selected_option_id', sa.Integer(), nullable=True),
+        sa.Column('is_correct', sa.Boolean(), nullable=True),
+        sa.Column('marks_obtained', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['attempt_id'], ['quiz_attempts.id']),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+        sa.ForeignKeyConstraint(['selected_option_id'], ['question_options.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('attempt_id', 'question_id', name='unique_attempt_question'),
+    )
+    op.create_index('ix_quiz_responses_id', 'quiz_responses', ['id'])
+
+    op.create_table(
+        'user_tokens',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(length=512), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token'),
+    )
+    op.create_index('ix_user_tokens_id', 'user_tokens', ['id'])
+
+    op.create_table(
+        'rate_limits',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=True),
+        sa.Column('last_reset_time', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+    op.create_index('ix_rate_limits_id', 'rate_limits', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_table('rate_limits')
+    op.drop_table('user_tokens')
+    op.drop_table('quiz_responses')
+    op.drop_table('quiz_attempts')
+    op.drop_table('quiz_questions')
+    op.drop_table('quizzes')
+    op.drop_table('question_options')
+    op.drop_table('questions')
+    op.drop_table('users')
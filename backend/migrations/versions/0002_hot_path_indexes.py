@@ -0,0 +1,44 @@
+"""covering indexes for hot-path queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00
+
+Each index serves a router query without touching the clustered rows:
+- quiz_attempts (quiz_id, status): admin participants and per-quiz counters.
+  Lookups by (user_id, quiz_id, status) use unique_user_quiz_attempt.
+- quiz_responses (attempt_id, question_id, selected_option_id): the paper's
+  selections for an attempt.
+- question_options (question_id, is_correct): correct-option lookups while
+  grading and reviewing.
+- quiz_questions (quiz_id, question_id, marks): marks lookups while grading.
+- user_tokens (user_id, is_active): logout.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_quiz_attempts_quiz_status', 'quiz_attempts', ['quiz_id', 'status'])
+    op.create_index('ix_quiz_responses_attempt_selection', 'quiz_responses', ['attempt_id', 'question_id', 'selected_option_id'])
+    op.create_index('ix_question_options_question_correct', 'question_options', ['question_id', 'is_correct'])
+    op.create_index('ix_quiz_questions_quiz_question_marks', 'quiz_questions', ['quiz_id', 'question_id', 'marks'])
+    op.create_index('ix_user_tokens_user_active', 'user_tokens', ['user_id', 'is_active'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_tokens_user_active', table_name='user_tokens')
+    op.drop_index('ix_quiz_questions_quiz_question_marks', table_name='quiz_questions')
+    op.drop_index('ix_question_options_question_correct', table_name='question_options')
+    op.drop_index('ix_quiz_responses_attempt_selection', table_name='quiz_responses')
+    op.drop_index('ix_quiz_attempts_quiz_status', table_name='quiz_attempts')
@@ -0,0 +1,53 @@
+"""archive tables for completed attempts
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'quiz_attempts_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('in_progress', 'completed', name='attemptstatus'), nullable=True),
+        sa.Column('start_time', sa.DateTime(), nullable=True),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('answer_sheet', sa.LargeBinary(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_quiz_attempts_archive_user_quiz', 'quiz_attempts_archive', ['user_id', 'quiz_id'])
+    op.create_index('ix_quiz_attempts_archive_quiz', 'quiz_attempts_archive', ['quiz_id'])
+
+    op.create_table(
+        'quiz_responses_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('attempt_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('selected_option_id', sa.Integer(), nullable=True),
+        sa.Column('is_correct', sa.Boolean(), nullable=True),
+        sa.Column('marks_obtained', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_quiz_responses_archive_attempt', 'quiz_responses_archive', ['attempt_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('quiz_responses_archive')
+    op.drop_table('quiz_attempts_archive')
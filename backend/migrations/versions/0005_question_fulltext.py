@@ -0,0 +1,33 @@
+"""FULLTEXT indexes for question search
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FULLTEXT is MySQL-only; other databases search through the in-process index
+    if op.get_context().dialect.name != 'mysql':
+        return
+    op.create_index('ix_questions_question_fulltext', 'questions', ['question'], mysql_prefix='FULLTEXT')
+    op.create_index('ix_question_options_option_fulltext', 'question_options', ['option'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'mysql':
+        return
+    op.drop_index('ix_question_options_option_fulltext', table_name='question_options')
+    op.drop_index('ix_questions_question_fulltext', table_name='questions')
@@ -0,0 +1,31 @@
+"""question text hash and MinHash signature for duplicate detection
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 12:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are fingerprinted by the app the first time it checks for duplicates
+    op.add_column('questions', sa.Column('text_hash', sa.String(length=64), nullable=True))
+    op.add_column('questions', sa.Column('minhash', sa.LargeBinary(), nullable=True))
+    op.create_index('ix_questions_text_hash', 'questions', ['text_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_text_hash', table_name='questions')
+    op.drop_column('questions', 'minhash')
+    op.drop_column('questions', 'text_hash')
@@ -0,0 +1,69 @@
+"""tags, quiz question pools and per-attempt draw seeds
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tags',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index('ix_tags_id', 'tags', ['id'])
+
+    op.create_table(
+        'question_tags',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('question_id', 'tag_id', name='unique_question_tag'),
+    )
+    op.create_index('ix_question_tags_id', 'question_tags', ['id'])
+    op.create_index('ix_question_tags_tag', 'question_tags', ['tag_id'])
+
+    op.create_table(
+        'quiz_pools',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('num_questions', sa.Integer(), nullable=False),
+        sa.Column('marks', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_quiz_pools_id', 'quiz_pools', ['id'])
+    op.create_index('ix_quiz_pools_quiz', 'quiz_pools', ['quiz_id'])
+
+    for table in ('quiz_attempts', 'quiz_attempts_archive'):
+        op.add_column(table, sa.Column('paper_seed', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column('paper_high_water', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in ('quiz_attempts_archive', 'quiz_attempts'):
+        op.drop_column(table, 'paper_high_water')
+        op.drop_column(table, 'paper_seed')
+    op.drop_table('quiz_pools')
+    op.drop_table('question_tags')
+    op.drop_table('tags')
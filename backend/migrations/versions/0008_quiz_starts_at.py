@@ -0,0 +1,28 @@
+"""scheduled start time of quizzes, for startup cache warm-up
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('quizzes', sa.Column('starts_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_quizzes_starts_at', 'quizzes', ['starts_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quizzes_starts_at', table_name='quizzes')
+    op.drop_column('quizzes', 'starts_at')
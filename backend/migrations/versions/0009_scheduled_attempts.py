@@ -0,0 +1,36 @@
+"""scheduled status for attempts pre-provisioned ahead of an exam
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 14:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_STATUS = sa.Enum('in_progress', 'completed', name='attemptstatus')
+NEW_STATUS = sa.Enum('in_progress', 'completed', 'scheduled', name='attemptstatus')
+
+
+def upgrade() -> None:
+    # Only MySQL has a native ENUM to widen; elsewhere the column is a VARCHAR that already fits
+    if op.get_context().dialect.name != 'mysql':
+        return
+    op.alter_column('quiz_attempts', 'status', existing_type=OLD_STATUS, type_=NEW_STATUS, existing_nullable=True)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'mysql':
+        return
+    op.execute("DELETE FROM quiz_responses WHERE attempt_id IN (SELECT id FROM (SELECT id FROM quiz_attempts WHERE status = 'scheduled') AS scheduled)")
+    op.execute("DELETE FROM quiz_attempts WHERE status = 'scheduled'")
+    op.alter_column('quiz_attempts', 'status', existing_type=NEW_STATUS, type_=OLD_STATUS, existing_nullable=True)
@@ -0,0 +1,56 @@
+"""retakes (unique key on open attempts only) and materialized per-user stats
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 15:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_STATUS = "CASE WHEN status = 'completed' THEN NULL ELSE status END"
+
+
+def upgrade() -> None:
+    # NULL once completed, so the unique key below only covers open attempts. Batch mode is a plain
+    # ALTER on MySQL; the new keys come before dropping the old one, which MySQL uses for the user_id foreign key
+    with op.batch_alter_table('quiz_attempts') as batch_op:
+        batch_op.add_column(sa.Column('open_status', sa.String(length=16), sa.Computed(OPEN_STATUS), nullable=True))
+        batch_op.create_unique_constraint('unique_user_quiz_open_attempt', ['user_id', 'quiz_id', 'open_status'])
+        batch_op.create_index('ix_quiz_attempts_user_history', ['user_id', 'id'])
+        batch_op.drop_constraint('unique_user_quiz_attempt', type_='unique')
+
+    # Rows are built by the app from attempt history the first time each user's stats are needed
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.Integer(), nullable=False),
+        sa.Column('total_possible', sa.Integer(), nullable=False),
+        sa.Column('best_score', sa.Integer(), nullable=False),
+        sa.Column('best_percentage', sa.Float(), nullable=False),
+        sa.Column('total_time_seconds', sa.Integer(), nullable=False),
+        sa.Column('last_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
+    # Fails if any user has retaken a quiz; archive or remove the extra completed attempts first
+    with op.batch_alter_table('quiz_attempts') as batch_op:
+        batch_op.create_unique_constraint('unique_user_quiz_attempt', ['user_id', 'quiz_id', 'status'])
+        batch_op.drop_index('ix_quiz_attempts_user_history')
+        batch_op.drop_constraint('unique_user_quiz_open_attempt', type_='unique')
+        batch_op.drop_column('open_status')
@@ -0,0 +1,37 @@
+"""immutable question versions (edits insert a new version row)
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 17:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing questions become the first (and current) version of their own lineage
+    with op.batch_alter_table('questions') as batch_op:
+        batch_op.add_column(sa.Column('lineage_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('superseded_by', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_questions_superseded_by', 'questions', ['superseded_by'], ['id'])
+        batch_op.create_unique_constraint('unique_question_lineage_version', ['lineage_id', 'version'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('questions') as batch_op:
+        batch_op.drop_constraint('unique_question_lineage_version', type_='unique')
+        batch_op.drop_constraint('fk_questions_superseded_by', type_='foreignkey')
+        batch_op.drop_column('superseded_by')
+        batch_op.drop_column('version')
+        batch_op.drop_column('lineage_id')
@@ -0,0 +1,29 @@
+"""integer quiz version keying the paper and answer-key caches
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 18:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # updated_at has second resolution on MySQL, too coarse to tell two quick changes apart
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,98 @@
+import os
+import tempfile
+from itertools import count
+
+# Settings are read at import time: point the app at a throwaway SQLite file before importing it
+_db_dir = tempfile.TemporaryDirectory()
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(_db_dir.name, "test.db")
+os.environ.setdefault("IP_RATE_LIMIT_PER_SECOND", "100000")
+os.environ.setdefault("AUTH_RATE_LIMIT_PER_MINUTE", "100000")
+os.environ.setdefault("AUTH_USERNAME_RATE_LIMIT_PER_MINUTE", "100000")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.quiz import Quiz, QuizQuestion
+from app.models.question import Question, QuestionOption
+from app.security.jwt import get_password_hash
+from app.utils.migrations import upgrade_to_head
+
+_names = count()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    upgrade_to_head()
+    yield
+    _db_dir.cleanup()
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def login(client, db):
+    """Create a user and return auth headers for it."""
+    def _login(admin: bool = False) -> dict:
+        username = f"user{next(_names)}"
+        db.add(User(username=username, email=f"{username}@example.com", password=get_password_hash("pw"), is_admin=admin))
+        db.commit()
+        response = client.post("/api/v1/login", data={"username": username, "password": "pw"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return _login
+
+
+@pytest.fixture
+def make_questions(db):
+    """Create questions with four options each (the first is correct); returns their ids."""
+    def _make_questions(num_questions: int) -> list:
+        questions = [
+            Question(
+                question=f"Question {next(_names)} about indexing",
+                options=[QuestionOption(option=f"Option {i}", is_correct=(i == 0)) for i in range(4)]
+            )
+            for _ in range(num_questions)
+        ]
+        db.add_all(questions)
+        db.commit()
+        return [question.id for question in questions]
+    return _make_questions
+
+
+@pytest.fixture
+def make_quiz(db, make_questions):
+    """Create a quiz mapped to `num_questions` new questions (one mark each); returns its id."""
+    def _make_quiz(num_questions: int, mapped: bool = True) -> int:
+        admin = db.query(User).filter(User.is_admin == True).first()
+        if admin is None:
+            admin = User(username=f"admin{next(_names)}", email=f"admin{next(_names)}@example.com",
+                         password=get_password_hash("pw"), is_admin=True)
+            db.add(admin)
+            db.flush()
+        quiz = Quiz(title=f"Quiz {next(_names)}", num_questions=num_questions, total_score=num_questions,
+                    duration_minutes=30, created_by=admin.id)
+        db.add(quiz)
+        db.commit()
+        if mapped:
+            db.add_all([
+                QuizQuestion(quiz_id=quiz.id, question_id=question_id, question_number=number, marks=1)
+                for number, question_id in enumerate(make_questions(num_questions), start=1)
+            ])
+            db.commit()
+        return quiz.id
+    return _make_quiz
@@ -0,0 +1,43 @@
+"""Admission tickets pace exam starts; open attempts resume without one."""
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_CONTROL", True)
+    monkeypatch.setattr(settings, "ADMISSION_BURST", 1)
+    monkeypatch.setattr(settings, "ADMISSION_RATE_PER_SECOND", 0.5)
+
+
+def _ticket(client, quiz_id: int, headers: dict) -> dict:
+    response = client.post(f"/api/v1/user/quizzes/{quiz_id}/admission", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _start(client, quiz_id: int, headers: dict, ticket: dict = None):
+    if ticket is not None:
+        headers = {**headers, "X-Admission-Ticket": ticket["ticket"]}
+    return client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=headers)
+
+
+def test_tickets_admit_in_schedule_order(client, login, make_quiz, admission):
+    quiz_id = make_quiz(1)
+    first, second = login(), login()
+    assert _start(client, quiz_id, first).status_code == 428
+
+    first_ticket = _ticket(client, quiz_id, first)
+    second_ticket = _ticket(client, quiz_id, second)
+    assert (first_ticket["estimated_wait_seconds"], first_ticket["queue_position"]) == (0, 0)
+    assert 1.9 < second_ticket["estimated_wait_seconds"] <= 2 and second_ticket["queue_position"] == 1
+
+    # A ticket only admits the user it was issued to, and not before its admit time
+    assert _start(client, quiz_id, second, first_ticket).status_code == 428
+    early = _start(client, quiz_id, second, second_ticket)
+    assert early.status_code == 429
+    assert early.headers["retry-after"] in ("1", "2")
+
+    assert _start(client, quiz_id, first, first_ticket).status_code == 200
+    assert _start(client, quiz_id, first).status_code == 200  # resuming needs no ticket
@@ -0,0 +1,33 @@
+"""Packed answer sheets behave like response rows, from start to the graded result."""
+from app.config import settings
+from app.models.attempt import QuizAttempt, QuizResponse
+from app.utils.answer_sheet import pack, unpack
+
+
+def test_pack_round_trips_unanswered_questions():
+    pairs = [(11, 4), (12, None), (1 << 20, 1 << 20)]
+    assert unpack(pack(pairs)) == pairs
+
+
+def _take(client, quiz_id: int, headers: dict) -> dict:
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=headers).status_code == 200
+    first, second = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=headers).json()["questions"]
+    # First question right, second left unanswered
+    answer = {"question_id": first["id"], "selected_option_id": min(option["id"] for option in first["options"])}
+    submitted = client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=headers, json={"responses": [answer]})
+    assert submitted.status_code == 200, submitted.text
+    return client.get(f"/api/v1/user/quizzes/{quiz_id}/response", headers=headers).json()
+
+
+def test_packed_attempt_grades_like_response_rows(client, db, login, make_quiz, monkeypatch):
+    quiz_id = make_quiz(2)
+    rows_result = _take(client, quiz_id, login())
+
+    monkeypatch.setattr(settings, "ANSWER_SHEET_MODE", "packed")
+    packed_result = _take(client, quiz_id, login())
+
+    attempt = db.query(QuizAttempt).filter(QuizAttempt.quiz_id == quiz_id).order_by(QuizAttempt.id.desc()).first()
+    assert attempt.answer_sheet is not None
+    assert db.query(QuizResponse).filter(QuizResponse.attempt_id == attempt.id).count() == 0
+    assert packed_result["user_score"] == 1
+    assert {**packed_result, "completion_time": None} == {**rows_result, "completion_time": None}
@@ -0,0 +1,45 @@
+"""Archived attempts stay readable through the same routes as live ones."""
+from datetime import datetime
+
+from app.models.archive import ArchivedQuizAttempt
+from app.models.attempt import QuizAttempt, AttemptStatus
+from app.utils.archival import archive_completed_attempts
+
+
+def _submit(client, quiz_id: int, headers: dict) -> dict:
+    paper = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=headers).json()
+    responses = [
+        {"question_id": question["id"], "selected_option_id": min(option["id"] for option in question["options"])}
+        for question in paper["questions"]
+    ]
+    response = client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=headers, json={"responses": responses})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_result_is_served_from_the_archive(client, db, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(2)
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+    attempt_id = _submit(client, quiz_id, user)["attempt_id"]
+    live = client.get(f"/api/v1/user/quizzes/{quiz_id}/response", headers=user).json()
+
+    assert archive_completed_attempts(older_than_days=0)["attempts"] >= 1
+    assert db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first() is None
+    archived = client.get(f"/api/v1/user/quizzes/{quiz_id}/response", headers=user)
+    assert archived.status_code == 200
+    assert archived.json() == live
+    assert archived.json()["user_score"] == 2
+
+
+def test_archive_fallback_only_returns_completed_attempts(client, db, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(1)
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+    attempt = db.query(QuizAttempt).filter(QuizAttempt.quiz_id == quiz_id).one()
+    db.add(ArchivedQuizAttempt(id=attempt.id + 1000000, user_id=attempt.user_id, quiz_id=quiz_id, status=AttemptStatus.in_progress,
+                               start_time=attempt.start_time, score=0, archived_at=datetime.utcnow()))
+    db.commit()
+
+    response = client.get(f"/api/v1/user/quizzes/{quiz_id}/response", headers=user)
+    assert response.status_code == 400
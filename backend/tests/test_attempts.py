@@ -0,0 +1,132 @@
+"""Retakes, the attempt history and the per-user stats built from completed attempts."""
+from app.utils import submission_queue as queue_module
+from app.utils.submission_queue import SubmissionQueue, COMPLETED
+
+
+def _answers(client, quiz_id: int, headers: dict, correct: int) -> dict:
+    """Answer the first `correct` questions right and the rest wrong."""
+    paper = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=headers).json()
+    responses = []
+    for number, question in enumerate(paper["questions"]):
+        option_ids = sorted(option["id"] for option in question["options"])
+        responses.append({
+            "question_id": question["id"],
+            "selected_option_id": option_ids[0] if number < correct else option_ids[-1]
+        })
+    return {"responses": responses}
+
+
+def _take(client, quiz_id: int, headers: dict, correct: int) -> dict:
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=headers).status_code == 200
+    response = client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=headers,
+                           json=_answers(client, quiz_id, headers, correct))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_retakes_are_listed_newest_first(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(2)
+    first = _take(client, quiz_id, user, correct=2)
+    second = _take(client, quiz_id, user, correct=1)
+
+    history = client.get("/api/v1/user/history", headers=user).json()
+    assert [(a["attempt_id"], a["score"]) for a in history["attempts"]] == [
+        (second["attempt_id"], 1), (first["attempt_id"], 2)
+    ]
+
+    page = client.get("/api/v1/user/history?limit=1", headers=user).json()
+    assert [a["attempt_id"] for a in page["attempts"]] == [second["attempt_id"]]
+    rest = client.get(f"/api/v1/user/history?limit=1&before_id={page['next_before_id']}", headers=user).json()
+    assert [a["attempt_id"] for a in rest["attempts"]] == [first["attempt_id"]]
+    assert rest["next_before_id"] is None
+
+
+def test_stats_fold_in_every_completed_attempt(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(2)
+    assert client.get("/api/v1/user/stats", headers=user).json()["attempts"] == 0
+
+    _take(client, quiz_id, user, correct=2)
+    _take(client, quiz_id, user, correct=1)
+    stats = client.get("/api/v1/user/stats", headers=user).json()
+    assert (stats["attempts"], stats["total_score"], stats["total_possible"], stats["best_score"]) == (2, 3, 4, 2)
+    assert stats["best_percentage"] == 100.0
+
+
+def test_second_submit_of_an_attempt_is_rejected(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(2)
+    submission = {"responses": []}
+    _take(client, quiz_id, user, correct=2)
+
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=user, json=submission).status_code == 400
+    assert client.get("/api/v1/user/stats", headers=user).json()["attempts"] == 1
+
+
+def test_queue_worker_losing_to_a_sync_submit_records_nothing(client, login, make_quiz, monkeypatch):
+    user = login()
+    quiz_id = make_quiz(2)
+    attempt_id = client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).json()["id"]
+    submission = _answers(client, quiz_id, user, correct=2)
+    answers = {r["question_id"]: r["selected_option_id"] for r in submission["responses"]}
+
+    # The synchronous submit commits after the worker read the attempt as in progress
+    answer_key_for_attempt = queue_module.answer_key_for_attempt
+    def racing_answer_key(db, quiz, attempt):
+        if not racing_answer_key.raced:
+            racing_answer_key.raced = True
+            assert client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=user, json=submission).status_code == 200
+        return answer_key_for_attempt(db, quiz, attempt)
+    racing_answer_key.raced = False
+    monkeypatch.setattr(queue_module, "answer_key_for_attempt", racing_answer_key)
+
+    worker = SubmissionQueue()
+    record = {"attempt_id": attempt_id, "quiz_id": quiz_id, "answers": list(answers.items()),
+              "submitted_at": "2026-01-01T00:00:00"}
+    assert worker._write([record])
+    assert worker.status(attempt_id)["status"] == COMPLETED
+    assert client.get("/api/v1/user/stats", headers=user).json()["attempts"] == 1
+
+
+def test_losing_concurrent_submit_conflicts(client, login, make_quiz, monkeypatch):
+    from app.routers import user as user_routes
+    user = login()
+    quiz_id = make_quiz(2)
+    client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user)
+    submission = _answers(client, quiz_id, user, correct=2)
+
+    # The other submit completes the attempt while this one is grading
+    grade_submission = user_routes.grade_submission
+    def racing_grade(*args):
+        if not racing_grade.raced:
+            racing_grade.raced = True
+            assert client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=user, json=submission).status_code == 200
+        return grade_submission(*args)
+    racing_grade.raced = False
+    monkeypatch.setattr(user_routes, "grade_submission", racing_grade)
+
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=user, json=submission).status_code == 409
+    assert client.get("/api/v1/user/stats", headers=user).json()["attempts"] == 1
+
+
+def test_losing_concurrent_start_resumes_the_winners_attempt(client, db, login, make_quiz, monkeypatch):
+    from app.routers import user as user_routes
+    from app.models.attempt import QuizAttempt
+    user = login()
+    quiz_id = make_quiz(2)
+
+    # The other start inserts its attempt after this one checked for an open attempt
+    load_pools = user_routes.load_pools
+    def racing_load_pools(*args):
+        if not racing_load_pools.raced:
+            racing_load_pools.raced = True
+            racing_load_pools.winner = client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).json()["id"]
+        return load_pools(*args)
+    racing_load_pools.raced = False
+    monkeypatch.setattr(user_routes, "load_pools", racing_load_pools)
+
+    response = client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user)
+    assert response.status_code == 200
+    assert response.json()["id"] == racing_load_pools.winner
+    assert db.query(QuizAttempt).filter(QuizAttempt.quiz_id == quiz_id).count() == 1
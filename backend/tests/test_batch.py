@@ -0,0 +1,59 @@
+"""/user/batch runs several user-route calls in one request, each reported in its own slot."""
+import asyncio
+from app.config import settings
+from app.routers import user as user_routes
+from app.security.admission import concurrency_limiter
+
+
+def _batch(client, headers: dict, *requests) -> list:
+    response = client.post("/api/v1/user/batch", headers=headers, json={"requests": list(requests)})
+    assert response.status_code == 200, response.text
+    return response.json()["responses"]
+
+
+def test_exam_entry_in_one_round_trip(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(3)
+    my_quizzes, start, questions = _batch(
+        client, user,
+        {"path": "/my-quizzes"},
+        {"method": "POST", "path": f"/api/v1/user/quizzes/{quiz_id}/start"},
+        {"path": f"/quizzes/{quiz_id}/questions"},
+    )
+    assert my_quizzes["status"] == 200 and quiz_id in [quiz["id"] for quiz in my_quizzes["body"]]
+    assert start["status"] == 200 and start["body"]["quiz_id"] == quiz_id
+    assert questions["status"] == 200 and len(questions["body"]["questions"]) == 3
+
+
+def test_failing_call_is_reported_in_its_slot(client, login, make_quiz, monkeypatch):
+    user = login()
+    quiz_id = make_quiz(2)
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(user_routes, "load_pools", broken)
+
+    missing, start, my_quizzes = _batch(
+        client, user,
+        {"path": "/quizzes/999999/questions"},
+        {"method": "POST", "path": f"/quizzes/{quiz_id}/start"},
+        {"path": "/my-quizzes"},
+    )
+    assert missing["status"] == 404
+    assert start["status"] == 500
+    assert my_quizzes["status"] == 200
+
+
+def test_calls_take_their_route_class_slot(client, login, make_quiz, monkeypatch):
+    user = login()
+    quiz_id = make_quiz(2)
+    # Every start slot is taken
+    monkeypatch.setitem(concurrency_limiter._semaphores, "start", asyncio.Semaphore(0))
+    monkeypatch.setattr(settings, "CONCURRENCY_QUEUE_SECONDS", 0.01)
+
+    start, my_quizzes = _batch(
+        client, user,
+        {"method": "POST", "path": f"/quizzes/{quiz_id}/start"},
+        {"path": "/my-quizzes"},
+    )
+    assert start["status"] == 503 and start["headers"]["Retry-After"] == "1"
+    assert my_quizzes["status"] == 200
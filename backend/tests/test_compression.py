@@ -0,0 +1,34 @@
+"""Responses are compressed as the client accepts, and always vary on Accept-Encoding."""
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture
+def paper_url(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(30)
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+    return f"/api/v1/user/quizzes/{quiz_id}/questions", user
+
+
+@pytest.mark.parametrize("thread_min_bytes", [0, 1 << 30])
+def test_large_bodies_are_compressed(client, paper_url, monkeypatch, thread_min_bytes):
+    monkeypatch.setattr(settings, "COMPRESSION_THREAD_MIN_BYTES", thread_min_bytes)
+    url, user = paper_url
+    plain = client.get(url, headers={**user, "Accept-Encoding": "identity"})
+    compressed = client.get(url, headers={**user, "Accept-Encoding": "gzip"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.json() == plain.json()
+
+
+def test_every_text_response_varies_on_accept_encoding(client, paper_url):
+    url, user = paper_url
+    plain = client.get(url, headers={**user, "Accept-Encoding": "identity"})
+    small = client.get("/api/v1/user/stats", headers={**user, "Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert "content-encoding" not in small.headers
+    assert plain.headers["vary"] == small.headers["vary"] == "Accept-Encoding"
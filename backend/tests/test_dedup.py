@@ -0,0 +1,52 @@
+"""Duplicate detection compares new questions against the current version of every question."""
+
+
+def _question(text: str) -> dict:
+    return {"question": text, "options": [
+        {"option": "Yes", "is_correct": True},
+        {"option": "No", "is_correct": False},
+    ]}
+
+
+def _create(client, headers: dict, text: str, allow_duplicate: bool = False):
+    return client.post("/api/v1/admin/questions", headers=headers, json=_question(text),
+                       params={"allow_duplicate": allow_duplicate})
+
+
+def _groups_with(client, headers: dict, question_id: int) -> list:
+    groups = client.get("/api/v1/admin/questions/duplicates", headers=headers).json()
+    return [
+        sorted(member["question_id"] for member in group["questions"])
+        for group in groups if question_id in {member["question_id"] for member in group["questions"]}
+    ]
+
+
+def test_exact_and_near_duplicates_are_rejected(client, login):
+    admin = login(admin=True)
+    text = "Which layer of the marmalade cake holds the gooseberry compote in place?"
+    original = _create(client, admin, text).json()["id"]
+
+    exact = _create(client, admin, text.upper())
+    assert exact.status_code == 409
+    assert exact.json()["detail"]["duplicates"] == [{"question_id": original, "similarity": 1.0}]
+    near = _create(client, admin, text.replace("compote", "compotes"))
+    assert near.status_code == 409
+    assert [d["question_id"] for d in near.json()["detail"]["duplicates"]] == [original]
+
+    kept = _create(client, admin, text.replace("compote", "compotes"), allow_duplicate=True).json()["id"]
+    assert _groups_with(client, admin, original) == [sorted([original, kept])]
+
+
+def test_superseded_versions_are_not_duplicates(client, login):
+    admin = login(admin=True)
+    text = "How many tentacles does the lesser spotted pianosquid use to play scales?"
+    question_id = _create(client, admin, text).json()["id"]
+    twin = _create(client, admin, text.replace("scales", "chords"), allow_duplicate=True).json()["id"]
+    edited = client.put(f"/api/v1/admin/questions/{question_id}", headers=admin,
+                        json=_question("What colour is the ink of a tuba-playing cuttlefish?"))
+    assert edited.status_code == 200
+
+    assert _groups_with(client, admin, twin) == []
+    recreated = _create(client, admin, text)
+    assert recreated.status_code == 409
+    assert [d["question_id"] for d in recreated.json()["detail"]["duplicates"]] == [twin]
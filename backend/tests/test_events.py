@@ -0,0 +1,49 @@
+"""Live attempt counters: the seed query plus the events published around it."""
+import asyncio
+
+from app.routers.admin import _count_attempts
+from app.utils.events import EventBroker, QuizCounters, ATTEMPT_STARTED, ATTEMPT_SUBMITTED
+
+
+def _subscribe(broker: EventBroker, quiz_id: int, seed) -> dict:
+    async def run():
+        subscriber = await broker.subscribe(quiz_id, seed)
+        counters = broker.counters(quiz_id)
+        broker.unsubscribe(quiz_id, subscriber)
+        return counters
+    return asyncio.run(run())
+
+
+def test_events_published_during_the_seed_are_counted_once():
+    broker = EventBroker()
+
+    def seed():
+        # Attempt 2 started and attempt 1 was submitted before the seed read; both publish late
+        broker.publish(7, ATTEMPT_STARTED, attempt_id=2)
+        broker.publish(7, ATTEMPT_SUBMITTED, attempt_id=1)
+        # Attempt 3 commits after the seed read and attempt 2 is submitted after it
+        broker.publish(7, ATTEMPT_STARTED, attempt_id=3)
+        broker.publish(7, ATTEMPT_SUBMITTED, attempt_id=2)
+        return QuizCounters(in_progress=1, completed=1, high_water=2, open_attempts={2: "in_progress"})
+
+    assert _subscribe(broker, 7, seed) == {"in_progress": 1, "completed": 2}
+
+
+def test_scheduled_attempts_count_once_started():
+    counters = QuizCounters(high_water=4, open_attempts={4: "scheduled"})
+    counters.apply({"type": ATTEMPT_STARTED, "attempt_id": 4})
+    counters.apply({"type": ATTEMPT_STARTED, "attempt_id": 4})
+    assert counters.to_dict() == {"in_progress": 1, "completed": 0}
+
+
+def test_seed_reflects_attempts_already_published(client, login, make_quiz):
+    quiz_id = make_quiz(1)
+    user = login()
+    attempt_id = client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).json()["id"]
+    broker = EventBroker()
+
+    def seed():
+        broker.publish(quiz_id, ATTEMPT_STARTED, attempt_id=attempt_id)
+        return _count_attempts(quiz_id)
+
+    assert _subscribe(broker, quiz_id, seed) == {"in_progress": 1, "completed": 0}
@@ -0,0 +1,40 @@
+"""Idempotency-Key: a retried mutation gets the first response back instead of running again."""
+from app.utils.idempotency import idempotency_store
+
+
+def _submit(client, quiz_id: int, headers: dict, key: str = None, responses: list = ()):
+    if key is not None:
+        headers = {**headers, "Idempotency-Key": key}
+    return client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=headers, json={"responses": list(responses)})
+
+
+def test_retried_submit_replays_the_first_response(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(1)
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+
+    first = _submit(client, quiz_id, user, key="submit-1")
+    retry = _submit(client, quiz_id, user, key="submit-1")
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+
+    # Without the key the retry runs again and finds the attempt submitted
+    assert _submit(client, quiz_id, user).status_code == 400
+
+
+def test_key_reuse_with_another_body_is_rejected(client, login, make_quiz):
+    user = login()
+    quiz_id = make_quiz(1)
+    client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user)
+    assert _submit(client, quiz_id, user, key="submit-2").status_code == 200
+
+    changed = _submit(client, quiz_id, user, key="submit-2", responses=[{"question_id": 1, "selected_option_id": None}])
+    assert changed.status_code == 422
+
+
+def test_retry_while_the_first_request_runs_is_a_conflict(client, login, make_quiz, monkeypatch):
+    user = login()
+    quiz_id = make_quiz(1)
+    monkeypatch.setattr(idempotency_store, "reserve", lambda key: False)
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers={**user, "Idempotency-Key": "start-1"}).status_code == 409
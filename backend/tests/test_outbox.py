@@ -0,0 +1,65 @@
+"""Transactional outbox: completions are queued with the submit and relayed after commit."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.models.outbox import OutboxEvent
+from app.utils.outbox import OutboxRelay, add_event, handlers, ATTEMPT_COMPLETED
+
+
+@pytest.fixture
+def outbox(db, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+    monkeypatch.setattr(settings, "OUTBOX_CONSUMERS", "inprocess")
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_SECONDS", 0)
+    db.query(OutboxEvent).delete()
+    db.commit()
+    received = []
+    monkeypatch.setitem(handlers._handlers, ATTEMPT_COMPLETED, [received.append])
+    return received
+
+
+def test_submit_is_relayed_once_committed(client, db, login, make_quiz, outbox):
+    user = login()
+    quiz_id = make_quiz(1)
+    attempt = client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).json()
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=user, json={"responses": []}).status_code == 200
+
+    relay = OutboxRelay()
+    assert relay.relay_once() == 1
+    assert [(event["payload"]["attempt_id"], event["payload"]["score"]) for event in outbox] == [(attempt["id"], 0)]
+    assert relay.relay_once() == 0
+    assert db.query(OutboxEvent).filter(OutboxEvent.delivered_at.is_(None)).count() == 0
+
+
+def test_lone_poison_event_is_parked_once_past_the_age_cap(db, outbox, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+
+    def poison(event):
+        raise ValueError("cannot handle")
+    monkeypatch.setitem(handlers._handlers, ATTEMPT_COMPLETED, [poison])
+    add_event(db, ATTEMPT_COMPLETED, attempt_id=1)
+    db.commit()
+    relay = OutboxRelay()
+
+    # A fresh event failing on its own looks like an outage: it is not counted against
+    relay.relay_once()
+    db.expire_all()
+    assert db.query(OutboxEvent).one().attempts == 0
+
+    db.query(OutboxEvent).update({OutboxEvent.created_at: datetime.utcnow() - timedelta(minutes=settings.OUTBOX_MAX_AGE_MINUTES + 1)})
+    db.commit()
+    relay.relay_once()
+    relay.relay_once()
+    db.expire_all()
+    event = db.query(OutboxEvent).one()
+    assert event.attempts == 2 and "cannot handle" in event.last_error
+    assert relay.relay_once() == 0  # parked: no longer picked up
+
+
+def test_status_reports_disabled_outbox(client, login, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_ENABLED", False)
+    response = client.get("/api/v1/admin/outbox", headers=login(admin=True))
+    assert response.status_code == 200
+    assert response.json() == {"enabled": False}
@@ -0,0 +1,24 @@
+"""Paper and answer-key caches are keyed by the quiz's integer version."""
+from app.models.quiz import Quiz
+
+
+def test_quick_remaps_get_distinct_versions(client, db, login, make_questions, make_quiz):
+    admin = login(admin=True)
+    user = login()
+    quiz_id = make_quiz(2)
+    versions = []
+
+    # Two remaps within the same second; the second must not be served from the first's cache entry
+    for question_ids in (make_questions(2), make_questions(2)):
+        mapping = {"questions": [
+            {"question_id": question_id, "question_number": number, "marks": 1}
+            for number, question_id in enumerate(question_ids, start=1)
+        ]}
+        assert client.post(f"/api/v1/admin/quizzes/{quiz_id}/questions", headers=admin, json=mapping).status_code == 200
+        db.expire_all()
+        versions.append(db.query(Quiz.version).filter(Quiz.id == quiz_id).scalar())
+
+    assert versions[1] == versions[0] + 1
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+    paper = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=user).json()
+    assert [question["id"] for question in paper["questions"]] == question_ids
@@ -0,0 +1,35 @@
+"""The pre-auth limiter sheds floods per client IP and username before any auth work."""
+from app.config import settings
+from app.security.pre_auth_limiter import _client_ip
+
+
+def _scope(forwarded_for: str) -> dict:
+    return {"client": ("10.0.0.9", 1234), "headers": [(b"x-forwarded-for", forwarded_for.encode())]}
+
+
+def test_client_ip_ignores_client_supplied_forwarded_entries(monkeypatch):
+    monkeypatch.setattr(settings, "TRUST_FORWARDED_FOR", True)
+    monkeypatch.setattr(settings, "FORWARDED_FOR_HOPS", 1)
+    # The client sent "6.6.6.6"; our proxy appended the address it saw
+    assert _client_ip(_scope("6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+
+    monkeypatch.setattr(settings, "FORWARDED_FOR_HOPS", 2)
+    assert _client_ip(_scope("6.6.6.6, 203.0.113.7, 10.0.0.2")) == "203.0.113.7"
+    assert _client_ip(_scope("203.0.113.7")) == "203.0.113.7"
+
+    monkeypatch.setattr(settings, "TRUST_FORWARDED_FOR", False)
+    assert _client_ip(_scope("6.6.6.6")) == "10.0.0.9"
+
+
+def test_login_flood_for_one_username_gets_a_cors_enabled_429(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_USERNAME_RATE_LIMIT_PER_MINUTE", 2)
+    headers = {"Origin": "http://exam.example.com"}
+    attempt = {"username": "flooded-user", "password": "guess"}
+
+    statuses = [client.post("/api/v1/login", data=attempt, headers=headers).status_code for _ in range(3)]
+    assert statuses[:2] == [401, 401]
+    assert statuses[2] == 429
+
+    response = client.post("/api/v1/login", data=attempt, headers=headers)
+    assert response.headers["retry-after"] == "60"
+    assert response.headers["access-control-allow-origin"]
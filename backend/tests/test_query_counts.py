@@ -0,0 +1,78 @@
+"""SQL statements per request must not grow with the number of questions in a quiz."""
+import pytest
+from app.database import SessionLocal
+from app.models.user import User
+from app.utils.query_counter import count_queries
+
+SIZES = (10, 200)
+
+# Upper bound on statements per request, whatever the quiz size (authentication and rate limiting included)
+BOUNDS = {
+    "admin map questions": 18,
+    "admin get quiz": 9,
+    "user my-quizzes": 10,
+    "user start": 13,
+    "user questions": 9,
+    "user submit": 22,
+    "user response": 11,
+    "admin participant responses": 11,
+}
+
+_counts = {}
+
+
+def _run(client, login, make_questions, make_quiz, num_questions: int) -> dict:
+    admin = login(admin=True)
+    user = login()
+    quiz_id = make_quiz(num_questions, mapped=False)
+    question_ids = make_questions(num_questions)
+    counts = {}
+
+    def measure(name, method, url, headers, **kwargs):
+        with count_queries() as queries:
+            response = client.request(method, url, headers=headers, **kwargs)
+        assert response.status_code == 200, response.text
+        counts[name] = queries.count
+        return response
+
+    mapping = {"questions": [
+        {"question_id": question_id, "question_number": number, "marks": 1}
+        for number, question_id in enumerate(question_ids, start=1)
+    ]}
+    measure("admin map questions", "POST", f"/api/v1/admin/quizzes/{quiz_id}/questions", admin, json=mapping)
+    measure("admin get quiz", "GET", f"/api/v1/admin/quizzes/{quiz_id}", admin)
+    measure("user my-quizzes", "GET", "/api/v1/user/my-quizzes", user)
+    measure("user start", "POST", f"/api/v1/user/quizzes/{quiz_id}/start", user)
+    paper = measure("user questions", "GET", f"/api/v1/user/quizzes/{quiz_id}/questions", user).json()
+    submission = {"responses": [
+        {"question_id": question["id"], "selected_option_id": question["options"][0]["id"]}
+        for question in paper["questions"]
+    ]}
+    measure("user submit", "POST", f"/api/v1/user/quizzes/{quiz_id}/submit", user, json=submission)
+    measure("user response", "GET", f"/api/v1/user/quizzes/{quiz_id}/response", user)
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).order_by(User.id.desc()).first()[0]
+    finally:
+        db.close()
+    measure("admin participant responses", "GET", f"/api/v1/admin/quizzes/{quiz_id}/responses/{user_id}", admin)
+    return counts
+
+
+@pytest.fixture
+def counts(client, login, make_questions, make_quiz):
+    # Both flows are run once and shared by every endpoint's test
+    if not _counts:
+        for num_questions in SIZES:
+            _counts[num_questions] = _run(client, login, make_questions, make_quiz, num_questions)
+    return _counts
+
+
+@pytest.mark.parametrize("endpoint", sorted(BOUNDS))
+def test_statement_count_is_flat(counts, endpoint):
+    assert counts[SIZES[0]][endpoint] == counts[SIZES[-1]][endpoint]
+    for num_questions in SIZES:
+        assert counts[num_questions][endpoint] <= BOUNDS[endpoint], (
+            f"{endpoint}: {counts[num_questions][endpoint]} statements with {num_questions} questions"
+        )
@@ -0,0 +1,65 @@
+"""The hot lookups must be index searches, never full scans.
+
+Each query mirrors one issued on the exam path or by the admin views and
+is run through SQLite's EXPLAIN QUERY PLAN. "SCAN <table>" (a full table
+or full index scan) fails the test; "SEARCH <table> USING ... INDEX" is
+what the covering indexes added by the migrations provide.
+"""
+import pytest
+from sqlalchemy import func
+from app.models.user import User, UserToken
+from app.models.quiz import QuizQuestion
+from app.models.question import QuestionOption, QuestionTag
+from app.models.attempt import QuizAttempt, QuizResponse, AttemptStatus
+from app.models.archive import ArchivedQuizAttempt, ArchivedQuizResponse
+
+HOT_QUERIES = {
+    "active token": lambda db: db.query(UserToken).filter(
+        UserToken.token == "token", UserToken.is_active == True
+    ),
+    "user by id": lambda db: db.query(User).filter(User.id == 1),
+    "active tokens of user": lambda db: db.query(UserToken).filter(
+        UserToken.user_id == 1, UserToken.is_active == True
+    ),
+    "open attempt": lambda db: db.query(QuizAttempt).filter(
+        QuizAttempt.user_id == 1, QuizAttempt.quiz_id == 1, QuizAttempt.status == AttemptStatus.in_progress
+    ),
+    "attempts by quiz and status": lambda db: db.query(QuizAttempt.status, func.count(QuizAttempt.id)).filter(
+        QuizAttempt.quiz_id == 1
+    ).group_by(QuizAttempt.status),
+    "attempt history": lambda db: db.query(QuizAttempt).filter(
+        QuizAttempt.user_id == 1, QuizAttempt.id < 100
+    ).order_by(QuizAttempt.id.desc()),
+    "selections of attempt": lambda db: db.query(QuizResponse.question_id, QuizResponse.selected_option_id).filter(
+        QuizResponse.attempt_id == 1
+    ),
+    "marks of quiz": lambda db: db.query(QuizQuestion.question_id, QuizQuestion.marks).filter(
+        QuizQuestion.quiz_id == 1
+    ),
+    "correct options of quiz": lambda db: db.query(QuestionOption.id, QuestionOption.question_id).join(
+        QuizQuestion, QuizQuestion.question_id == QuestionOption.question_id
+    ).filter(QuizQuestion.quiz_id == 1, QuestionOption.is_correct == True),
+    "tag assignments after high water": lambda db: db.query(QuestionTag.id, QuestionTag.tag_id).filter(
+        QuestionTag.id > 100
+    ).order_by(QuestionTag.id),
+    "archived attempt": lambda db: db.query(ArchivedQuizAttempt).filter(
+        ArchivedQuizAttempt.user_id == 1, ArchivedQuizAttempt.quiz_id == 1
+    ),
+    "archived responses of attempt": lambda db: db.query(ArchivedQuizResponse).filter(
+        ArchivedQuizResponse.attempt_id == 1
+    ),
+}
+
+
+def query_plan(db, query) -> list:
+    statement = query.statement.compile(dialect=db.get_bind().dialect)
+    parameters = tuple(statement.params[name] for name in statement.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(db, name):
+    plan = query_plan(db, HOT_QUERIES[name](db))
+    scans = [step for step in plan if step.startswith("SCAN ")]
+    assert not scans, f"{name} scans instead of searching an index: {plan}"
@@ -0,0 +1,58 @@
+"""Editing a question inserts a new version; quizzes with attempts stay on the version they were given."""
+from app.models.question import Question
+from app.models.quiz import QuizQuestion
+
+EDIT = {"question": "Which index serves a range scan?", "options": [
+    {"option": "B-tree", "is_correct": True},
+    {"option": "Hash", "is_correct": False},
+]}
+
+
+def _quiz_with(db, make_quiz, question_id: int) -> int:
+    quiz_id = make_quiz(1, mapped=False)
+    db.add(QuizQuestion(quiz_id=quiz_id, question_id=question_id, question_number=1, marks=1))
+    db.commit()
+    return quiz_id
+
+
+def test_edit_repins_only_unattempted_quizzes(client, db, login, make_questions, make_quiz):
+    admin = login(admin=True)
+    (question_id,) = make_questions(1)
+    attempted = _quiz_with(db, make_quiz, question_id)
+    unattempted = _quiz_with(db, make_quiz, question_id)
+    assert client.post(f"/api/v1/user/quizzes/{attempted}/start", headers=login()).status_code == 200
+
+    response = client.put(f"/api/v1/admin/questions/{question_id}", headers=admin, json=EDIT)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["question"]["version"] == 2
+    assert result["pinned_quizzes"] == [attempted]
+    assert result["repinned_quizzes"] == [unattempted]
+
+    new_id = result["question"]["id"]
+    mapping = dict(db.query(QuizQuestion.quiz_id, QuizQuestion.question_id).filter(
+        QuizQuestion.quiz_id.in_([attempted, unattempted])
+    ).all())
+    assert mapping == {attempted: question_id, unattempted: new_id}
+    assert db.query(Question.superseded_by).filter(Question.id == question_id).scalar() == new_id
+
+
+def test_editing_a_superseded_version_conflicts(client, login, make_questions):
+    admin = login(admin=True)
+    (question_id,) = make_questions(1)
+    assert client.put(f"/api/v1/admin/questions/{question_id}", headers=admin, json=EDIT).status_code == 200
+
+    response = client.put(f"/api/v1/admin/questions/{question_id}", headers=admin, json=EDIT)
+    assert response.status_code == 409
+
+
+def test_losing_concurrent_edit_conflicts(client, db, login, make_questions):
+    admin = login(admin=True)
+    (question_id,) = make_questions(1)
+    # The winner's version 2 is in, but it has not superseded the row yet
+    db.add(Question(question="Concurrent edit", lineage_id=question_id, version=2))
+    db.commit()
+
+    response = client.put(f"/api/v1/admin/questions/{question_id}", headers=admin, json=EDIT)
+    assert response.status_code == 409
+    assert db.query(Question).filter(Question.lineage_id == question_id).count() == 1
@@ -0,0 +1,38 @@
+"""A quiz's paper (its question mapping or pool definitions) is frozen once it has attempts."""
+from app.models.user import User
+from app.utils.provisioning import schedule_attempts
+
+
+def test_mapping_does_not_replace_pools_under_attempts(client, login, make_questions, make_quiz):
+    admin = login(admin=True)
+    user = login()
+    quiz_id = make_quiz(2, mapped=False)
+    for question_id in make_questions(3):
+        client.post(f"/api/v1/admin/questions/{question_id}/tags", headers=admin, json={"tags": ["pooled"]})
+    pools = {"pools": [{"tag": "pooled", "num_questions": 2, "marks": 1}]}
+    assert client.post(f"/api/v1/admin/quizzes/{quiz_id}/pools", headers=admin, json=pools).status_code == 200
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+    paper = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=user).json()
+
+    mapping = {"questions": [
+        {"question_id": question_id, "question_number": number, "marks": 1}
+        for number, question_id in enumerate(make_questions(2), start=1)
+    ]}
+    response = client.post(f"/api/v1/admin/quizzes/{quiz_id}/questions", headers=admin, json=mapping)
+    assert response.status_code == 400
+    assert client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=user).json() == paper
+
+
+def test_mapping_is_frozen_under_scheduled_attempts(client, db, login, make_questions, make_quiz):
+    admin = login(admin=True)
+    user = login()
+    quiz_id = make_quiz(2)
+    user_id = db.query(User.id).order_by(User.id.desc()).limit(1).scalar()
+    assert schedule_attempts(None, quiz_id, [user_id])["scheduled"] == 1
+
+    mapping = {"questions": [
+        {"question_id": question_id, "question_number": number, "marks": 1}
+        for number, question_id in enumerate(make_questions(2), start=1)
+    ]}
+    assert client.post(f"/api/v1/admin/quizzes/{quiz_id}/questions", headers=admin, json=mapping).status_code == 400
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
@@ -0,0 +1,58 @@
+"""Regrading completed attempts after an answer-key correction."""
+import time
+from contextlib import contextmanager
+
+from app.database import get_read_db
+from app.main import app
+
+
+def _wait(client, headers: dict, job: dict) -> dict:
+    for _ in range(100):
+        job = client.get(f"/api/v1/admin/jobs/{job['id']}", headers=headers).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job['id']} did not finish")
+
+
+@contextmanager
+def replica_unavailable():
+    """Fail any route that reads from the replica, which may not have caught up yet."""
+    def unavailable():
+        raise AssertionError("served from the read replica")
+        yield
+    app.dependency_overrides[get_read_db] = unavailable
+    try:
+        yield
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+
+
+def test_quiz_regrade_applies_corrected_answer_key(client, login, make_quiz):
+    admin = login(admin=True)
+    user = login()
+    quiz_id = make_quiz(1)
+    assert client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).status_code == 200
+    (question,) = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=user).json()["questions"]
+    second = sorted(option["id"] for option in question["options"])[1]
+    submitted = client.post(f"/api/v1/user/quizzes/{quiz_id}/submit", headers=user,
+                            json={"responses": [{"question_id": question["id"], "selected_option_id": second}]})
+    assert submitted.json()["score_obtained"] == 0
+
+    # Correct the key without regrading, then regrade the quiz on its own; the quiz check uses the primary
+    corrected = client.put(f"/api/v1/admin/questions/{question['id']}/correct-options", headers=admin,
+                           json={"correct_option_ids": [second], "regrade": False})
+    assert corrected.status_code == 200
+    with replica_unavailable():
+        response = client.post(f"/api/v1/admin/quizzes/{quiz_id}/regrade", headers=admin)
+    assert response.status_code == 202
+    assert _wait(client, admin, response.json())["status"] == "completed"
+
+    history = client.get("/api/v1/user/history", headers=user).json()["attempts"]
+    assert [attempt["score"] for attempt in history] == [1]
+
+
+def test_regrade_of_unknown_question_is_404(client, login):
+    admin = login(admin=True)
+    with replica_unavailable():
+        assert client.post("/api/v1/admin/questions/999999/regrade", headers=admin).status_code == 404
@@ -0,0 +1,51 @@
+"""Question bank search ranks current versions only."""
+from app.models.question import Question, QuestionOption
+from app.utils.search import question_index
+
+
+def _search(client, headers: dict, q: str) -> list:
+    response = client.get("/api/v1/admin/questions/search", headers=headers, params={"q": q})
+    assert response.status_code == 200, response.text
+    return [hit["id"] for hit in response.json()["results"]]
+
+
+def _question(text: str) -> dict:
+    return {"question": text, "options": [
+        {"option": "Yes", "is_correct": True},
+        {"option": "No", "is_correct": False},
+    ]}
+
+
+def test_results_rank_by_relevance(client, login):
+    admin = login(admin=True)
+    both = client.post("/api/v1/admin/questions", headers=admin, json=_question("Does a zebracorn graze zebracorn fields?")).json()["id"]
+    one = client.post("/api/v1/admin/questions", headers=admin, json=_question("Is a zebracorn striped like a horse?")).json()["id"]
+    assert _search(client, admin, "zebracorn fields") == [both, one]
+
+
+def test_edited_question_is_found_by_its_new_text_only(client, login):
+    admin = login(admin=True)
+    _search(client, admin, "build")  # make sure the index exists, so the edit updates it in place
+    question_id = client.post("/api/v1/admin/questions", headers=admin, json=_question("Which quokkafish swims fastest?")).json()["id"]
+    edited = client.put(f"/api/v1/admin/questions/{question_id}", headers=admin, json=_question("Which quokkabird flies fastest?"))
+    assert edited.status_code == 200
+
+    assert _search(client, admin, "quokkafish") == []
+    assert _search(client, admin, "quokkabird") == [edited.json()["question"]["id"]]
+
+
+def test_catch_up_drops_versions_superseded_by_other_workers(client, db, login):
+    admin = login(admin=True)
+    question_id = client.post("/api/v1/admin/questions", headers=admin, json=_question("Where do wombatrons nest?")).json()["id"]
+    assert _search(client, admin, "wombatrons") == [question_id]
+
+    # Another worker's edit: this worker's index only learns about it from the database
+    successor = Question(question="Where do wombatrons sleep?", lineage_id=question_id, version=2,
+                         options=[QuestionOption(option="Burrow", is_correct=True)])
+    db.add(successor)
+    db.flush()
+    db.query(Question).filter(Question.id == question_id).update({Question.superseded_by: successor.id})
+    db.commit()
+
+    assert _search(client, admin, "wombatrons") == [successor.id]
+    assert question_id not in question_index._lengths
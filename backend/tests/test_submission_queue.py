@@ -0,0 +1,53 @@
+"""The submission journal: accepted submissions survive a crash and are written on the next start."""
+import time
+
+from app.config import settings
+from app.models.attempt import QuizAttempt, AttemptStatus
+from app.utils.serialization import dumps
+from app.utils.submission_queue import SubmissionJournal, SubmissionQueue, COMPLETED, QUEUED
+
+
+def _wait_completed(worker: SubmissionQueue, attempt_id: int) -> dict:
+    for _ in range(100):
+        status = worker.status(attempt_id)
+        if status and status["status"] != QUEUED:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"attempt {attempt_id} was not written")
+
+
+def test_pending_records_skip_done_and_torn_lines(tmp_path):
+    data = b"\n".join([
+        dumps({"attempt_id": 1, "quiz_id": 1, "answers": []}),
+        dumps({"attempt_id": 2, "quiz_id": 1, "answers": []}),
+        dumps({"done": [1]}),
+        b'{"attempt_id": 3, "qui',
+    ])
+    assert [record["attempt_id"] for record in SubmissionJournal._pending_records(data)] == [2]
+
+
+def test_orphaned_journal_is_replayed_on_start(client, db, login, make_quiz, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SUBMISSION_JOURNAL_DIR", str(tmp_path))
+    user = login()
+    quiz_id = make_quiz(2)
+    attempt_id = client.post(f"/api/v1/user/quizzes/{quiz_id}/start", headers=user).json()["id"]
+    paper = client.get(f"/api/v1/user/quizzes/{quiz_id}/questions", headers=user).json()
+    answers = [[question["id"], min(option["id"] for option in question["options"])] for question in paper["questions"]]
+
+    # Left behind by a worker that accepted the submission and died before writing it
+    orphan = tmp_path / "submissions-999999.jsonl"
+    orphan.write_bytes(dumps({"attempt_id": attempt_id, "quiz_id": quiz_id, "answers": answers,
+                              "submitted_at": "2026-01-01T00:00:00"}) + b"\n")
+
+    worker = SubmissionQueue()
+    worker.start()
+    try:
+        assert _wait_completed(worker, attempt_id)["status"] == COMPLETED
+    finally:
+        worker.stop()
+
+    assert not orphan.exists()
+    attempt = db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).one()
+    assert (attempt.status, attempt.score) == (AttemptStatus.completed, 2)
+    # Written and marked done: nothing left for the next start to replay
+    assert list(tmp_path.glob("submissions-*.jsonl")) == []
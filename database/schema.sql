@@ -1,3 +1,8 @@
+-- Reference schema for MySQL. The schema is managed by the Alembic migrations in
+-- backend/migrations (`alembic upgrade head`); keep this file in step with them.
+-- A database created from this file matches the latest revision: `alembic stamp head`.
+-- The embedded SQLite backend (DB_BACKEND=sqlite) is created by the migrations only.
+
 -- Users Table (for both regular users and admins)
 CREATE TABLE users (
     id INT UNSIGNED NOT NULL AUTO_INCREMENT,
@@ -14,19 +19,46 @@ CREATE TABLE users (
 CREATE TABLE questions (
     id INT UNSIGNED NOT NULL AUTO_INCREMENT,
     question TEXT NOT NULL,
-    PRIMARY KEY (id)
+    text_hash VARCHAR(64), -- sha256 of the normalized question text
+    minhash BLOB, -- MinHash signature for near-duplicate detection
+    lineage_id INT UNSIGNED NULL, -- id of the first version; NULL on the first version itself
+    version INT UNSIGNED NOT NULL DEFAULT 1,
+    superseded_by INT UNSIGNED NULL, -- next version; NULL while current (versions: migration 0012)
+    PRIMARY KEY (id),
+    KEY ix_questions_text_hash (text_hash),
+    UNIQUE KEY unique_question_lineage_version (lineage_id, version),
+    FOREIGN KEY (superseded_by) REFERENCES questions(id)
 );
 
 -- Question Options Table (already provided in requirements)
 CREATE TABLE question_options (
     id INT UNSIGNED NOT NULL AUTO_INCREMENT,
     question_id INT UNSIGNED NOT NULL,
-    option TEXT NOT NULL,
+    `option` TEXT NOT NULL,
     is_correct TINYINT UNSIGNED DEFAULT '0',
     PRIMARY KEY (id),
     FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
 );
 
+-- Tags for grouping questions into pools
+CREATE TABLE tags (
+    id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    PRIMARY KEY (id)
+);
+
+-- Question Tags (append-only; pooled attempts draw from assignments up to a high-water id)
+CREATE TABLE question_tags (
+    id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+    question_id INT UNSIGNED NOT NULL,
+    tag_id INT UNSIGNED NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_question_tag (question_id, tag_id),
+    KEY ix_question_tags_tag (tag_id)
+);
+
 -- Quizzes Table
 CREATE TABLE quizzes (
     id INT UNSIGNED NOT NULL AUTO_INCREMENT,
@@ -36,10 +68,13 @@ CREATE TABLE quizzes (
     total_score INT UNSIGNED NOT NULL,
     duration_minutes INT UNSIGNED NOT NULL,
     created_by INT UNSIGNED NOT NULL,
+    starts_at DATETIME NULL, -- scheduled start; workers warm caches ahead of it
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT UNSIGNED NOT NULL DEFAULT 1, -- paper/answer-key cache version, incremented on change (migration 0013)
     PRIMARY KEY (id),
-    FOREIGN KEY (created_by) REFERENCES users(id)
+    FOREIGN KEY (created_by) REFERENCES users(id),
+    KEY ix_quizzes_starts_at (starts_at)
 );
 
 -- Quiz Questions Mapping
@@ -56,19 +91,36 @@ CREATE TABLE quiz_questions (
     UNIQUE KEY unique_quiz_question_number (quiz_id, question_number)
 );
 
+-- Quiz Question Pools (pooled quizzes draw num_questions tagged questions per attempt)
+CREATE TABLE quiz_pools (
+    id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+    quiz_id INT UNSIGNED NOT NULL,
+    tag_id INT UNSIGNED NOT NULL,
+    num_questions INT UNSIGNED NOT NULL,
+    marks INT UNSIGNED NOT NULL, -- per question drawn
+    PRIMARY KEY (id),
+    FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id) REFERENCES tags(id),
+    KEY ix_quiz_pools_quiz (quiz_id)
+);
+
 -- User Quiz Attempts
 CREATE TABLE quiz_attempts (
     id INT UNSIGNED NOT NULL AUTO_INCREMENT,
     user_id INT UNSIGNED NOT NULL,
     quiz_id INT UNSIGNED NOT NULL,
-    status ENUM('in_progress', 'completed') DEFAULT 'in_progress',
+    status ENUM('in_progress', 'completed', 'scheduled') DEFAULT 'in_progress', -- scheduled: pre-provisioned, not started
     start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     end_time TIMESTAMP NULL DEFAULT NULL,
     score INT UNSIGNED DEFAULT 0,
+    answer_sheet BLOB NULL, -- packed (question_id, option_id) pairs when ANSWER_SHEET_MODE=packed
+    paper_seed INT NULL, -- pooled quizzes: per-attempt draw seed
+    paper_high_water INT UNSIGNED NULL, -- pooled quizzes: last question_tags id visible to the draw
+    open_status VARCHAR(16) AS (CASE WHEN status = 'completed' THEN NULL ELSE status END) VIRTUAL, -- NULL once completed
     PRIMARY KEY (id),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (quiz_id) REFERENCES quizzes(id) ON DELETE CASCADE,
-    UNIQUE KEY unique_user_quiz_attempt (user_id, quiz_id, status) -- Ensures only one in-progress attempt per quiz per user
+    UNIQUE KEY unique_user_quiz_open_attempt (user_id, quiz_id, open_status) -- One in-progress (and one scheduled) attempt per quiz per user; any number of completed ones
 );
 
 -- User Quiz Responses
@@ -110,9 +162,80 @@ CREATE TABLE user_tokens (
     UNIQUE KEY unique_token (token)
 );
 
+-- Per-user performance stats, updated as attempts complete (migration 0010)
+CREATE TABLE user_stats (
+    user_id INT UNSIGNED NOT NULL,
+    attempts INT UNSIGNED NOT NULL DEFAULT 0,
+    total_score INT UNSIGNED NOT NULL DEFAULT 0,
+    total_possible INT UNSIGNED NOT NULL DEFAULT 0,
+    best_score INT UNSIGNED NOT NULL DEFAULT 0,
+    best_percentage FLOAT NOT NULL DEFAULT 0,
+    total_time_seconds INT UNSIGNED NOT NULL DEFAULT 0,
+    last_attempt_at TIMESTAMP NULL DEFAULT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Transactional outbox: events written with the state change, relayed after commit (migration 0011)
+CREATE TABLE outbox_events (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    event_type VARCHAR(64) NOT NULL,
+    payload TEXT NOT NULL, -- JSON
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    delivered_at TIMESTAMP NULL DEFAULT NULL,
+    attempts INT UNSIGNED NOT NULL DEFAULT 0, -- failed deliveries; parked at OUTBOX_MAX_ATTEMPTS
+    last_error VARCHAR(512) NULL,
+    PRIMARY KEY (id),
+    KEY ix_outbox_events_pending (delivered_at, attempts, id)
+);
+
+-- Archive of completed attempts moved out of the hot tables (migration 0004)
+CREATE TABLE quiz_attempts_archive (
+    id INT UNSIGNED NOT NULL,
+    user_id INT UNSIGNED NOT NULL,
+    quiz_id INT UNSIGNED NOT NULL,
+    status ENUM('in_progress', 'completed') DEFAULT 'completed',
+    start_time TIMESTAMP NULL DEFAULT NULL,
+    end_time TIMESTAMP NULL DEFAULT NULL,
+    score INT UNSIGNED DEFAULT 0,
+    answer_sheet BLOB NULL,
+    paper_seed INT NULL,
+    paper_high_water INT UNSIGNED NULL,
+    archived_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (id),
+    KEY ix_quiz_attempts_archive_user_quiz (user_id, quiz_id),
+    KEY ix_quiz_attempts_archive_quiz (quiz_id)
+);
+
+CREATE TABLE quiz_responses_archive (
+    id INT UNSIGNED NOT NULL,
+    attempt_id INT UNSIGNED NOT NULL,
+    question_id INT UNSIGNED NOT NULL,
+    selected_option_id INT UNSIGNED,
+    is_correct BOOLEAN DEFAULT FALSE,
+    marks_obtained INT UNSIGNED DEFAULT 0,
+    PRIMARY KEY (id),
+    KEY ix_quiz_responses_archive_attempt (attempt_id)
+);
+
 -- Indexes for better query performance
 CREATE INDEX idx_quiz_attempts_user_id ON quiz_attempts(user_id);
 CREATE INDEX idx_quiz_attempts_quiz_id ON quiz_attempts(quiz_id);
 CREATE INDEX idx_quiz_responses_attempt_id ON quiz_responses(attempt_id);
 CREATE INDEX idx_user_tokens_user_id ON user_tokens(user_id);
-CREATE INDEX idx_rate_limits_user_id ON rate_limits(user_id);
\ No newline at end of file
+CREATE INDEX idx_rate_limits_user_id ON rate_limits(user_id);
+
+-- Covering indexes for hot-path queries (migration 0002)
+CREATE INDEX ix_quiz_attempts_quiz_status ON quiz_attempts(quiz_id, status);
+CREATE INDEX ix_quiz_responses_attempt_selection ON quiz_responses(attempt_id, question_id, selected_option_id);
+CREATE INDEX ix_question_options_question_correct ON question_options(question_id, is_correct);
+CREATE INDEX ix_quiz_questions_quiz_question_marks ON quiz_questions(quiz_id, question_id, marks);
+CREATE INDEX ix_user_tokens_user_active ON user_tokens(user_id, is_active);
+
+-- Attempt history by user, newest first (migration 0010)
+CREATE INDEX ix_quiz_attempts_user_history ON quiz_attempts(user_id, id);
+
+-- FULLTEXT indexes for question search (migration 0005)
+CREATE FULLTEXT INDEX ix_questions_question_fulltext ON questions(question);
+CREATE FULLTEXT INDEX ix_question_options_option_fulltext ON question_options(`option`);
@@ -44,13 +44,49 @@ export const authService = {
   logout: () => api.post('/logout'),
 };
 
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Start a quiz, going through the admission queue when the server asks for a ticket
+// (428: get a ticket and wait until its admit time; 429: not admitted yet, retry after Retry-After)
+const startQuiz = async (quizId) => {
+  let ticket = null;
+  for (;;) {
+    try {
+      return await api.post(`/user/quizzes/${quizId}/start`, null, {
+        headers: ticket ? { 'X-Admission-Ticket': ticket } : {},
+      });
+    } catch (error) {
+      const status = error.response && error.response.status;
+      if (status === 428) {
+        const { data } = await api.post(`/user/quizzes/${quizId}/admission`);
+        ticket = data.ticket;
+        await sleep(data.estimated_wait_seconds * 1000);
+      } else if (status === 429 && ticket) {
+        await sleep(Number(error.response.headers['retry-after'] || 1) * 1000);
+      } else {
+        throw error;
+      }
+    }
+  }
+};
+
+// Run several /user calls in one round trip; resolves to [{ status, body, headers? }] in request order.
+// Each request is { method = 'GET', path, body }, with path relative to /user (query string allowed).
+const batch = async (requests) => {
+  const { data } = await api.post('/user/batch', { requests });
+  return data.responses;
+};
+
 // User services
 export const userService = {
   getQuizzes: () => api.get('/user/my-quizzes'),
-  startQuiz: (quizId) => api.post(`/user/quizzes/${quizId}/start`),
+  startQuiz,
   getQuizQuestions: (quizId) => api.get(`/user/quizzes/${quizId}/questions`),
   submitQuiz: (quizId, responses) => api.post(`/user/quizzes/${quizId}/submit`, responses),
-  getQuizResults: (quizId) => api.get(`/user/quizzes/${quizId}/response`),
+  getQuizResults: (quizId, attemptId) => api.get(`/user/quizzes/${quizId}/response`, { params: attemptId ? { attempt_id: attemptId } : {} }),
+  getHistory: (params = {}) => api.get('/user/history', { params }),
+  getStats: () => api.get('/user/stats'),
+  batch,
 };
 
 // Admin services
@@ -67,6 +103,7 @@ export const adminService = {
   getAllQuestions: () => api.get('/admin/questions'),
   createQuestion: (questionData) => api.post('/admin/questions', questionData),
   updateQuestion: (questionId, questionData) => api.put(`/admin/questions/${questionId}`, questionData),
+  getQuestionVersions: (questionId) => api.get(`/admin/questions/${questionId}/versions`),
   deleteQuestion: (questionId) => api.delete(`/admin/questions/${questionId}`),
   
   // Results and reports
@@ -41,15 +41,17 @@ const useQuestionStore = create((set, get) => ({
   updateQuestion: async (questionId, questionData) => {
     set({ isLoading: true, error: null });
     try {
+      // Edits create a new version (with a new id) that replaces the edited one in the list
       const response = await adminService.updateQuestion(questionId, questionData);
+      const { question: newVersion } = response.data;
       set({
         questions: get().questions.map(question => 
-          question.id === questionId ? response.data : question
+          question.id === questionId ? newVersion : question
         ),
-        currentQuestion: response.data,
+        currentQuestion: newVersion,
         isLoading: false,
       });
-      return response.data;
+      return newVersion;
     } catch (error) {
       const errorMsg = error.response?.data?.detail || 'Failed to update question';
       set({ isLoading: false, error: errorMsg });
@@ -64,6 +64,47 @@ const useQuizStore = create((set, get) => ({
     }
   },
   
+  // Start (or resume) a quiz and load its paper in one batched round trip
+  enterQuiz: async (quizId) => {
+    set({ isLoading: true, error: null });
+    try {
+      let [started, paper] = await userService.batch([
+        { method: 'POST', path: `/quizzes/${quizId}/start` },
+        { path: `/quizzes/${quizId}/questions` },
+      ]);
+      if (started.status === 428 || started.status === 429) {
+        // Admission control: queue for a ticket as startQuiz does, then load the paper
+        await userService.startQuiz(quizId);
+        [paper] = await userService.batch([{ path: `/quizzes/${quizId}/questions` }]);
+      } else if (started.status !== 200) {
+        throw { response: { data: started.body } };
+      }
+      if (paper.status !== 200) {
+        throw { response: { data: paper.body } };
+      }
+      const data = paper.body;
+      set({
+        currentQuiz: {
+          id: data.quiz_id,
+          title: data.title,
+          duration: data.duration_minutes,
+          totalScore: data.total_score,
+        },
+        quizQuestions: data.questions,
+        quizAttempt: {
+          id: data.attempt_id,
+          startTime: data.start_time,
+        },
+        isLoading: false,
+      });
+      return data;
+    } catch (error) {
+      const errorMsg = error.response?.data?.detail || 'Failed to start quiz';
+      set({ isLoading: false, error: errorMsg });
+      throw new Error(errorMsg);
+    }
+  },
+  
   submitQuiz: async (quizId, responses) => {
     set({ isLoading: true, error: null });
     try {